@@ -31,6 +31,7 @@ from pathlib import Path
 from loguru import logger
 
 from openscm_zenodo import ZenodoDomain, ZenodoInteractor
+from openscm_zenodo.sync import sync_deposition
 
 # %% [markdown]
 # We enable logging in this notebook so you can see what is going on in more detail.
@@ -156,13 +157,23 @@ zi.update_metadata(
 # ## Upload the files
 #
 # Now we can also upload our files to the draft.
+#
+# Zenodo links the previous version's files into the new draft.
+# Rather than removing all of them and uploading everything again,
+# we can use `sync_deposition`.
+# This only uploads files which are new or have changed
+# (by comparing sizes and checksums)
+# and removes carried-over files which we no longer want.
+# If you just want to upload files, use `zi.upload_files` instead.
 
 # %%
 files_to_upload_l = [to_upload]
-zi.upload_files(
+sync_plan = sync_deposition(
     deposition_id=draft_deposition_id,
-    to_upload=files_to_upload_l,
+    local_files=files_to_upload_l,
+    zenodo_interactor=zi,
 )
+sync_plan.to_lines()
 
 # %% [markdown]
 # ## Publish the version
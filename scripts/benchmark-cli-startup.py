@@ -0,0 +1,71 @@
+"""
+Benchmark the start-up time of the command-line interface
+
+We call the CLI thousands of times in shell loops,
+so the time taken for simple calls like `--version` and `--help` matters.
+This script times those calls and fails if they are slower than a given limit.
+"""
+
+from __future__ import annotations
+
+import statistics
+import subprocess
+import sys
+import time
+from typing import Annotated
+
+import typer
+
+ENTRY_POINT = "from openscm_zenodo.cli import app; app()"
+
+CALLS = {
+    "--version": ["--version"],
+    "--help": ["--help"],
+    "retrieve-bibtex --help": ["retrieve-bibtex", "--help"],
+}
+
+
+def main(
+    repeats: Annotated[
+        int, typer.Option(help="Number of times to time each call")
+    ] = 10,
+    max_median: Annotated[
+        float,
+        typer.Option(help="Maximum allowed median time for each call (seconds)"),
+    ] = 0.5,
+) -> None:
+    """
+    Time the start-up of the CLI
+
+    A summary is printed to stdout.
+    The script exits with a non-zero code
+    if the median time of any call is above `max_median`.
+    """
+    too_slow = []
+    for name, args in CALLS.items():
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            subprocess.run(  # noqa: S603
+                # Equivalent to the `openscm-zenodo` entry point
+                [sys.executable, "-c", ENTRY_POINT, *args],
+                check=True,
+                capture_output=True,
+            )
+            timings.append(time.perf_counter() - start)
+
+        median = statistics.median(timings)
+        print(
+            f"{name:<25} median: {median:.3f}s "
+            f"min: {min(timings):.3f}s max: {max(timings):.3f}s"
+        )
+        if median > max_median:
+            too_slow.append(name)
+
+    if too_slow:
+        print(f"Slower than {max_median}s: {too_slow}")
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    typer.run(main)
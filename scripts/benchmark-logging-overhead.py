@@ -0,0 +1,196 @@
+"""
+Benchmark the overhead of logging on uploads of many small files
+
+Uploads many small files to a local stand-in for Zenodo's bucket API
+with each of our logging modes.
+With small files, the per-file work (including logging) dominates,
+so this is where logging overhead would show up.
+Logs are written to a sink which throws them away,
+optionally after a delay to mimic a slow terminal or pipe.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import http.server
+import multiprocessing
+import multiprocessing.connection
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Annotated
+
+import typer
+from attrs import define
+from loguru import logger
+
+from openscm_zenodo.logging import QueuedSink, get_default_config
+from openscm_zenodo.zenodo import ZenodoInteractor
+
+
+class SinkHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Handler which accepts uploads and throws the data away
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_PUT(self) -> None:
+        """
+        Read and discard the uploaded data
+        """
+        self.rfile.read(int(self.headers["Content-Length"]))
+
+        self.send_response(201)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format: str, *args: object) -> None:
+        """
+        Don't log every request
+        """
+
+
+@define
+class LocalBucketInteractor(ZenodoInteractor):
+    """
+    Interactor which uploads to a local bucket rather than Zenodo
+    """
+
+    bucket_url: str = ""
+
+    def get_bucket_url(self, deposition_id: str) -> str:
+        """
+        Get the URL of the local bucket
+        """
+        return self.bucket_url
+
+
+@define
+class SlowSink:
+    """
+    Sink which throws messages away, after a delay
+    """
+
+    latency: float
+    """Time taken to write each message (seconds)"""
+
+    def write(self, message: str) -> None:
+        """
+        Throw the message away
+        """
+        if self.latency:
+            time.sleep(self.latency)
+
+    def flush(self) -> None:
+        """
+        Flush (no-op)
+        """
+
+
+def configure_logging(mode: str, level: str, sink: SlowSink) -> None:
+    """
+    Configure logging for a mode
+    """
+    logger.remove()
+    if mode == "disabled":
+        logger.disable("openscm_zenodo")
+        return
+
+    # Use the default config, but with our sink rather than stderr
+    config = get_default_config(level=level, serialize="json" in mode)
+    handlers = [
+        {**v, "sink": QueuedSink(sink) if "queued" in mode else sink}  # type: ignore[arg-type]
+        for v in config["handlers"]
+    ]
+    logger.configure(handlers=handlers)  # type: ignore[arg-type]
+    logger.enable("openscm_zenodo")
+
+
+def serve(port_pipe: multiprocessing.connection.Connection) -> None:
+    """
+    Run the sink server, sending its port back through `port_pipe`
+    """
+    with http.server.ThreadingHTTPServer(("127.0.0.1", 0), SinkHandler) as server:
+        port_pipe.send(server.server_address[1])
+        server.serve_forever()
+
+
+def main(  # noqa: PLR0913
+    n_files: Annotated[int, typer.Option(help="Number of files to upload")] = 1000,
+    file_size: Annotated[int, typer.Option(help="Size of each file (bytes)")] = 1024,
+    n_threads: Annotated[int, typer.Option(help="Number of upload threads")] = 8,
+    level: Annotated[str, typer.Option(help="Logging level")] = "DEBUG",
+    sink_latency_ms: Annotated[
+        float, typer.Option(help="Time taken to write each log message (ms)")
+    ] = 0.0,
+    repeats: Annotated[
+        int, typer.Option(help="Number of times to time each logging mode")
+    ] = 3,
+) -> None:
+    """
+    Compare the time taken to upload many small files with each logging mode
+
+    A summary is printed to stdout.
+    """
+    # Run the server in its own process,
+    # so it doesn't compete with the upload (and logging) threads for the GIL
+    port_receiver, port_sender = multiprocessing.Pipe(duplex=False)
+    server = multiprocessing.Process(target=serve, args=(port_sender,), daemon=True)
+    server.start()
+    with (
+        tempfile.TemporaryDirectory() as tmp_dir,
+        open(os.devnull, "w") as devnull,
+    ):
+        zenodo_interactor = LocalBucketInteractor(
+            token="benchmark",  # noqa: S106
+            bucket_url=f"http://127.0.0.1:{port_receiver.recv()}/bucket",
+        )
+
+        to_upload = []
+        for i in range(n_files):
+            to_upload.append(Path(tmp_dir) / f"file-{i}.bin")
+            to_upload[-1].write_bytes(os.urandom(file_size))
+
+        baseline = None
+        for mode in ("disabled", "text", "text-queued", "json", "json-queued"):
+            timings = []
+            for _ in range(repeats):
+                configure_logging(
+                    mode, level=level, sink=SlowSink(sink_latency_ms / 1000)
+                )
+                start = time.perf_counter()
+                # Hide the overall progress bars
+                with contextlib.redirect_stderr(devnull):
+                    zenodo_interactor.upload_files(
+                        "benchmark",
+                        to_upload=to_upload,
+                        n_threads=n_threads,
+                        tqdm_kwargs=dict(disable=True),
+                    )
+
+                upload_time = time.perf_counter() - start
+                # Removing the handlers waits for any queued messages,
+                # which is reported separately
+                logger.remove()
+                timings.append((upload_time, time.perf_counter() - start))
+
+            median = statistics.median(v[0] for v in timings)
+            median_drained = statistics.median(v[1] for v in timings)
+            if baseline is None:
+                baseline = median
+
+            print(
+                f"{mode:<12} median: {median:.2f}s "
+                f"({n_files / median:.0f} files/s, "
+                f"overhead: {100 * (median / baseline - 1):+.1f}%, "
+                f"including writing all logs: {median_drained:.2f}s)"
+            )
+
+    server.terminate()
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,102 @@
+"""
+Benchmark the throughput of file uploads
+
+Uploads a large file to a local stand-in for Zenodo's bucket API,
+which reads and discards the data.
+This takes the network (mostly) out of the picture,
+so the numbers show how fast our side of the upload can go,
+with and without memory-mapped uploads.
+"""
+
+from __future__ import annotations
+
+import http.server
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+from openscm_zenodo.zenodo import ZenodoInteractor
+
+SINK_READ_SIZE = 2**20
+
+
+class SinkHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Handler which accepts uploads and throws the data away
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_PUT(self) -> None:
+        """
+        Read and discard the uploaded data
+        """
+        remaining = int(self.headers["Content-Length"])
+        while remaining:
+            remaining -= len(self.rfile.read(min(SINK_READ_SIZE, remaining)))
+
+        self.send_response(201)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format: str, *args: object) -> None:
+        """
+        Don't log every request
+        """
+
+
+def main(
+    size_mib: Annotated[
+        int, typer.Option(help="Size of the file to upload (MiB)")
+    ] = 1024,
+    repeats: Annotated[
+        int, typer.Option(help="Number of times to time each upload path")
+    ] = 3,
+) -> None:
+    """
+    Compare the throughput of the upload paths
+
+    A summary is printed to stdout.
+    """
+    with (
+        tempfile.TemporaryDirectory() as tmp_dir,
+        http.server.ThreadingHTTPServer(("127.0.0.1", 0), SinkHandler) as server,
+    ):
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        bucket_url = f"http://127.0.0.1:{server.server_address[1]}/bucket"
+
+        to_upload = Path(tmp_dir) / "benchmark.bin"
+        block = bytes(range(256)) * 4096
+        with open(to_upload, "wb") as fh:
+            for _ in range(size_mib):
+                fh.write(block)
+
+        zenodo_interactor = ZenodoInteractor(token="benchmark")  # noqa: S106
+        for use_mmap in (False, True):
+            timings = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                zenodo_interactor.upload_file_to_bucket_url(
+                    to_upload,
+                    bucket_url=bucket_url,
+                    tqdm_kwargs=dict(disable=True),
+                    use_mmap=use_mmap,
+                )
+                timings.append(time.perf_counter() - start)
+
+            median = statistics.median(timings)
+            print(
+                f"{'mmap' if use_mmap else 'file handle':<12} "
+                f"median: {median:.2f}s ({size_mib / median:.0f} MiB/s)"
+            )
+
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    typer.run(main)
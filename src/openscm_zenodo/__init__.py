@@ -2,22 +2,63 @@
 Command-line tool for uploading to zenodo
 """
 
-import importlib.metadata
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
 
 from loguru import logger
 
-from openscm_zenodo.zenodo import (
-    ZenodoDomain,
-    ZenodoInteractor,
-    create_new_version,
-    get_reserved_doi,
-    retrieve_bibtex_entry,
-    retrieve_metadata,
-)
+if TYPE_CHECKING:
+    from openscm_zenodo.domains import ZenodoDomain
+    from openscm_zenodo.zenodo import (
+        ZenodoInteractor,
+        create_new_version,
+        get_reserved_doi,
+        retrieve_bibtex_entry,
+        retrieve_metadata,
+    )
 
 logger.disable("openscm_zenodo")
 
-__version__ = importlib.metadata.version("openscm_zenodo")
+# The public API is imported lazily,
+# so that e.g. `openscm-zenodo --version`
+# doesn't pay the cost of importing requests, tqdm etc.
+_LAZY_ATTRIBUTES = {
+    "ZenodoDomain": "openscm_zenodo.domains",
+    "ZenodoInteractor": "openscm_zenodo.zenodo",
+    "create_new_version": "openscm_zenodo.zenodo",
+    "get_reserved_doi": "openscm_zenodo.zenodo",
+    "retrieve_bibtex_entry": "openscm_zenodo.zenodo",
+    "retrieve_metadata": "openscm_zenodo.zenodo",
+}
+
+
+def __getattr__(name: str) -> Any:
+    """
+    Get attributes of the package, importing them on first use
+    """
+    if name == "__version__":
+        import importlib.metadata
+
+        value: Any = importlib.metadata.version("openscm_zenodo")
+
+    elif name in _LAZY_ATTRIBUTES:
+        value = getattr(import_module(_LAZY_ATTRIBUTES[name]), name)
+
+    else:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+
+    # Cache so we only pay the cost once
+    globals()[name] = value
+
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted([*globals(), "__version__", *_LAZY_ATTRIBUTES])
+
 
 __all__ = [
     "ZenodoDomain",
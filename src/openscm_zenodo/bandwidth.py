@@ -0,0 +1,256 @@
+"""
+Limiting the bandwidth used by uploads
+
+A single [`BandwidthLimiter`][openscm_zenodo.bandwidth.BandwidthLimiter]
+is shared by all the upload threads of a
+[`ZenodoInteractor`][openscm_zenodo.zenodo.ZenodoInteractor],
+so the cap applies to the total, not to each upload.
+The limiter can also pause and resume uploads, e.g. from a signal handler (see
+[`install_pause_signal_handler`][openscm_zenodo.bandwidth.install_pause_signal_handler]).
+Uploads are paused part-way through,
+so very long pauses may cause Zenodo to drop the connection.
+Paused uploads can still be cancelled.
+"""
+
+from __future__ import annotations
+
+import re
+import signal
+import threading
+import time
+from typing import Any, Optional
+
+from attrs import define, field
+from loguru import logger
+
+PAUSE_POLL_INTERVAL: float = 0.1
+"""Interval (seconds) at which paused senders check whether they were cancelled"""
+
+MIN_CHUNK_SIZE: int = 2**16
+"""Minimum size of chunks (in bytes) to send under a bandwidth limit"""
+
+_BANDWIDTH_UNITS: dict[str, int] = {
+    "": 1,
+    "k": 10**3,
+    "m": 10**6,
+    "g": 10**9,
+    "ki": 2**10,
+    "mi": 2**20,
+    "gi": 2**30,
+}
+
+_BANDWIDTH_RE = re.compile(
+    r"^\s*(?P<value>\d+(\.\d*)?)\s*(?P<unit>[kmg]i?)?b?(/s)?\s*$", re.IGNORECASE
+)
+
+
+class UploadCancelledError(RuntimeError):
+    """
+    Raised when an upload is aborted because the uploads were cancelled
+    """
+
+
+def parse_bandwidth(value: str) -> float:
+    """
+    Parse a bandwidth
+
+    Parameters
+    ----------
+    value
+        Bandwidth in bytes per second,
+        optionally with a decimal (k, M, G) or binary (Ki, Mi, Gi) prefix
+        and a "B" or "B/s" suffix, e.g. "500k", "10MB/s" or "1.5MiB".
+
+    Returns
+    -------
+    :
+        Bandwidth (bytes per second)
+
+    Raises
+    ------
+    ValueError
+        `value` could not be parsed
+    """
+    match = _BANDWIDTH_RE.match(value)
+    if match is None:
+        msg = (
+            f"Could not parse {value=!r} as a bandwidth. "
+            "Expected e.g. '500k', '10MB/s' or '1.5MiB'."
+        )
+        raise ValueError(msg)
+
+    unit = (match.group("unit") or "").lower()
+
+    return float(match.group("value")) * _BANDWIDTH_UNITS[unit]
+
+
+@define
+class BandwidthLimiter:
+    """
+    Token-bucket limiter, shared across threads
+
+    Each chunk of data reserves its bytes before it is sent.
+    If the bucket doesn't have enough tokens,
+    the sender sleeps until it would have.
+    Reservations may take the bucket below zero,
+    so chunks larger than the bucket are still allowed
+    (the sender just sleeps for longer).
+    """
+
+    max_bytes_per_second: Optional[float] = None
+    """Maximum bandwidth (bytes per second), `None` for no limit"""
+
+    burst_seconds: float = 0.5
+    """Size of the bucket, in seconds of data at the maximum bandwidth"""
+
+    _lock: threading.Lock = field(factory=threading.Lock, init=False, repr=False)
+    _running: threading.Event = field(init=False, repr=False)
+    _tokens: float = field(default=0.0, init=False, repr=False)
+    _last: float = field(factory=time.monotonic, init=False, repr=False)
+
+    @_running.default
+    def _running_default(self) -> threading.Event:
+        running = threading.Event()
+        running.set()
+
+        return running
+
+    @property
+    def paused(self) -> bool:
+        """
+        Whether sending is paused
+        """
+        return not self._running.is_set()
+
+    def pause(self) -> None:
+        """
+        Pause sending
+
+        Senders block (before their next chunk) until `resume` is called.
+        """
+        logger.info("Pausing uploads")
+        self._running.clear()
+
+    def resume(self) -> None:
+        """
+        Resume sending
+        """
+        logger.info("Resuming uploads")
+        self._running.set()
+
+    def toggle_pause(self) -> None:
+        """
+        Pause sending if it is running, resume it if it is paused
+        """
+        if self.paused:
+            self.resume()
+        else:
+            self.pause()
+
+    def get_chunk_size(self, default: int) -> int:
+        """
+        Get the size of chunks to send
+
+        Large chunks are cheap to send,
+        but under a bandwidth limit they make the sending bursty.
+        Hence, under a limit, chunks are capped at one bucket's worth of data.
+
+        Parameters
+        ----------
+        default
+            Chunk size to use if there is no limit
+
+        Returns
+        -------
+        :
+            Chunk size (bytes)
+        """
+        if self.max_bytes_per_second is None:
+            return default
+
+        return max(
+            MIN_CHUNK_SIZE,
+            min(default, int(self.max_bytes_per_second * self.burst_seconds)),
+        )
+
+    def consume(
+        self, n_bytes: int, cancel_event: Optional[threading.Event] = None
+    ) -> None:
+        """
+        Wait until `n_bytes` can be sent
+
+        Parameters
+        ----------
+        n_bytes
+            Number of bytes which are about to be sent
+
+        cancel_event
+            If supplied, stop waiting (while paused) once this is set
+
+        Raises
+        ------
+        UploadCancelledError
+            `cancel_event` was set while sending was paused
+        """
+        # Wait in slices, so paused senders can still be cancelled
+        while not self._running.wait(PAUSE_POLL_INTERVAL):
+            if cancel_event is not None and cancel_event.is_set():
+                msg = "The uploads were cancelled while paused"
+                raise UploadCancelledError(msg)
+
+        if self.max_bytes_per_second is None:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            capacity = self.max_bytes_per_second * self.burst_seconds
+            self._tokens = min(
+                capacity,
+                self._tokens + (now - self._last) * self.max_bytes_per_second,
+            )
+            self._last = now
+            self._tokens -= n_bytes
+            wait = (
+                -self._tokens / self.max_bytes_per_second if self._tokens < 0 else 0.0
+            )
+
+        if wait > 0:
+            time.sleep(wait)
+
+
+def install_pause_signal_handler(
+    bandwidth_limiter: BandwidthLimiter, signal_name: str = "SIGUSR1"
+) -> bool:
+    """
+    Make a signal pause and resume uploads
+
+    Each time the signal is received, uploads are paused if they are running
+    and resumed if they are paused, e.g. `kill -USR1 <pid>`.
+
+    Parameters
+    ----------
+    bandwidth_limiter
+        Limiter to pause and resume
+
+    signal_name
+        Name of the signal to handle
+
+    Returns
+    -------
+    :
+        `True` if the handler was installed.
+        `False` if it couldn't be, because the signal doesn't exist
+        on this platform (e.g. Windows)
+        or we're not in the main thread.
+    """
+    signum = getattr(signal, signal_name, None)
+    if signum is None or threading.current_thread() is not threading.main_thread():
+        return False
+
+    def handler(signum: int, frame: Any) -> None:
+        # Toggle from another thread, as logging from a signal handler can deadlock
+        threading.Thread(target=bandwidth_limiter.toggle_pause, daemon=True).start()
+
+    signal.signal(signum, handler)
+
+    return True
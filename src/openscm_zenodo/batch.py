@@ -0,0 +1,122 @@
+"""
+Running streams of operations
+
+Each line of a batch is a JSON object like
+`{"operation": "retrieve-metadata", "arguments": {"deposition_id": "123"}}`,
+with an optional `"id"` used to match results to their inputs
+(if not supplied, the line number is used).
+The known operations are given by
+[`OPERATIONS`][openscm_zenodo.operations.OPERATIONS].
+
+Operations are run concurrently, so operations which depend on each other
+(e.g. uploading files to a deposition which another line creates)
+should be put in separate batches.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from loguru import logger
+
+from openscm_zenodo.executors import iter_bounded_map
+from openscm_zenodo.operations import run_operation
+from openscm_zenodo.zenodo import ZenodoInteractor
+
+
+def run_batch_line(
+    line: str, line_number: int, zenodo_interactor: ZenodoInteractor
+) -> dict[str, Any]:
+    """
+    Run the operation given by a single line of a batch
+
+    Parameters
+    ----------
+    line
+        Line to run
+
+    line_number
+        Line number (used as the ID if the line doesn't supply one)
+
+    zenodo_interactor
+        Object to use to interact with Zenodo
+
+    Returns
+    -------
+    :
+        Result of the line.
+
+        This has the key "result" if the operation succeeded
+        or the key "error" (with the type and message of the error) if not.
+        Errors are returned rather than raised
+        so that one bad line doesn't stop the rest of the batch.
+    """
+    res: dict[str, Any] = {"id": line_number}
+    try:
+        entry = json.loads(line)
+        res["id"] = entry.get("id", line_number)
+        res["operation"] = entry["operation"]
+        res["result"] = run_operation(
+            entry["operation"],
+            zenodo_interactor=zenodo_interactor,
+            arguments=entry.get("arguments", {}),
+        )
+
+    except Exception as exc:
+        logger.error(f"Error running line {line_number}: {exc!r}")
+        res["error"] = {"type": type(exc).__name__, "message": str(exc)}
+
+    return res
+
+
+def _iter_batch_lines(lines: Iterable[str]) -> Iterator[tuple[str, int]]:
+    for line_number, line in enumerate(lines, start=1):
+        line_stripped = line.strip()
+        if line_stripped and not line_stripped.startswith("#"):
+            yield line_stripped, line_number
+
+
+def run_batch(
+    lines: Iterable[str],
+    zenodo_interactor: ZenodoInteractor,
+    max_workers: int = 4,
+) -> Iterator[dict[str, Any]]:
+    """
+    Run a batch of operations
+
+    Lines are read lazily and at most `2 * max_workers` lines are in flight
+    at any time, so arbitrarily long streams can be run in constant memory.
+
+    Parameters
+    ----------
+    lines
+        Lines of JSON which define the operations to run.
+
+        Empty lines and lines starting with "#" are skipped.
+
+    zenodo_interactor
+        Object to use to interact with Zenodo.
+
+        This is shared by all operations,
+        so its connections (and caches) are re-used.
+
+    max_workers
+        Maximum number of operations to run at once
+
+    Yields
+    ------
+    :
+        Result of each line
+        (see [`run_batch_line`][openscm_zenodo.batch.run_batch_line]),
+        in the same order as `lines`
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        yield from iter_bounded_map(
+            lambda v: run_batch_line(*v, zenodo_interactor=zenodo_interactor),
+            _iter_batch_lines(lines),
+            executor=executor,
+            max_in_flight=2 * max_workers,
+        )
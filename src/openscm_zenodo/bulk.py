@@ -0,0 +1,186 @@
+"""
+Applying the same metadata change to many depositions
+
+The current metadata of each deposition is retrieved concurrently,
+the change (a patch, see
+[`apply_metadata_patch`][openscm_zenodo.metadata.apply_metadata_patch])
+is applied locally
+and only depositions whose metadata actually changes are updated on Zenodo.
+"""
+
+from __future__ import annotations
+
+import functools
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
+
+from attrs import frozen
+from loguru import logger
+
+from openscm_zenodo.executors import iter_bounded_map
+from openscm_zenodo.metadata import (
+    apply_metadata_patch,
+    get_metadata_diff,
+    validate_metadata,
+)
+from openscm_zenodo.zenodo import ZenodoInteractor
+
+
+@frozen
+class BulkUpdateResult:
+    """
+    Result of updating the metadata of a single deposition
+    """
+
+    deposition_id: str
+    """ID of the deposition"""
+
+    status: str
+    """Status of the update ("updated", "unchanged", "would-update" or "failed")"""
+
+    diff: str = ""
+    """Changes made to the metadata, as a unified diff"""
+
+    error: Optional[str] = None
+    """Error, if the update failed"""
+
+
+def update_deposition_metadata_with_patch(
+    deposition_id: str,
+    patch: list[dict[str, Any]],
+    zenodo_interactor: ZenodoInteractor,
+    validate: bool = False,
+    dry_run: bool = False,
+) -> BulkUpdateResult:
+    """
+    Update the metadata of a single deposition with a patch
+
+    Parameters
+    ----------
+    deposition_id
+        ID of the deposition
+
+    patch
+        Patch to apply to the deposition's metadata
+
+    zenodo_interactor
+        Object to use to interact with Zenodo
+
+    validate
+        Validate the patched metadata before sending it to Zenodo.
+
+        Metadata which the patch doesn't change is not validated.
+
+    dry_run
+        Work out the changes, but don't send them to Zenodo
+
+    Returns
+    -------
+    :
+        Result of the update.
+
+        Errors are returned rather than raised,
+        so that one bad deposition doesn't stop the rest of the updates.
+    """
+    try:
+        current = zenodo_interactor.get_metadata(deposition_id)
+        patched = apply_metadata_patch(current, patch)
+        diff = get_metadata_diff(current, patched)
+        if not diff:
+            return BulkUpdateResult(deposition_id=deposition_id, status="unchanged")
+
+        # Only metadata which would be sent is validated,
+        # so records the patch doesn't change can't fail
+        if validate:
+            validate_metadata(patched)
+
+        if dry_run:
+            return BulkUpdateResult(
+                deposition_id=deposition_id, status="would-update", diff=diff
+            )
+
+        zenodo_interactor.update_metadata(deposition_id=deposition_id, metadata=patched)
+
+    except Exception as exc:
+        logger.error(f"Error updating {deposition_id=!r}: {exc!r}")
+        return BulkUpdateResult(
+            deposition_id=deposition_id,
+            status="failed",
+            error=f"{type(exc).__name__}: {exc}",
+        )
+
+    return BulkUpdateResult(deposition_id=deposition_id, status="updated", diff=diff)
+
+
+def update_metadata_bulk(  # noqa: PLR0913
+    deposition_ids: Iterable[str],
+    patch: list[dict[str, Any]],
+    zenodo_interactor: ZenodoInteractor,
+    max_workers: int = 4,
+    validate: bool = False,
+    dry_run: bool = False,
+) -> Iterator[BulkUpdateResult]:
+    """
+    Apply a patch to the metadata of many depositions
+
+    As for [`run_batch`][openscm_zenodo.batch.run_batch],
+    deposition IDs are read lazily and at most `2 * max_workers` are in flight.
+
+    Parameters
+    ----------
+    deposition_ids
+        IDs of the depositions to update
+
+    patch
+        Patch to apply to each deposition's metadata
+        (see [`apply_metadata_patch`][openscm_zenodo.metadata.apply_metadata_patch])
+
+    zenodo_interactor
+        Object to use to interact with Zenodo
+
+    max_workers
+        Maximum number of depositions to process at once
+
+    validate
+        Validate the patched metadata before sending it to Zenodo
+
+    dry_run
+        Work out the changes, but don't send them to Zenodo
+
+    Yields
+    ------
+    :
+        Result for each deposition, in the same order as `deposition_ids`
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        yield from iter_bounded_map(
+            functools.partial(
+                update_deposition_metadata_with_patch,
+                patch=patch,
+                zenodo_interactor=zenodo_interactor,
+                validate=validate,
+                dry_run=dry_run,
+            ),
+            deposition_ids,
+            executor=executor,
+            max_in_flight=2 * max_workers,
+        )
+
+
+def get_bulk_update_summary(results: Iterable[BulkUpdateResult]) -> dict[str, int]:
+    """
+    Summarise the results of a bulk update
+
+    Parameters
+    ----------
+    results
+        Results to summarise
+
+    Returns
+    -------
+    :
+        Number of depositions with each status
+    """
+    return dict(Counter(v.status for v in results))
@@ -0,0 +1,257 @@
+"""
+Checkpointing of releases, so interrupted releases can be resumed
+
+Creating a new version goes through several stages:
+creating a draft, applying metadata, uploading files and publishing.
+A [`ReleaseCheckpoint`][openscm_zenodo.checkpoint.ReleaseCheckpoint]
+records each completed stage in a file,
+so a release which dies part-way through
+can continue from where it stopped
+rather than creating another draft or repeating expensive uploads.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import hashlib
+import json
+import os
+from collections.abc import Collection, Iterable
+from pathlib import Path
+from typing import Any, Optional
+
+import requests
+from attrs import asdict, define, field
+from loguru import logger
+
+from openscm_zenodo.sync import get_md5_checksum
+from openscm_zenodo.zenodo import UploadFilesError, ZenodoInteractor
+
+
+def get_metadata_hash(metadata: Any) -> str:
+    """
+    Get a hash of some metadata
+
+    Parameters
+    ----------
+    metadata
+        Metadata (must be JSON-serialisable)
+
+    Returns
+    -------
+    :
+        Hash of the metadata, which doesn't depend on key order
+    """
+    return hashlib.sha256(json.dumps(metadata, sort_keys=True).encode()).hexdigest()
+
+
+@define
+class ReleaseCheckpoint:
+    """
+    Record of the completed stages of a release
+    """
+
+    path: Path = field(eq=False)
+    """Path of the checkpoint file"""
+
+    any_deposition_id: str
+    """Deposition ID from which the release was started"""
+
+    draft_deposition_id: Optional[str] = None
+    """ID of the draft created for the release, once created"""
+
+    metadata_hash: Optional[str] = None
+    """Hash of the metadata applied to the draft, once applied"""
+
+    uploaded_files: dict[str, str] = field(factory=dict)
+    """Files uploaded to the draft (name: MD5 checksum)"""
+
+    published: bool = False
+    """Whether the draft has been published"""
+
+    @classmethod
+    def from_file(cls, path: Path) -> ReleaseCheckpoint:
+        """
+        Load a checkpoint from disk
+
+        Parameters
+        ----------
+        path
+            Path of the checkpoint file
+
+        Returns
+        -------
+        :
+            Loaded checkpoint
+        """
+        with open(path) as fh:
+            raw = json.load(fh)
+
+        return cls(path=path, **raw)
+
+    def save(self) -> None:
+        """
+        Save the checkpoint to disk
+
+        The file is replaced atomically,
+        so an interruption while saving can't leave a corrupt checkpoint.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.tmp")
+        with open(tmp_path, "w") as fh:
+            json.dump(
+                asdict(self, filter=lambda attribute, _: attribute.name != "path"),
+                fh,
+                indent=2,
+                sort_keys=True,
+            )
+
+        os.replace(tmp_path, self.path)
+
+
+def load_or_start_checkpoint(
+    path: Path, any_deposition_id: str, resume: bool
+) -> ReleaseCheckpoint:
+    """
+    Load a checkpoint to resume from, or start a new one
+
+    Parameters
+    ----------
+    path
+        Path of the checkpoint file
+
+    any_deposition_id
+        Deposition ID from which the release is being started
+
+    resume
+        Resume from the checkpoint at `path`, if there is one
+
+    Returns
+    -------
+    :
+        Checkpoint to use for the release
+
+    Raises
+    ------
+    ValueError
+        The checkpoint at `path` is for an unfinished release
+        but `resume` is `False`,
+        or the checkpoint is for a release of a different deposition.
+    """
+    if not path.exists():
+        checkpoint = ReleaseCheckpoint(path=path, any_deposition_id=any_deposition_id)
+        checkpoint.save()
+
+        return checkpoint
+
+    existing = ReleaseCheckpoint.from_file(path)
+    if existing.any_deposition_id != any_deposition_id:
+        msg = (
+            f"The checkpoint at {path} is for a release of "
+            f"{existing.any_deposition_id=!r}, not {any_deposition_id=!r}"
+        )
+        raise ValueError(msg)
+
+    if resume:
+        logger.info(f"Resuming release from {existing}")
+        return existing
+
+    if not existing.published:
+        msg = (
+            f"The checkpoint at {path} is for an unfinished release "
+            f"(draft {existing.draft_deposition_id}). "
+            "Resume it or delete the checkpoint to start again."
+        )
+        raise ValueError(msg)
+
+    checkpoint = ReleaseCheckpoint(path=path, any_deposition_id=any_deposition_id)
+    checkpoint.save()
+
+    return checkpoint
+
+
+def _record_uploads(
+    checkpoint: ReleaseCheckpoint, responses: Iterable[requests.models.Response]
+) -> None:
+    for response in responses:
+        # Zenodo reports the name and checksum of each file it receives
+        file_json = response.json()
+        checkpoint.uploaded_files[file_json["key"]] = str(
+            file_json["checksum"]
+        ).removeprefix("md5:")
+
+    checkpoint.save()
+
+
+def upload_files_with_checkpoint(
+    checkpoint: ReleaseCheckpoint,
+    files_to_upload: Collection[Path],
+    zenodo_interactor: ZenodoInteractor,
+    n_threads: int = 4,
+) -> None:
+    """
+    Upload files to the draft of a release, recording the uploads
+
+    Files which the checkpoint records as already uploaded
+    (with the same checksum) are skipped.
+    Only these files are checksummed,
+    the checksums of the new uploads are taken from Zenodo's responses.
+
+    The uploads which succeeded are recorded once
+    [`upload_files`][openscm_zenodo.zenodo.ZenodoInteractor.upload_files]
+    returns or raises an
+    [`UploadFilesError`][openscm_zenodo.zenodo.UploadFilesError],
+    so a failed upload doesn't lose the others.
+
+    Parameters
+    ----------
+    checkpoint
+        Checkpoint of the release.
+
+        This must have a draft deposition ID.
+
+    files_to_upload
+        Files to upload
+
+    zenodo_interactor
+        Object to use to interact with Zenodo
+
+    n_threads
+        Number of threads to use for checksums and uploads
+
+    Raises
+    ------
+    UploadFilesError
+        Any of the uploads failed
+    """
+    if checkpoint.draft_deposition_id is None:
+        msg = "The checkpoint must have a draft deposition ID"
+        raise ValueError(msg)
+
+    recorded = [f for f in files_to_upload if f.name in checkpoint.uploaded_files]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=n_threads) as executor:
+        already_uploaded = {
+            f
+            for f, checksum in zip(recorded, executor.map(get_md5_checksum, recorded))
+            if checkpoint.uploaded_files[f.name] == checksum
+        }
+
+    remaining = [f for f in files_to_upload if f not in already_uploaded]
+    if already_uploaded:
+        logger.info(
+            f"Skipping {len(already_uploaded)} file(s) which were already uploaded"
+        )
+
+    if not remaining:
+        return
+
+    try:
+        responses = zenodo_interactor.upload_files(
+            checkpoint.draft_deposition_id, to_upload=remaining, n_threads=n_threads
+        )
+
+    except UploadFilesError as exc:
+        _record_uploads(checkpoint, exc.responses)
+        raise
+
+    _record_uploads(checkpoint, responses)
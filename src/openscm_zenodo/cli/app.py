@@ -6,25 +6,42 @@ CLI app
 # from __future__ import annotations
 
 import json
+from enum import Enum
 from pathlib import Path
-from typing import Annotated, Optional, Union
+from typing import TYPE_CHECKING, Annotated, Any, Optional, Union
 
+import click
 import typer
 from loguru import logger
 from typing_extensions import TypeAlias
 
 import openscm_zenodo
+from openscm_zenodo.client import DEFAULT_SERVER_ADDRESS
+from openscm_zenodo.domains import ZenodoDomain
 from openscm_zenodo.logging import setup_logging
-from openscm_zenodo.zenodo import (
-    ZenodoDomain,
-    ZenodoInteractor,
-    create_new_version,
-    get_reserved_doi,
-)
+
+if TYPE_CHECKING:
+    from openscm_zenodo.zenodo import ZenodoInteractor
+
+# Note: anything which pulls in heavy dependencies (requests, tqdm etc.)
+# is imported inside the commands that need it,
+# so that e.g. `--version` and `--help` start up quickly.
 
 app = typer.Typer()
 
 
+class CompressionMethodOption(str, Enum):
+    """
+    Compression methods which can be chosen from the command line
+
+    This mirrors [`CompressionMethod`][openscm_zenodo.compression.CompressionMethod]
+    so that the compression module is only imported when it is needed.
+    """
+
+    gzip = "gzip"
+    zstd = "zstd"
+
+
 DEPOSITION_ID_TYPE: TypeAlias = Annotated[
     str,
     typer.Argument(
@@ -43,6 +60,17 @@ FILES_TO_UPLOAD_TYPE: TypeAlias = Annotated[
     typer.Argument(help="Files to upload to the Zenodo deposition"),
 ]
 
+MANIFEST_FILE_TYPE: TypeAlias = Annotated[
+    Path,
+    typer.Argument(
+        exists=True,
+        dir_okay=False,
+        readable=True,
+        resolve_path=True,
+        help="Path to the manifest created with `create-manifest`",
+    ),
+]
+
 METADATA_FILE_TYPE: TypeAlias = Annotated[
     Optional[Path],
     typer.Option(
@@ -81,6 +109,19 @@ TOKEN_TYPE: TypeAlias = Annotated[
     ),
 ]
 
+VALIDATE_METADATA_TYPE: TypeAlias = Annotated[
+    bool,
+    typer.Option(
+        "--validate-metadata/--no-validate-metadata",
+        help=(
+            "Check the metadata locally before sending anything to Zenodo, "
+            "so that invalid metadata fails straight away "
+            "rather than when publishing. "
+            "Off by default, because only some of Zenodo's rules are checked."
+        ),
+    ),
+]
+
 ZENODO_DOMAIN_TYPE: TypeAlias = Annotated[
     ZenodoDomain,
     typer.Option(help=("The zenodo domain with which you want to interact.")),
@@ -96,8 +137,196 @@ def version_callback(version: Optional[bool]) -> None:
         raise typer.Exit(code=0)
 
 
+def get_zenodo_interactor(
+    token: Union[str, None], zenodo_domain: ZenodoDomain
+) -> "ZenodoInteractor":
+    """
+    Get the object to use to interact with Zenodo
+
+    Any `--max-bandwidth` or `--min-upload-throughput` given to the CLI is applied
+    and SIGUSR1 is set up to pause and resume uploads.
+
+    Parameters
+    ----------
+    token
+        Zenodo token
+
+    zenodo_domain
+        Zenodo domain
+
+    Returns
+    -------
+    :
+        Object to use to interact with Zenodo
+    """
+    from openscm_zenodo.bandwidth import install_pause_signal_handler
+    from openscm_zenodo.zenodo import ZenodoInteractor
+
+    ctx = click.get_current_context(silent=True)
+    options = ctx.obj if ctx and ctx.obj else {}
+
+    zenodo_interactor = ZenodoInteractor(
+        token=token,
+        zenodo_domain=zenodo_domain,
+        max_bandwidth=options.get("max_bandwidth"),
+        min_upload_throughput=options.get("min_upload_throughput"),
+        stall_seconds=options.get("stall_seconds", 60.0),
+    )
+    install_pause_signal_handler(zenodo_interactor.bandwidth_limiter)
+
+    return zenodo_interactor
+
+
+def run_command_operation(
+    operation: str,
+    token: Union[str, None],
+    zenodo_domain: ZenodoDomain,
+    arguments: dict[str, Any],
+) -> Any:
+    """
+    Run the operation behind a command
+
+    If a server address was given (with `--server-address`)
+    and the server is running, the operation is forwarded to the server.
+    Otherwise, it is run in this process.
+    Operations are also run in this process if `--max-bandwidth` is given,
+    so that the limit (and pausing with SIGUSR1) applies.
+
+    Parameters
+    ----------
+    operation
+        Name of the operation
+        (see [`OPERATIONS`][openscm_zenodo.operations.OPERATIONS])
+
+    token
+        Zenodo token
+
+    zenodo_domain
+        Zenodo domain
+
+    arguments
+        Arguments to pass to the operation
+
+    Returns
+    -------
+    :
+        Result of the operation
+    """
+    ctx = click.get_current_context(silent=True)
+    options = ctx.obj if ctx and ctx.obj else {}
+    server_address = options.get("server_address")
+    # The server uses its own upload settings, so these can't be forwarded
+    local_only = [
+        f"`--{k.replace('_', '-')}`"
+        for k in ("max_bandwidth", "min_upload_throughput")
+        if options.get(k) is not None
+    ]
+    if server_address is not None and local_only:
+        logger.debug(f"Not forwarding {operation!r} because of {', '.join(local_only)}")
+
+    elif server_address is not None:
+        from openscm_zenodo.client import ServerClient
+
+        client = ServerClient(address=server_address)
+        if client.is_available():
+            logger.debug(f"Forwarding {operation!r} to the server at {server_address}")
+            return client.run(
+                operation,
+                arguments=arguments,
+                token=token,
+                zenodo_domain=zenodo_domain.value,
+            )
+
+        logger.debug(f"No server running at {server_address}, running {operation!r}")
+
+    from openscm_zenodo.operations import run_operation
+
+    return run_operation(
+        operation,
+        zenodo_interactor=get_zenodo_interactor(
+            token=token, zenodo_domain=zenodo_domain
+        ),
+        arguments=arguments,
+    )
+
+
+def parse_bandwidth_option(value: Optional[str], name: str) -> Optional[float]:
+    """
+    Parse a bandwidth passed to the CLI
+
+    Parameters
+    ----------
+    value
+        Value passed to the CLI
+
+    name
+        Name of the option (used in error messages)
+
+    Returns
+    -------
+    :
+        Bandwidth (bytes per second), `None` if `value` is `None`
+    """
+    if value is None:
+        return None
+
+    from openscm_zenodo.bandwidth import parse_bandwidth
+
+    try:
+        return parse_bandwidth(value)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc), param_hint=name) from exc
+
+
+def start_profiling(ctx: typer.Context, output_file: Path) -> None:
+    """
+    Profile the rest of the command
+
+    The profile is written, and a summary printed, when the command finishes.
+
+    Parameters
+    ----------
+    ctx
+        Context of the command
+
+    output_file
+        File in which to write the profile
+    """
+    import sys
+
+    from openscm_zenodo.profiling import (
+        CommandProfiler,
+        format_method_timings,
+        get_method_timings,
+    )
+
+    profiler = CommandProfiler(output_file)
+    profiler.start()
+
+    def finish() -> None:
+        from openscm_zenodo.zenodo import ZenodoInteractor
+
+        stats = profiler.stop()
+        timings = get_method_timings(stats, ZenodoInteractor)
+        print(
+            format_method_timings(
+                timings,
+                title=(
+                    f"Profile written to {output_file}. "
+                    "Time in each ZenodoInteractor method "
+                    "(summed over threads):"
+                ),
+            ),
+            file=sys.stderr,
+            flush=True,
+        )
+
+    ctx.call_on_close(finish)
+
+
 @app.callback()
-def cli(
+def cli(  # noqa: PLR0913
+    ctx: typer.Context,
     version: Annotated[
         Optional[bool],
         typer.Option(
@@ -133,16 +362,108 @@ This will be loaded with [loguru-config](https://github.com/erezinman/loguru-con
 If supplied, this overrides any value provided with `--log-level`."""
         ),
     ] = None,
+    logging_json: Annotated[
+        bool,
+        typer.Option(
+            "--logging-json",
+            help="""Write logs as JSON-lines, for ingestion by other tools.
+
+This is only applied if `--logging-config` is not supplied.""",
+        ),
+    ] = False,
+    logging_enqueue: Annotated[
+        bool,
+        typer.Option(
+            "--logging-enqueue",
+            help="""Write logs through a queue, from a background thread.
+
+Threads which log (e.g. upload threads) then never wait for stderr.
+This is only applied if `--logging-config` is not supplied.""",
+        ),
+    ] = False,
+    server_address: Annotated[
+        Optional[str],
+        typer.Option(
+            envvar="OPENSCM_ZENODO_SERVER_ADDRESS",
+            help="""Address (host:port) of a server started with `openscm-zenodo serve`.
+
+If supplied and the server is running,
+commands are forwarded to the server rather than run in this process.
+This avoids paying for start-up and new connections to Zenodo every time.""",
+        ),
+    ] = None,
+    max_bandwidth: Annotated[
+        Optional[str],
+        typer.Option(
+            envvar="OPENSCM_ZENODO_MAX_BANDWIDTH",
+            help="""Maximum total bandwidth to use for uploads, in bytes per second.
+
+Decimal (k, M, G) and binary (Ki, Mi, Gi) prefixes are supported,
+e.g. '500k', '10MB/s' or '1.5MiB'.
+The limit applies across all upload threads.
+
+Whether or not this is supplied,
+uploads can be paused and resumed by sending SIGUSR1 to the process.""",
+        ),
+    ] = None,
+    min_upload_throughput: Annotated[
+        Optional[str],
+        typer.Option(
+            envvar="OPENSCM_ZENODO_MIN_UPLOAD_THROUGHPUT",
+            help="""Minimum throughput of each upload, in bytes per second.
+
+Uses the same units as `--max-bandwidth`.
+Uploads whose throughput stays below this for `--stall-seconds`
+are aborted and retried.""",
+        ),
+    ] = None,
+    stall_seconds: Annotated[
+        float,
+        typer.Option(
+            help="Time for which an upload must be below `--min-upload-throughput` "
+            "to be aborted (seconds)",
+        ),
+    ] = 60.0,
+    profile: Annotated[
+        Optional[Path],
+        typer.Option(
+            dir_okay=False,
+            help="""Profile the command and write the profile to this file.
+
+The profile is in pstats format
+and includes the threads the command starts (e.g. upload threads).
+It can be viewed with e.g. `python -m pstats` or snakeviz,
+or turned into a flamegraph with e.g. flameprof.
+A summary of the time spent in each Zenodo operation is printed to stderr.
+Commands which are forwarded to a server are only profiled on this side.""",
+        ),
+    ] = None,
 ) -> None:
     """
     Entrypoint for the command-line interface
     """
+    if profile is not None:
+        start_profiling(ctx, output_file=profile)
+
+    ctx.obj = dict(
+        server_address=server_address,
+        max_bandwidth=parse_bandwidth_option(max_bandwidth, "--max-bandwidth"),
+        min_upload_throughput=parse_bandwidth_option(
+            min_upload_throughput, "--min-upload-throughput"
+        ),
+        stall_seconds=stall_seconds,
+    )
+
     if no_logging:
         setup_logging(enable=False)
 
     else:
         setup_logging(
-            enable=True, logging_config=logging_config, logging_level=logging_level
+            enable=True,
+            logging_config=logging_config,
+            logging_level=logging_level,
+            enqueue=logging_enqueue,
+            serialize=logging_json,
         )
 
 
@@ -167,13 +488,13 @@ as the starting point for the next version of a deposit."""
     """
     Retrieve metadata
     """
-    zenodo_interactor = ZenodoInteractor(
+    metadata = run_command_operation(
+        "retrieve-metadata",
         token=token,
         zenodo_domain=zenodo_domain,
-    )
-
-    metadata = zenodo_interactor.get_metadata(
-        deposition_id, user_controlled_only=user_controlled_only
+        arguments=dict(
+            deposition_id=deposition_id, user_controlled_only=user_controlled_only
+        ),
     )
 
     print(json.dumps(metadata, indent=2, sort_keys=True))
@@ -188,18 +509,18 @@ def retrieve_bibtex_command(
     """
     Retrieve bibtex entry
     """
-    zenodo_interactor = ZenodoInteractor(
+    bibtex_entry = run_command_operation(
+        "retrieve-bibtex",
         token=token,
         zenodo_domain=zenodo_domain,
+        arguments=dict(deposition_id=deposition_id),
     )
 
-    bibtex_entry = zenodo_interactor.get_bibtex_entry(deposition_id)
-
     print(bibtex_entry)
 
 
 @app.command(name="update-metadata")
-def update_metadata_command(
+def update_metadata_command(  # noqa: PLR0913
     deposition_id: DEPOSITION_ID_TYPE,
     metadata_file: METADATA_FILE_TYPE,
     token: TOKEN_TYPE,
@@ -214,6 +535,18 @@ def update_metadata_command(
             ),
         ),
     ] = False,
+    validate_metadata: VALIDATE_METADATA_TYPE = False,
+    skip_unchanged: Annotated[
+        bool,
+        typer.Option(
+            "--skip-unchanged/--always-update",
+            help=(
+                "Only send the metadata to Zenodo "
+                "if it differs from the deposition's current metadata "
+                "(ignoring keys which Zenodo controls, e.g. the DOI)"
+            ),
+        ),
+    ] = True,
 ) -> None:
     """
     Update metadata
@@ -229,149 +562,967 @@ def update_metadata_command(
     with open(metadata_file) as fh:
         metadata = json.load(fh)
 
-    if reserve_doi:
-        if (
-            "prereserve_doi" in metadata["metadata"]
-            and not metadata["metadata"]["prereserve_doi"]
-        ):
-            logger.warning(
-                f"The supplied metadata has {metadata['metadata']['prereserve_doi']=}, "
-                "this will be overwritten by the `--reserve-doi` flag"
-            )
-
-        metadata["metadata"]["prereserve_doi"] = True
-
-    zenodo_interactor = ZenodoInteractor(
+    reserved_doi = run_command_operation(
+        "update-metadata",
         token=token,
         zenodo_domain=zenodo_domain,
-    )
-
-    update_metadata_response = zenodo_interactor.update_metadata(
-        deposition_id, metadata=metadata
+        arguments=dict(
+            deposition_id=deposition_id,
+            metadata=metadata,
+            reserve_doi=reserve_doi,
+            validate=validate_metadata,
+            skip_unchanged=skip_unchanged,
+        ),
     )
 
     if reserve_doi:
-        print(get_reserved_doi(update_metadata_response))
+        print(reserved_doi)
 
 
-@app.command(name="upload-files")
-def upload_files_command(
-    deposition_id: DEPOSITION_ID_TYPE,
-    files_to_upload: FILES_TO_UPLOAD_TYPE,
-    token: TOKEN_TYPE,
+@app.command(name="update-metadata-bulk")
+def update_metadata_bulk_command(  # noqa: PLR0913
+    patch_file: Annotated[
+        Path,
+        typer.Argument(
+            exists=True,
+            dir_okay=False,
+            readable=True,
+            help=(
+                "Path to the `.json` file containing the change to apply, "
+                "as a list of JSON-patch operations, e.g. "
+                '`[{"op": "add", "path": "/metadata/keywords/-", "value": "x"}]`. '
+                'The "add", "remove", "replace" and "test" operations are supported.'
+            ),
+        ),
+    ],
+    deposition_ids: Annotated[
+        Optional[list[str]],
+        typer.Argument(
+            help=(
+                "IDs of the depositions to update. "
+                "If not supplied, IDs are read from stdin, one per line."
+            )
+        ),
+    ] = None,
+    token: TOKEN_TYPE = None,
     zenodo_domain: ZENODO_DOMAIN_TYPE = ZenodoDomain.production,
-    n_threads: N_THREADS_TYPE = 4,
+    max_workers: Annotated[
+        int, typer.Option(help="Maximum number of depositions to process at once")
+    ] = 4,
+    validate_metadata: VALIDATE_METADATA_TYPE = False,
+    dry_run: Annotated[
+        bool,
+        typer.Option(
+            "--dry-run",
+            help="Work out and print the changes, but don't send them to Zenodo",
+        ),
+    ] = False,
 ) -> None:
     """
-    Upload files to a Zenodo deposition
+    Apply the same metadata change to many depositions
+
+    The current metadata of the depositions is retrieved concurrently,
+    the change is applied locally
+    and only depositions whose metadata changes are updated.
+    The result for each deposition is printed to stdout as a single line of JSON,
+    in the same order as the input, with its status
+    ("updated", "unchanged", "would-update" or "failed").
+    A summary is logged at the end.
+    If any deposition fails, the exit code is 1.
     """
-    if files_to_upload is None:
-        msg = "You must supply some files to upload"
-        raise ValueError(msg)
+    import sys
 
-    zenodo_interactor = ZenodoInteractor(
+    from attrs import asdict
+
+    from openscm_zenodo.bulk import get_bulk_update_summary, update_metadata_bulk
+
+    with open(patch_file) as fh:
+        patch = json.load(fh)
+
+    if deposition_ids is None:
+        deposition_ids = [v.strip() for v in sys.stdin if v.strip()]
+
+    zenodo_interactor = get_zenodo_interactor(
         token=token,
         zenodo_domain=zenodo_domain,
     )
 
-    zenodo_interactor.upload_files(
-        deposition_id, to_upload=files_to_upload, n_threads=n_threads
-    )
+    results = []
+    for res in update_metadata_bulk(
+        deposition_ids,
+        patch=patch,
+        zenodo_interactor=zenodo_interactor,
+        max_workers=max_workers,
+        validate=validate_metadata,
+        dry_run=dry_run,
+    ):
+        results.append(res)
+        print(json.dumps(asdict(res), sort_keys=True), flush=True)
 
+    summary = get_bulk_update_summary(results)
+    logger.info(f"Summary: {json.dumps(summary, sort_keys=True)}")
+    if summary.get("failed"):
+        raise typer.Exit(1)
 
-@app.command(name="remove-files")
-def remove_files_command(
+
+@app.command(name="diff-metadata")
+def diff_metadata_command(
     deposition_id: DEPOSITION_ID_TYPE,
-    token: TOKEN_TYPE,
-    files_to_remove: Annotated[
-        Optional[list[Path]],
-        typer.Argument(help="Files to remove from the Zenodo deposition"),
-    ] = None,
-    all: Annotated[bool, typer.Option("--all", help="Remove all files")] = False,
+    metadata_file: METADATA_FILE_TYPE,
+    token: TOKEN_TYPE = None,
     zenodo_domain: ZENODO_DOMAIN_TYPE = ZenodoDomain.production,
-    # # Off until parallelism works
-    # n_threads: N_THREADS_TYPE = 4,
 ) -> None:
     """
-    Remove files from a Zenodo deposition
+    Show how a metadata file differs from a deposition's metadata
+
+    The differences are printed to stdout as a unified diff,
+    ignoring keys which Zenodo controls (e.g. the DOI).
+    Like `diff`, the exit code is 1 if there are differences and 0 otherwise.
     """
-    zenodo_interactor = ZenodoInteractor(
+    if metadata_file is None:
+        msg = "A value must be provided for `--metadata-file`"
+
+        raise ValueError(msg)
+
+    with open(metadata_file) as fh:
+        metadata = json.load(fh)
+
+    diff = run_command_operation(
+        "diff-metadata",
         token=token,
         zenodo_domain=zenodo_domain,
+        arguments=dict(deposition_id=deposition_id, metadata=metadata),
     )
 
-    if all:
-        zenodo_interactor.remove_all_files(
-            deposition_id,
-            # n_threads=n_threads,
-        )
-
-    else:
-        if not files_to_remove:
-            msg = "If not using the `--all` flag, you must supply files to remove"
-            print(msg)
-            raise typer.Exit(1)
-
-        zenodo_interactor.remove_files(
-            deposition_id,
-            to_remove=files_to_remove,
-            # n_threads=n_threads
-        )
+    if diff:
+        print(diff, end="")
+        raise typer.Exit(code=1)
 
 
-@app.command(name="create-new-version")
-def create_new_version_command(  # noqa: PLR0913
-    any_deposition_id: Annotated[
-        str,
+@app.command(name="upload-files")
+def upload_files_command(  # noqa: PLR0913
+    deposition_id: DEPOSITION_ID_TYPE,
+    files_to_upload: Annotated[
+        Optional[list[Path]],
         typer.Argument(
             help=(
-                "A deposition ID related to the record you wish to interact with. "
-                "You can pick any published deposit/version. "
-                "This ID is most easily extracted from the URL provided by Zenodo. "
-                "It is just the digits at the end of that link. "
-                "For example, if Zenodo URL is https://zenodo.org/records/10702583, "
-                "then the deposit ID is 10702583."
+                "Files to upload to the Zenodo deposition. "
+                "Directories are walked and the files in them are uploaded "
+                "(see `--include` and `--exclude`)."
             )
         ),
     ],
     token: TOKEN_TYPE,
-    metadata_file: METADATA_FILE_TYPE = None,
-    publish: Annotated[
+    zenodo_domain: ZENODO_DOMAIN_TYPE = ZenodoDomain.production,
+    n_threads: N_THREADS_TYPE = 4,
+    from_stdin: Annotated[
         bool,
         typer.Option(
-            "--publish",
+            "--from-stdin",
             help=(
-                "Publish the newly created version "
-                "after creating it and uploading the files"
+                "Upload data read from stdin (rather than files) "
+                "as a single file called `--name`"
             ),
         ),
     ] = False,
-    zenodo_domain: ZENODO_DOMAIN_TYPE = ZenodoDomain.production,
-    files_to_upload: FILES_TO_UPLOAD_TYPE = None,
-    n_threads: N_THREADS_TYPE = 4,
-) -> None:
-    """
-    Create a new version of a record
-    """
-    if metadata_file is not None:
-        with open(metadata_file) as fh:
-            metadata = json.load(fh)
-
-    else:
-        metadata = None
-
-    zenodo_interactor = ZenodoInteractor(
-        token=token,
-        zenodo_domain=zenodo_domain,
-    )
-
-    new_deposit_id = create_new_version(
-        any_deposition_id=any_deposition_id,
-        metadata=metadata,
-        zenodo_interactor=zenodo_interactor,
-        publish=publish,
-        files_to_upload=files_to_upload,
-        n_threads=n_threads,
-    )
-
-    print(new_deposit_id)
+    name: Annotated[
+        Optional[str],
+        typer.Option(
+            help="Name of the file to create when using `--from-stdin`",
+        ),
+    ] = None,
+    size: Annotated[
+        Optional[int],
+        typer.Option(
+            help=(
+                "Size (in bytes) of the data on stdin, if known. "
+                "If not supplied, the data is uploaded "
+                "with chunked transfer encoding."
+            ),
+        ),
+    ] = None,
+    use_mmap: Annotated[
+        bool,
+        typer.Option(
+            "--use-mmap",
+            help=(
+                "Send files from memory maps in large chunks. "
+                "This reduces CPU overhead for very large files on fast disks."
+            ),
+        ),
+    ] = False,
+    compression: Annotated[
+        Optional[CompressionMethodOption],
+        typer.Option(
+            help=(
+                "Compress each file with this method while uploading it. "
+                "The method's suffix (e.g. '.gz') is added to the uploaded file names."
+            ),
+        ),
+    ] = None,
+    compression_processes: Annotated[
+        Optional[int],
+        typer.Option(
+            help=(
+                "Do gzip compression in a pool of this many processes, "
+                "rather than in threads alongside the uploads. "
+                "This helps when compression and uploads compete for the CPU."
+            ),
+        ),
+    ] = None,
+    compression_manifest: Annotated[
+        bool,
+        typer.Option(
+            "--compression-manifest",
+            help=(
+                "Also upload a manifest which records the original name and size "
+                "of each compressed file"
+            ),
+        ),
+    ] = False,
+    include: Annotated[
+        Optional[list[str]],
+        typer.Option(
+            help=(
+                "Only upload files in directories which match this glob "
+                "(e.g. '*.nc'). "
+                "Patterns without a '/' match file names at any depth, "
+                "other patterns match paths relative to the directory. "
+                "Can be given more than once."
+            ),
+        ),
+    ] = None,
+    exclude: Annotated[
+        Optional[list[str]],
+        typer.Option(
+            help=(
+                "Skip files (and directories) in directories which match this glob "
+                "(e.g. '.*' or 'scratch/'). "
+                "Can be given more than once."
+            ),
+        ),
+    ] = None,
+    ignore_file: Annotated[
+        Optional[Path],
+        typer.Option(
+            exists=True,
+            dir_okay=False,
+            readable=True,
+            help=(
+                "File of more `--exclude` patterns, one per line "
+                "(e.g. a simple `.gitignore` file)"
+            ),
+        ),
+    ] = None,
+    discovery_threads: Annotated[
+        int, typer.Option(help="Number of threads to use to walk directories")
+    ] = 8,
+    adaptive_threads: Annotated[
+        bool,
+        typer.Option(
+            "--adaptive-threads",
+            help=(
+                "Tune the number of uploads in flight based on the observed "
+                "throughput, rather than using `--n-threads`. "
+                "The chosen level is written to the run log "
+                "and used as the starting point for later runs."
+            ),
+        ),
+    ] = False,
+    run_log: Annotated[
+        Optional[Path],
+        typer.Option(
+            envvar="OPENSCM_ZENODO_RUN_LOG",
+            show_default="~/.cache/openscm-zenodo/run-log.jsonl",
+            help="Path to the run log used by `--adaptive-threads`",
+        ),
+    ] = None,
+    continue_on_error: Annotated[
+        bool,
+        typer.Option(
+            "--continue-on-error",
+            help=(
+                "Attempt every upload, even if some fail. "
+                "By default, the other uploads are cancelled as soon as one fails. "
+                "Either way, every failure is reported at the end."
+            ),
+        ),
+    ] = False,
+    dry_run: Annotated[
+        bool,
+        typer.Option(
+            "--dry-run",
+            help=(
+                "Print the files that would be uploaded, without uploading them. "
+                "If `--compression` is used, "
+                "the estimated compression ratio of each file is also printed."
+            ),
+        ),
+    ] = False,
+) -> None:
+    """
+    Upload files to a Zenodo deposition
+
+    If the `--from-stdin` flag is used,
+    the data is streamed from stdin straight to Zenodo
+    without being written to disk first, e.g.
+    `generate-output | openscm-zenodo upload-files 123 --from-stdin --name out.csv`.
+    """
+    if from_stdin:
+        if name is None:
+            msg = "If using the `--from-stdin` flag, you must supply `--name`"
+            raise ValueError(msg)
+
+        if files_to_upload:
+            msg = "If using the `--from-stdin` flag, you cannot also supply files"
+            raise ValueError(msg)
+
+        import sys
+
+        # Stdin can't be forwarded to a server, so this is always run here
+        zenodo_interactor = get_zenodo_interactor(
+            token=token,
+            zenodo_domain=zenodo_domain,
+        )
+        zenodo_interactor.upload_stream(
+            deposition_id, source=sys.stdin.buffer, filename=name, size=size
+        )
+
+        return
+
+    if files_to_upload is None:
+        msg = "You must supply some files to upload"
+        raise ValueError(msg)
+
+    if dry_run:
+        from openscm_zenodo.discovery import (
+            get_file_filter,
+            iter_files,
+            iter_unique_names,
+        )
+
+        file_filter = get_file_filter(include, exclude, ignore_file)
+        files_to_upload = list(
+            iter_unique_names(
+                iter_files(
+                    files_to_upload,
+                    file_filter=file_filter,
+                    n_threads=discovery_threads,
+                )
+            )
+        )
+        if compression is None:
+            for file in files_to_upload:
+                print(f"{file} -> {file.name}")
+
+            return
+
+        from openscm_zenodo.compression import (
+            CompressionMethod,
+            estimate_compression_ratio,
+        )
+
+        compression_method = CompressionMethod(compression.value)
+        for file in files_to_upload:
+            ratio = estimate_compression_ratio(file, method=compression_method)
+            print(
+                f"{file} -> {file.name}{compression_method.suffix} "
+                f"(estimated compression ratio: {ratio:.1f}, "
+                f"estimated size: {file.stat().st_size / ratio / 2**20:.1f} MiB)"
+            )
+
+        return
+
+    run_command_operation(
+        "upload-files",
+        token=token,
+        zenodo_domain=zenodo_domain,
+        arguments=dict(
+            deposition_id=deposition_id,
+            files_to_upload=[str(f.resolve()) for f in files_to_upload],
+            n_threads=n_threads,
+            use_mmap=use_mmap,
+            compression=compression.value if compression is not None else None,
+            compression_manifest=compression_manifest,
+            adaptive=adaptive_threads,
+            run_log=str(run_log.resolve()) if run_log is not None else None,
+            fail_fast=not continue_on_error,
+            compression_processes=compression_processes,
+            include=include,
+            exclude=exclude,
+            ignore_file=str(ignore_file.resolve()) if ignore_file is not None else None,
+            discovery_threads=discovery_threads,
+        ),
+    )
+
+
+@app.command(name="create-manifest")
+def create_manifest_command(  # noqa: PLR0913
+    files: Annotated[
+        list[Path],
+        typer.Argument(
+            help=(
+                "Files to include in the manifest. "
+                "Directories are walked (see `--include` and `--exclude`)."
+            )
+        ),
+    ],
+    output: Annotated[
+        Path,
+        typer.Option(
+            help=(
+                "Path in which to write the manifest. "
+                "The manifest records paths relative to this file."
+            )
+        ),
+    ],
+    include: Annotated[
+        Optional[list[str]],
+        typer.Option(help="Only include files in directories which match this glob"),
+    ] = None,
+    exclude: Annotated[
+        Optional[list[str]],
+        typer.Option(help="Skip files (and directories) which match this glob"),
+    ] = None,
+    ignore_file: Annotated[
+        Optional[Path],
+        typer.Option(
+            exists=True,
+            dir_okay=False,
+            readable=True,
+            help="File of more `--exclude` patterns, one per line",
+        ),
+    ] = None,
+    n_threads: N_THREADS_TYPE = 4,
+) -> None:
+    """
+    Create a manifest of files to upload with `upload-shard`
+
+    The manifest records the name, size and checksum of each file.
+    Share it with every machine which uploads a shard of the files.
+    """
+    from openscm_zenodo.discovery import get_file_filter, iter_files
+    from openscm_zenodo.shards import ShardManifest
+
+    manifest = ShardManifest.from_files(
+        iter_files(files, file_filter=get_file_filter(include, exclude, ignore_file)),
+        n_threads=n_threads,
+    )
+    manifest.save(output)
+    logger.info(f"Wrote a manifest of {len(manifest.entries)} file(s) to {output}")
+
+
+@app.command(name="upload-shard")
+def upload_shard_command(  # noqa: PLR0913
+    deposition_id: DEPOSITION_ID_TYPE,
+    manifest_file: MANIFEST_FILE_TYPE,
+    shard: Annotated[
+        str,
+        typer.Option(
+            help=(
+                "Shard to upload, as 'i/N' (shard i of N, counting from 1). "
+                "Every machine must use the same N and a different i."
+            )
+        ),
+    ],
+    token: TOKEN_TYPE,
+    zenodo_domain: ZENODO_DOMAIN_TYPE = ZenodoDomain.production,
+    n_threads: N_THREADS_TYPE = 4,
+    continue_on_error: Annotated[
+        bool,
+        typer.Option(
+            "--continue-on-error",
+            help="Attempt every upload, even if some fail",
+        ),
+    ] = False,
+) -> None:
+    """
+    Upload one shard of the files in a manifest to a Zenodo deposition
+
+    Run this on each of N machines, with the same manifest and deposition
+    and `--shard 1/N` to `--shard N/N`,
+    to share the uploads of a large release between the machines.
+    Files are shared out so that each shard has a similar number of bytes.
+    Files which are already uploaded are skipped,
+    so a shard which fails can simply be run again.
+    Once every shard is uploaded,
+    use `verify-uploads` to check the deposition before publishing it.
+    """
+    run_command_operation(
+        "upload-shard",
+        token=token,
+        zenodo_domain=zenodo_domain,
+        arguments=dict(
+            deposition_id=deposition_id,
+            manifest_file=str(manifest_file),
+            shard=shard,
+            n_threads=n_threads,
+            fail_fast=not continue_on_error,
+        ),
+    )
+
+
+@app.command(name="verify-uploads")
+def verify_uploads_command(
+    deposition_id: DEPOSITION_ID_TYPE,
+    manifest_file: MANIFEST_FILE_TYPE,
+    token: TOKEN_TYPE,
+    zenodo_domain: ZENODO_DOMAIN_TYPE = ZenodoDomain.production,
+    publish: Annotated[
+        bool,
+        typer.Option(
+            "--publish",
+            help="Publish the deposition if it holds exactly the files in the manifest",
+        ),
+    ] = False,
+) -> None:
+    """
+    Check that a Zenodo deposition holds exactly the files in a manifest
+
+    Files are compared by name, size and checksum.
+    Any problems (missing, mismatched or unexpected files) are printed to stdout.
+    Like `diff`, the exit code is 1 if there are problems and 0 otherwise.
+    If there are problems, the deposition is not published (even with `--publish`).
+    """
+    problems = run_command_operation(
+        "verify-uploads",
+        token=token,
+        zenodo_domain=zenodo_domain,
+        arguments=dict(
+            deposition_id=deposition_id,
+            manifest_file=str(manifest_file),
+            publish=publish,
+        ),
+    )
+
+    if problems:
+        for line in problems:
+            print(line)
+
+        raise typer.Exit(code=1)
+
+
+@app.command(name="remove-files")
+def remove_files_command(
+    deposition_id: DEPOSITION_ID_TYPE,
+    token: TOKEN_TYPE,
+    files_to_remove: Annotated[
+        Optional[list[Path]],
+        typer.Argument(help="Files to remove from the Zenodo deposition"),
+    ] = None,
+    all: Annotated[bool, typer.Option("--all", help="Remove all files")] = False,
+    zenodo_domain: ZENODO_DOMAIN_TYPE = ZenodoDomain.production,
+    # # Off until parallelism works
+    # n_threads: N_THREADS_TYPE = 4,
+) -> None:
+    """
+    Remove files from a Zenodo deposition
+    """
+    if not all and not files_to_remove:
+        msg = "If not using the `--all` flag, you must supply files to remove"
+        print(msg)
+        raise typer.Exit(1)
+
+    run_command_operation(
+        "remove-files",
+        token=token,
+        zenodo_domain=zenodo_domain,
+        arguments=dict(
+            deposition_id=deposition_id,
+            files_to_remove=(
+                [str(f) for f in files_to_remove] if files_to_remove else None
+            ),
+            all=all,
+            # n_threads=n_threads,
+        ),
+    )
+
+
+@app.command(name="create-new-version")
+def create_new_version_command(  # noqa: PLR0913
+    any_deposition_id: Annotated[
+        str,
+        typer.Argument(
+            help=(
+                "A deposition ID related to the record you wish to interact with. "
+                "You can pick any published deposit/version. "
+                "This ID is most easily extracted from the URL provided by Zenodo. "
+                "It is just the digits at the end of that link. "
+                "For example, if Zenodo URL is https://zenodo.org/records/10702583, "
+                "then the deposit ID is 10702583."
+            )
+        ),
+    ],
+    token: TOKEN_TYPE,
+    metadata_file: METADATA_FILE_TYPE = None,
+    publish: Annotated[
+        bool,
+        typer.Option(
+            "--publish",
+            help=(
+                "Publish the newly created version "
+                "after creating it and uploading the files"
+            ),
+        ),
+    ] = False,
+    zenodo_domain: ZENODO_DOMAIN_TYPE = ZenodoDomain.production,
+    files_to_upload: FILES_TO_UPLOAD_TYPE = None,
+    n_threads: N_THREADS_TYPE = 4,
+    incremental: Annotated[
+        bool,
+        typer.Option(
+            "--incremental",
+            help=(
+                "Keep files carried over from the previous version "
+                "if they match the files to upload, "
+                "only removing or replacing files that have changed"
+            ),
+        ),
+    ] = False,
+    checkpoint: Annotated[
+        Optional[Path],
+        typer.Option(
+            help=(
+                "File in which to record each completed stage of the release "
+                "(draft created, metadata applied, each file uploaded, published), "
+                "so that an interrupted release can be resumed with `--resume`"
+            ),
+            dir_okay=False,
+        ),
+    ] = None,
+    resume: Annotated[
+        bool,
+        typer.Option(
+            "--resume",
+            help=(
+                "Resume the release recorded in `--checkpoint`, "
+                "re-using its draft and skipping files which were already uploaded"
+            ),
+        ),
+    ] = False,
+    validate_metadata: VALIDATE_METADATA_TYPE = False,
+) -> None:
+    """
+    Create a new version of a record
+    """
+    if metadata_file is not None:
+        with open(metadata_file) as fh:
+            metadata = json.load(fh)
+
+    else:
+        metadata = None
+
+    new_deposit_id = run_command_operation(
+        "create-new-version",
+        token=token,
+        zenodo_domain=zenodo_domain,
+        arguments=dict(
+            any_deposition_id=any_deposition_id,
+            metadata=metadata,
+            publish=publish,
+            files_to_upload=(
+                [str(f.resolve()) for f in files_to_upload]
+                if files_to_upload is not None
+                else None
+            ),
+            n_threads=n_threads,
+            incremental=incremental,
+            checkpoint=str(checkpoint.resolve()) if checkpoint is not None else None,
+            resume=resume,
+            validate=validate_metadata,
+        ),
+    )
+
+    print(new_deposit_id)
+
+
+@app.command(name="list-depositions")
+def list_depositions_command(
+    token: TOKEN_TYPE = None,
+    status: Annotated[
+        Optional[str],
+        typer.Option(
+            help=(
+                "Only list depositions with this status, e.g. 'draft' or 'published'. "
+                "Ignored if `--concept-id` is supplied."
+            )
+        ),
+    ] = None,
+    concept_id: Annotated[
+        Optional[str],
+        typer.Option(
+            help=(
+                "If supplied, list the published versions of this concept "
+                "(newest first) rather than the user's depositions"
+            )
+        ),
+    ] = None,
+    page_size: Annotated[
+        int, typer.Option(help="Number of entries to request from Zenodo per page")
+    ] = 100,
+    zenodo_domain: ZENODO_DOMAIN_TYPE = ZenodoDomain.production,
+) -> None:
+    """
+    List depositions (or versions of a concept) as JSON-lines
+
+    Each deposition is printed to stdout as a single line of JSON
+    as soon as its page has been retrieved,
+    so the output can be streamed into other tools.
+    """
+    zenodo_interactor = get_zenodo_interactor(
+        token=token,
+        zenodo_domain=zenodo_domain,
+    )
+
+    if concept_id is not None:
+        entries = zenodo_interactor.iter_versions(concept_id, page_size=page_size)
+
+    else:
+        entries = zenodo_interactor.iter_depositions(status=status, page_size=page_size)
+
+    for entry in entries:
+        print(json.dumps(entry, sort_keys=True), flush=True)
+
+
+@app.command(name="resolve-latest")
+def resolve_latest_command(  # noqa: PLR0913
+    any_deposition_id: Annotated[
+        str,
+        typer.Argument(
+            help=(
+                "Any deposition ID in the record/series of interest, "
+                "or the concept ID of the record."
+            )
+        ),
+    ],
+    token: TOKEN_TYPE = None,
+    index: Annotated[
+        Optional[Path],
+        typer.Option(
+            envvar="OPENSCM_ZENODO_LINEAGE_INDEX",
+            show_default="~/.cache/openscm-zenodo/lineage-index.sqlite",
+            help="Path to the local (SQLite) lineage index",
+        ),
+    ] = None,
+    max_age: Annotated[
+        Optional[float],
+        typer.Option(
+            help=(
+                "Maximum age, in seconds, of the index entry for this record. "
+                "If the entry is older, it is refreshed from Zenodo first. "
+                "If not supplied, the index is only refreshed "
+                "if it does not contain the record yet."
+            )
+        ),
+    ] = None,
+    refresh: Annotated[
+        bool,
+        typer.Option(
+            "--refresh",
+            help="Refresh the index entry from Zenodo before resolving",
+        ),
+    ] = False,
+    doi: Annotated[
+        bool,
+        typer.Option(
+            "--doi",
+            help="Print the DOI of the latest version rather than its ID",
+        ),
+    ] = False,
+    zenodo_domain: ZENODO_DOMAIN_TYPE = ZenodoDomain.production,
+) -> None:
+    """
+    Resolve the latest version of a record using a local lineage index
+
+    Lookups are answered from the local index where possible,
+    Zenodo is only contacted when the index needs to be refreshed.
+    """
+    from openscm_zenodo.lineage import DEFAULT_LINEAGE_INDEX_PATH, LineageIndex
+
+    if index is None:
+        index = DEFAULT_LINEAGE_INDEX_PATH
+
+    lineage_index = LineageIndex(path=index, zenodo_domain=zenodo_domain)
+    zenodo_interactor = get_zenodo_interactor(
+        token=token,
+        zenodo_domain=zenodo_domain,
+    )
+
+    if refresh:
+        concept_id = lineage_index.get_concept_id(any_deposition_id)
+        if concept_id is None:
+            concept_id = zenodo_interactor.get_concept_id(any_deposition_id)
+
+        lineage_index.refresh(concept_id, zenodo_interactor=zenodo_interactor)
+
+    latest = lineage_index.resolve_latest(
+        any_deposition_id, zenodo_interactor=zenodo_interactor, max_age=max_age
+    )
+
+    print(latest.doi if doi else latest.record_id)
+
+
+@app.command(name="sync")
+def sync_command(  # noqa: PLR0913
+    deposition_id: DEPOSITION_ID_TYPE,
+    local_dir: Annotated[
+        Path,
+        typer.Argument(
+            exists=True,
+            file_okay=False,
+            dir_okay=True,
+            readable=True,
+            resolve_path=True,
+            help=(
+                "Directory whose files the deposition should match. "
+                "Only files directly in this directory are considered "
+                "because Zenodo does not support directories."
+            ),
+        ),
+    ],
+    token: TOKEN_TYPE,
+    delete: Annotated[
+        bool,
+        typer.Option(
+            help=(
+                "Delete files from the deposition "
+                "which are not in the local directory"
+            )
+        ),
+    ] = True,
+    dry_run: Annotated[
+        bool,
+        typer.Option(
+            "--dry-run",
+            help="Print the changes that would be made, without making them",
+        ),
+    ] = False,
+    zenodo_domain: ZENODO_DOMAIN_TYPE = ZenodoDomain.production,
+    n_threads: N_THREADS_TYPE = 4,
+) -> None:
+    """
+    Make a Zenodo deposition's files match a local directory
+
+    Files are compared by name, size and checksum.
+    Only files which differ are deleted, uploaded or replaced.
+
+    Only the files directly in the local directory are compared
+    (sub-directories are not walked),
+    because Zenodo depositions have no directories.
+
+    If the `--dry-run` flag is used,
+    the changes which would be made are printed to stdout.
+    """
+    zenodo_interactor = get_zenodo_interactor(
+        token=token,
+        zenodo_domain=zenodo_domain,
+    )
+
+    from openscm_zenodo.sync import sync_deposition
+
+    local_files = sorted(f for f in local_dir.iterdir() if f.is_file())
+
+    sync_plan = sync_deposition(
+        deposition_id=deposition_id,
+        local_files=local_files,
+        zenodo_interactor=zenodo_interactor,
+        delete=delete,
+        dry_run=dry_run,
+        n_threads=n_threads,
+    )
+
+    if dry_run:
+        for line in sync_plan.to_lines():
+            print(line)
+
+
+@app.command(name="batch")
+def batch_command(
+    batch_file: Annotated[
+        Path,
+        typer.Argument(
+            allow_dash=True,
+            help=(
+                "File containing the operations to run as JSON-lines. "
+                "Use '-' to read from stdin."
+            ),
+        ),
+    ] = Path("-"),
+    token: TOKEN_TYPE = None,
+    zenodo_domain: ZENODO_DOMAIN_TYPE = ZenodoDomain.production,
+    max_workers: Annotated[
+        int, typer.Option(help="Maximum number of operations to run at once")
+    ] = 4,
+) -> None:
+    """
+    Run a stream of operations in a single process
+
+    Each line is a JSON object like
+    `{"id": "a", "operation": "retrieve-bibtex", "arguments": {"deposition_id": "1"}}`.
+    The operation is the name of a command
+    and the arguments are the command's arguments (with underscores).
+    Paths are relative to the current directory.
+
+    All operations share one (pooled) connection to Zenodo.
+    The result of each line is printed to stdout as a single line of JSON,
+    in the same order as the input,
+    with either a "result" or an "error" key.
+    If any operation fails, the exit code is 1.
+    """
+    import contextlib
+    import sys
+
+    from openscm_zenodo.batch import run_batch
+
+    zenodo_interactor = get_zenodo_interactor(
+        token=token,
+        zenodo_domain=zenodo_domain,
+    )
+
+    n_errors = 0
+    with (
+        open(batch_file)
+        if str(batch_file) != "-"
+        # Don't close stdin when we're done
+        else contextlib.nullcontext(sys.stdin)
+    ) as fh:
+        for res in run_batch(
+            fh, zenodo_interactor=zenodo_interactor, max_workers=max_workers
+        ):
+            if "error" in res:
+                n_errors += 1
+
+            print(json.dumps(res, sort_keys=True), flush=True)
+
+    if n_errors:
+        logger.error(f"{n_errors} operation(s) failed")
+        raise typer.Exit(1)
+
+
+@app.command(name="serve")
+def serve_command(
+    address: Annotated[
+        str,
+        typer.Option(
+            help=(
+                "Address (host:port) on which to listen. "
+                "Only use localhost, "
+                "the server should not be exposed to other machines."
+            )
+        ),
+    ] = DEFAULT_SERVER_ADDRESS,
+) -> None:
+    """
+    Run a long-running local server
+
+    The server keeps warm connections to Zenodo (and caches)
+    and runs the commands forwarded to it by clients
+    started with `--server-address`.
+
+    Only clients which can read the server's secret
+    (written to `~/.cache/openscm-zenodo/` with permissions 0600 when it starts)
+    can run commands on it.
+    """
+    from openscm_zenodo.server import serve
+
+    serve(address)
@@ -0,0 +1,189 @@
+"""
+Client for a running OpenSCM-Zenodo server
+
+This module is deliberately kept free of heavy imports,
+so that forwarding a command to a running server
+is cheaper than running the command in a fresh process.
+"""
+
+from __future__ import annotations
+
+import http
+import http.client
+import json
+import re
+from pathlib import Path
+from typing import Any, Optional
+
+from attrs import define
+
+DEFAULT_SERVER_ADDRESS: str = "127.0.0.1:8765"
+"""Default address of the server (host:port)"""
+
+SERVER_SECRET_DIR: Path = Path.home() / ".cache" / "openscm-zenodo"
+"""
+Directory in which servers write their secrets
+
+Each server writes a new secret when it starts,
+readable only by the user who started it.
+Clients must send the secret with each request,
+so only that user can run operations on the server.
+"""
+
+
+def get_server_secret_path(address: str) -> Path:
+    """
+    Get the path of the file which holds the secret of the server at an address
+
+    Parameters
+    ----------
+    address
+        Address of the server (host:port)
+
+    Returns
+    -------
+    :
+        Path of the server's secret file
+    """
+    name = re.sub(r"[^\w.-]", "_", address)
+
+    return SERVER_SECRET_DIR / f"server-{name}.secret"
+
+
+class ServerError(RuntimeError):
+    """
+    Raised when an operation fails on the server
+    """
+
+    def __init__(self, error_type: str, message: str) -> None:
+        self.error_type = error_type
+        self.message = message
+
+        super().__init__(f"{error_type}: {message}")
+
+
+@define
+class ServerClient:
+    """
+    Client for forwarding operations to a running server
+    """
+
+    address: str = DEFAULT_SERVER_ADDRESS
+    """Address of the server (host:port)"""
+
+    secret_file: Optional[Path] = None
+    """
+    File which holds the server's secret
+
+    If not supplied, we use the file given by
+    [`get_server_secret_path`][openscm_zenodo.client.get_server_secret_path].
+    """
+
+    timeout_ping: float = 0.5
+    """Timeout (in seconds) to use when checking whether the server is running"""
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        body: Optional[dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> tuple[int, Any]:
+        secret_file = (
+            self.secret_file
+            if self.secret_file is not None
+            else get_server_secret_path(self.address)
+        )
+        secret = secret_file.read_text().strip()
+
+        host, port = self.address.rsplit(":", 1)
+        connection = http.client.HTTPConnection(host, int(port), timeout=timeout)
+        try:
+            connection.request(
+                method,
+                path,
+                body=json.dumps(body) if body is not None else None,
+                headers={
+                    "Authorization": f"Bearer {secret}",
+                    "Content-Type": "application/json",
+                },
+            )
+            response = connection.getresponse()
+            response_json = json.loads(response.read())
+
+        finally:
+            connection.close()
+
+        return response.status, response_json
+
+    def is_available(self) -> bool:
+        """
+        Check whether the server is running and accepts our requests
+
+        Returns
+        -------
+        :
+            `True` if the server responded (and accepted our secret),
+            `False` otherwise
+        """
+        try:
+            status, _ = self._request("GET", "/ping", timeout=self.timeout_ping)
+
+        except (OSError, ValueError):
+            return False
+
+        return status == http.HTTPStatus.OK
+
+    def run(
+        self,
+        operation: str,
+        arguments: dict[str, Any],
+        token: Optional[str] = None,
+        zenodo_domain: Optional[str] = None,
+    ) -> Any:
+        """
+        Run an operation on the server
+
+        Parameters
+        ----------
+        operation
+            Name of the operation to run
+            (see [`OPERATIONS`][openscm_zenodo.operations.OPERATIONS])
+
+        arguments
+            Arguments to pass to the operation
+
+        token
+            Zenodo token to use for the operation
+
+        zenodo_domain
+            Zenodo domain to use for the operation
+
+        Returns
+        -------
+        :
+            Result of the operation
+
+        Raises
+        ------
+        ServerError
+            The operation failed on the server
+        """
+        status, response_json = self._request(
+            "POST",
+            "/run",
+            body={
+                "operation": operation,
+                "arguments": arguments,
+                "token": token,
+                "zenodo_domain": zenodo_domain,
+            },
+        )
+
+        if status != http.HTTPStatus.OK:
+            raise ServerError(
+                error_type=response_json["error"]["type"],
+                message=response_json["error"]["message"],
+            )
+
+        return response_json["result"]
@@ -0,0 +1,449 @@
+"""
+On-the-fly compression of files for upload
+
+Files are compressed while they are streamed to Zenodo,
+so no compressed copy is written to disk.
+Compressing in this way means the compressed size is not known in advance,
+so compressed files are uploaded with chunked transfer encoding.
+
+Two methods are supported:
+
+- gzip, from the standard library.
+  The file is split into blocks which are compressed in parallel
+  and written as separate gzip members
+  (like [pigz](https://zlib.net/pigz/) does).
+  The result is a normal `.gz` file, which any gzip tool can decompress.
+  The blocks can also be compressed in a process pool, so compression
+  doesn't compete with the upload threads for the GIL, see
+  [`create_compression_process_pool`][openscm_zenodo.compression.create_compression_process_pool].
+- zstd, which requires [zstandard](https://github.com/indygreg/python-zstandard)
+  and uses its built-in multithreaded compression.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import functools
+import gzip
+import json
+import multiprocessing
+import os
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from enum import Enum
+from pathlib import Path
+from typing import Any, Optional
+
+from attrs import define, field, frozen
+
+from openscm_zenodo.executors import iter_bounded_map
+
+COMPRESSION_BLOCK_SIZE: int = 4 * 2**20
+"""Size of the blocks (in bytes) which are compressed in parallel"""
+
+COMPRESSION_LEVEL_DEFAULT: int = 6
+"""Default compression level"""
+
+COMPRESSION_MANIFEST_FILENAME: str = "compression-manifest.json"
+"""Name of the manifest file uploaded alongside compressed files"""
+
+COMPRESSION_SAMPLE_BLOCKS: int = 3
+"""Number of blocks to sample when estimating compression ratios"""
+
+
+class CompressionMethod(str, Enum):
+    """
+    Supported compression methods
+    """
+
+    gzip = "gzip"
+    """gzip (standard library)"""
+
+    zstd = "zstd"
+    """zstd (requires zstandard)"""
+
+    @property
+    def suffix(self) -> str:
+        """
+        Suffix added to the names of files compressed with this method
+        """
+        return {
+            CompressionMethod.gzip: ".gz",
+            CompressionMethod.zstd: ".zst",
+        }[self]
+
+
+def _get_zstandard() -> Any:
+    try:
+        import zstandard
+    except ImportError as exc:
+        msg = (
+            "[zstandard](https://github.com/indygreg/python-zstandard) "
+            "is required for zstd compression. "
+            "Install it with `pip install 'openscm-zenodo[zstd]'`."
+        )
+        raise ImportError(msg) from exc
+
+    return zstandard
+
+
+def _iter_blocks(path: Path, block_size: int) -> Iterator[bytes]:
+    with open(path, "rb") as fh:
+        while block := fh.read(block_size):
+            yield block
+
+
+def _compress_gzip_block(block: bytes, level: int) -> bytes:
+    # mtime=0 so that the output only depends on the input
+    return gzip.compress(block, compresslevel=level, mtime=0)
+
+
+def create_compression_process_pool(n_processes: int) -> ProcessPoolExecutor:
+    """
+    Create a process pool for compressing blocks
+
+    The pool can be shared by all the files being uploaded, see
+    [`CompressedFile.executor`][openscm_zenodo.compression.CompressedFile.executor].
+    Compressing in other processes keeps the CPU work
+    (and the copying of blocks in and out of zlib)
+    off the threads which do the uploads.
+    The cost is that each block is copied to and from the worker processes,
+    so this only pays off when several cores are available.
+
+    Parameters
+    ----------
+    n_processes
+        Number of processes in the pool
+
+    Returns
+    -------
+    :
+        Process pool.
+
+        The caller is responsible for shutting it down.
+    """
+    # Forking a process which has upload threads running isn't safe
+    return ProcessPoolExecutor(
+        max_workers=n_processes, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def iter_gzip_compressed(
+    blocks: Iterable[bytes],
+    level: int = COMPRESSION_LEVEL_DEFAULT,
+    n_threads: int = 4,
+    executor: Optional[Executor] = None,
+) -> Iterator[bytes]:
+    """
+    Compress blocks with gzip in parallel
+
+    zlib releases the GIL while compressing, so threads give real parallelism.
+    At most `2 * n_threads` blocks are held in memory at once,
+    so the blocks waiting to be sent act as a bounded queue
+    between reading and compressing the file and uploading it.
+
+    Parameters
+    ----------
+    blocks
+        Blocks of data to compress
+
+    level
+        Compression level
+
+    n_threads
+        Number of threads to use for compression
+        (or, if `executor` is supplied, number of blocks to compress at once)
+
+    executor
+        Executor in which to compress the blocks,
+        e.g. a process pool from
+        [`create_compression_process_pool`][openscm_zenodo.compression.create_compression_process_pool].
+
+        If not supplied, a thread pool with `n_threads` threads is used.
+
+    Yields
+    ------
+    :
+        Compressed blocks, each one a complete gzip member, in order
+    """
+    with contextlib.ExitStack() as stack:
+        if executor is None:
+            executor = stack.enter_context(ThreadPoolExecutor(max_workers=n_threads))
+
+        yield from iter_bounded_map(
+            functools.partial(_compress_gzip_block, level=level),
+            blocks,
+            executor=executor,
+            max_in_flight=2 * n_threads,
+        )
+
+
+def iter_zstd_compressed(
+    blocks: Iterable[bytes],
+    level: int = COMPRESSION_LEVEL_DEFAULT,
+    n_threads: int = 4,
+) -> Iterator[bytes]:
+    """
+    Compress blocks with zstd
+
+    Parameters
+    ----------
+    blocks
+        Blocks of data to compress
+
+    level
+        Compression level
+
+    n_threads
+        Number of threads to use for compression
+
+    Yields
+    ------
+    :
+        Compressed data, which forms a single zstd frame
+
+    Raises
+    ------
+    ImportError
+        [zstandard](https://github.com/indygreg/python-zstandard) is not installed
+    """
+    zstandard = _get_zstandard()
+
+    compressor = zstandard.ZstdCompressor(level=level, threads=n_threads)
+    chunker = compressor.chunker(chunk_size=COMPRESSION_BLOCK_SIZE)
+    for block in blocks:
+        yield from chunker.compress(block)
+
+    yield from chunker.finish()
+
+
+def iter_compressed(
+    blocks: Iterable[bytes],
+    method: CompressionMethod,
+    level: int = COMPRESSION_LEVEL_DEFAULT,
+    n_threads: int = 4,
+    executor: Optional[Executor] = None,
+) -> Iterator[bytes]:
+    """
+    Compress blocks with a given method
+
+    Parameters
+    ----------
+    blocks
+        Blocks of data to compress
+
+    method
+        Compression method to use
+
+    level
+        Compression level
+
+    n_threads
+        Number of threads to use for compression
+
+    executor
+        Executor in which to compress blocks (only used for gzip,
+        see [`iter_gzip_compressed`][openscm_zenodo.compression.iter_gzip_compressed]).
+
+        zstd compresses in its own native threads,
+        which don't need the GIL, so doesn't need this.
+
+    Returns
+    -------
+    :
+        Iterator over the compressed data
+    """
+    if method == CompressionMethod.gzip:
+        return iter_gzip_compressed(
+            blocks, level=level, n_threads=n_threads, executor=executor
+        )
+
+    if method == CompressionMethod.zstd:
+        return iter_zstd_compressed(blocks, level=level, n_threads=n_threads)
+
+    raise NotImplementedError(method)
+
+
+@define
+class CompressedFile:
+    """
+    Source which compresses a file as it is read
+
+    Iterating over this gives the compressed data.
+    Once iteration is complete, `compressed_size` is the size of the compressed data.
+    """
+
+    path: Path
+    """Path of the file to compress"""
+
+    method: CompressionMethod
+    """Compression method"""
+
+    level: int = COMPRESSION_LEVEL_DEFAULT
+    """Compression level"""
+
+    n_threads: int = 4
+    """Number of threads to use for compression"""
+
+    executor: Optional[Executor] = field(default=None, eq=False, repr=False)
+    """
+    Executor in which to compress blocks
+
+    Supplying a process pool (shared between files) moves compression
+    out of this process, see
+    [`create_compression_process_pool`][openscm_zenodo.compression.create_compression_process_pool].
+    """
+
+    compressed_size: int = field(default=0, init=False)
+    """Number of compressed bytes produced so far"""
+
+    @property
+    def filename(self) -> str:
+        """
+        Name to give the compressed file
+        """
+        return f"{self.path.name}{self.method.suffix}"
+
+    def __iter__(self) -> Iterator[bytes]:
+        """
+        Iterate over the compressed data
+        """
+        self.compressed_size = 0
+        for chunk in iter_compressed(
+            _iter_blocks(self.path, COMPRESSION_BLOCK_SIZE),
+            method=self.method,
+            level=self.level,
+            n_threads=self.n_threads,
+            executor=self.executor,
+        ):
+            self.compressed_size += len(chunk)
+            yield chunk
+
+    def to_manifest_entry(self) -> CompressionManifestEntry:
+        """
+        Get the manifest entry for this file
+
+        This should only be called once the file has been compressed.
+
+        Returns
+        -------
+        :
+            Manifest entry
+        """
+        return CompressionManifestEntry(
+            filename=self.filename,
+            original_filename=self.path.name,
+            method=self.method.value,
+            original_size=os.stat(self.path).st_size,
+            compressed_size=self.compressed_size,
+        )
+
+
+@frozen
+class CompressionManifestEntry:
+    """
+    Record of a file which was compressed before upload
+    """
+
+    filename: str
+    """Name of the uploaded (compressed) file"""
+
+    original_filename: str
+    """Name of the original file"""
+
+    method: str
+    """Compression method"""
+
+    original_size: int
+    """Size of the original file (bytes)"""
+
+    compressed_size: int
+    """Size of the compressed file (bytes)"""
+
+
+def get_compression_manifest(entries: Iterable[CompressionManifestEntry]) -> bytes:
+    """
+    Get the contents of a compression manifest
+
+    The manifest tells users how to get back to the original files.
+
+    Parameters
+    ----------
+    entries
+        Entries to include in the manifest
+
+    Returns
+    -------
+    :
+        Manifest, as JSON
+    """
+    manifest = {
+        "files": [
+            {
+                "filename": entry.filename,
+                "original_filename": entry.original_filename,
+                "method": entry.method,
+                "original_size": entry.original_size,
+                "compressed_size": entry.compressed_size,
+            }
+            for entry in sorted(entries, key=lambda e: e.filename)
+        ]
+    }
+
+    return json.dumps(manifest, indent=2).encode()
+
+
+def estimate_compression_ratio(
+    path: Path,
+    method: CompressionMethod,
+    level: int = COMPRESSION_LEVEL_DEFAULT,
+    n_sample_blocks: int = COMPRESSION_SAMPLE_BLOCKS,
+) -> float:
+    """
+    Estimate the compression ratio of a file
+
+    Rather than compressing the whole file,
+    we compress a few blocks spread evenly through it.
+
+    Parameters
+    ----------
+    path
+        File to estimate the compression ratio of
+
+    method
+        Compression method
+
+    level
+        Compression level
+
+    n_sample_blocks
+        Number of blocks to sample
+
+    Returns
+    -------
+    :
+        Estimated compression ratio (original size / compressed size)
+    """
+    file_size = os.stat(path).st_size
+    if file_size == 0:
+        return 1.0
+
+    n_blocks = -(-file_size // COMPRESSION_BLOCK_SIZE)
+    if n_blocks <= n_sample_blocks:
+        sample_starts = list(range(n_blocks))
+    else:
+        step = (n_blocks - 1) / max(n_sample_blocks - 1, 1)
+        sample_starts = sorted({round(i * step) for i in range(n_sample_blocks)})
+
+    samples = []
+    with open(path, "rb") as fh:
+        for block_number in sample_starts:
+            fh.seek(block_number * COMPRESSION_BLOCK_SIZE)
+            samples.append(fh.read(COMPRESSION_BLOCK_SIZE))
+
+    compressed_size = sum(
+        len(chunk)
+        for chunk in iter_compressed(samples, method=method, level=level, n_threads=1)
+    )
+
+    return sum(len(s) for s in samples) / compressed_size
@@ -0,0 +1,320 @@
+"""
+Adaptive concurrency for uploads
+
+The best number of simultaneous uploads depends on the link:
+a fast link needs many uploads in flight to be saturated,
+while a slow link only gets congested (and slower) with more.
+Rather than guessing,
+[`AdaptiveConcurrency`][openscm_zenodo.concurrency.AdaptiveConcurrency]
+starts small, measures the aggregate throughput
+and grows (or shrinks) the number of uploads in flight
+until throughput stops rising.
+
+The chosen level can be written to a run log,
+so later runs can start from it rather than from scratch.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import datetime as dt
+import json
+import threading
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Callable, Optional, TypeVar
+
+import requests
+from attrs import define, field
+from loguru import logger
+
+T = TypeVar("T")
+
+DEFAULT_RUN_LOG_PATH = Path.home() / ".cache" / "openscm-zenodo" / "run-log.jsonl"
+"""Default location of the run log"""
+
+THROTTLED_STATUS_CODES: frozenset[int] = frozenset({429, 503})
+"""HTTP status codes which mean that Zenodo wants us to slow down"""
+
+
+@define
+class AdaptiveConcurrency:
+    """
+    Controller which tunes the number of uploads in flight
+
+    Throughput is measured over windows,
+    each of which lasts until `limit` uploads have completed
+    (and at least `min_window_seconds` have passed).
+    While throughput keeps rising, the limit is doubled after each window.
+    Once a window is not at least `min_improvement` better than the best so far,
+    the limit goes back to the best level and stays there.
+    Throttling responses from Zenodo halve the limit.
+    """
+
+    limit: int = 2
+    """Current number of uploads to have in flight"""
+
+    minimum: int = 1
+    """Minimum number of uploads to have in flight"""
+
+    maximum: int = 32
+    """Maximum number of uploads to have in flight"""
+
+    min_improvement: float = 0.1
+    """Minimum relative increase in throughput for an increase to be kept"""
+
+    min_window_seconds: float = 1.0
+    """Minimum length of a measurement window (seconds)"""
+
+    max_throttled_retries: int = 3
+    """Maximum number of times to retry an upload which was throttled"""
+
+    converged: bool = False
+    """Whether the limit has stopped changing (except for throttling)"""
+
+    best_throughput: float = 0.0
+    """Best throughput seen so far (bytes per second)"""
+
+    best_limit: Optional[int] = None
+    """Limit which gave `best_throughput`"""
+
+    n_throttled: int = 0
+    """Number of throttled uploads"""
+
+    _window_start: float = field(factory=time.monotonic, init=False, repr=False)
+    _window_bytes: int = field(default=0, init=False, repr=False)
+    _window_completed: int = field(default=0, init=False, repr=False)
+
+    def _start_window(self) -> None:
+        self._window_start = time.monotonic()
+        self._window_bytes = 0
+        self._window_completed = 0
+
+    def on_complete(self, n_bytes: int) -> None:
+        """
+        Record that an upload completed
+
+        Parameters
+        ----------
+        n_bytes
+            Number of bytes in the upload
+        """
+        self._window_bytes += n_bytes
+        self._window_completed += 1
+
+        elapsed = time.monotonic() - self._window_start
+        if self._window_completed < self.limit or elapsed < self.min_window_seconds:
+            return
+
+        throughput = self._window_bytes / elapsed
+        logger.debug(
+            "Throughput with {} uploads in flight: {:.1f} MiB/s",
+            self.limit,
+            throughput / 2**20,
+        )
+
+        if self.converged:
+            pass
+
+        elif throughput > self.best_throughput * (1 + self.min_improvement):
+            self.best_throughput = throughput
+            self.best_limit = self.limit
+            if self.limit >= self.maximum:
+                self.converged = True
+            else:
+                self.limit = min(2 * self.limit, self.maximum)
+                logger.info(f"Throughput rising, increasing uploads to {self.limit}")
+
+        else:
+            self.converged = True
+            if self.best_limit is not None:
+                self.limit = self.best_limit
+
+            logger.info(f"Throughput stopped rising, using {self.limit} uploads")
+
+        self._start_window()
+
+    def on_throttled(self) -> None:
+        """
+        Record that an upload was throttled by Zenodo
+        """
+        self.n_throttled += 1
+        self.limit = max(self.minimum, self.limit // 2)
+        self.converged = True
+        logger.warning(f"Throttled by Zenodo, reducing uploads to {self.limit}")
+        self._start_window()
+
+    def _should_retry(self, exc: Exception, n_retries: int) -> bool:
+        """
+        Whether a task should be retried because it was throttled
+        """
+        return (
+            isinstance(exc, requests.HTTPError)
+            and exc.response is not None
+            and exc.response.status_code in THROTTLED_STATUS_CODES
+            and n_retries < self.max_throttled_retries
+        )
+
+    def run(
+        self,
+        tasks: Sequence[tuple[Callable[[], T], int]],
+        progress: Optional[Callable[[int], object]] = None,
+        on_error: Optional[Callable[[int, Exception], object]] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> tuple[T, ...]:
+        """
+        Run tasks, with the number in flight controlled by `self`
+
+        Parameters
+        ----------
+        tasks
+            Tasks to run.
+
+            Each task is a callable and the number of bytes it uploads.
+
+        progress
+            Callback to call with 1 each time a task completes (or fails)
+
+        on_error
+            If supplied, this is called with the index and exception
+            of each task which fails, rather than raising the exception.
+
+            Once `cancel_event` is set, tasks which haven't started are not run.
+            Instead, they are passed to `on_error`
+            with a `concurrent.futures.CancelledError`.
+
+        cancel_event
+            Event which tells the tasks to stop.
+
+            This is set if the run is interrupted (e.g. by `KeyboardInterrupt`),
+            so tasks which check it can stop promptly
+            rather than keeping the interpreter alive until they finish.
+
+        Returns
+        -------
+        :
+            Results of the tasks which succeeded, in the order in which they completed
+
+        Raises
+        ------
+        requests.HTTPError
+            A task failed (or was throttled more than `max_throttled_retries` times)
+            and `on_error` was not supplied
+        """
+        pending = list(enumerate(tasks))[::-1]
+        retries: dict[int, int] = {}
+        results = []
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.maximum
+        ) as executor:
+            in_flight: dict[concurrent.futures.Future[T], int] = {}
+            self._start_window()
+            try:
+                while pending or in_flight:
+                    if on_error is not None and cancel_event and cancel_event.is_set():
+                        while pending:
+                            i, _ = pending.pop()
+                            on_error(i, concurrent.futures.CancelledError())
+
+                    while pending and len(in_flight) < self.limit:
+                        i, (task, _) = pending.pop()
+                        in_flight[executor.submit(task)] = i
+
+                    done, _ = concurrent.futures.wait(
+                        in_flight, return_when=concurrent.futures.FIRST_COMPLETED
+                    )
+                    for future in done:
+                        i = in_flight.pop(future)
+                        try:
+                            results.append(future.result())
+
+                        except Exception as exc:
+                            if self._should_retry(exc, n_retries=retries.get(i, 0)):
+                                retries[i] = retries.get(i, 0) + 1
+                                self.on_throttled()
+                                pending.append((i, tasks[i]))
+                                continue
+
+                            if on_error is None:
+                                raise
+
+                            on_error(i, exc)
+
+                        else:
+                            self.on_complete(tasks[i][1])
+
+                        if progress is not None:
+                            progress(1)
+
+            except BaseException:
+                if cancel_event is not None:
+                    cancel_event.set()
+
+                raise
+
+        return tuple(results)
+
+
+def read_last_concurrency(
+    zenodo_domain: str, run_log: Path = DEFAULT_RUN_LOG_PATH
+) -> Optional[int]:
+    """
+    Read the concurrency chosen by the last run against a domain
+
+    Parameters
+    ----------
+    zenodo_domain
+        Zenodo domain
+
+    run_log
+        Path to the run log
+
+    Returns
+    -------
+    :
+        Last chosen number of uploads in flight,
+        `None` if there are no previous runs in the log
+    """
+    if not run_log.exists():
+        return None
+
+    last = None
+    with open(run_log) as fh:
+        for line in fh:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+            if entry.get("zenodo_domain") == zenodo_domain and "n_threads" in entry:
+                last = int(entry["n_threads"])
+
+    return last
+
+
+def append_to_run_log(
+    entry: dict[str, Any], run_log: Path = DEFAULT_RUN_LOG_PATH
+) -> None:
+    """
+    Append an entry to the run log
+
+    Parameters
+    ----------
+    entry
+        Entry to append.
+
+        A timestamp is added automatically.
+
+    run_log
+        Path to the run log
+    """
+    run_log.parent.mkdir(parents=True, exist_ok=True)
+    with open(run_log, "a") as fh:
+        fh.write(
+            json.dumps(
+                {"timestamp": dt.datetime.now(dt.timezone.utc).isoformat(), **entry},
+                sort_keys=True,
+            )
+        )
+        fh.write("\n")
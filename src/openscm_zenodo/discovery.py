@@ -0,0 +1,346 @@
+"""
+Discovery of the files to upload
+
+Passing every file to upload on the command line doesn't scale
+to trees with hundreds of thousands of files
+(the shell's glob expansion is slow and can exceed the maximum argument length).
+Instead, [`iter_files`][openscm_zenodo.discovery.iter_files] walks directories,
+with the rules in a [`FileFilter`][openscm_zenodo.discovery.FileFilter]
+deciding which files to keep.
+
+The walk scans directories in a pool of threads (`os.scandir` releases the GIL)
+and yields files as they are found,
+so uploads can start before the walk finishes.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import fnmatch
+import os
+import queue
+from collections.abc import Iterable, Iterator, Sequence
+from pathlib import Path
+from typing import Optional
+
+from attrs import field, frozen
+from loguru import logger
+
+DEFAULT_DISCOVERY_THREADS: int = 8
+"""Default number of threads used to walk directories"""
+
+
+def _to_tuple(value: Iterable[str]) -> tuple[str, ...]:
+    return tuple(value)
+
+
+def _matches(pattern: str, relative_path: str, is_dir: bool) -> bool:
+    if pattern.endswith("/"):
+        if not is_dir:
+            return False
+
+        pattern = pattern.rstrip("/")
+
+    if "/" in pattern:
+        # Anchored to the root of the walk, like in a `.gitignore` file
+        return fnmatch.fnmatchcase(relative_path, pattern.lstrip("/"))
+
+    return fnmatch.fnmatchcase(relative_path.rsplit("/", 1)[-1], pattern)
+
+
+@frozen
+class FileFilter:
+    """
+    Rules which decide which files found by a walk are kept
+
+    Patterns are shell-style globs, applied to paths relative to the walked directory
+    (with `/` as the separator), using a subset of `.gitignore` rules:
+
+    - a pattern without a `/` matches the name of a file (or directory) at any depth
+    - a pattern with a `/` is matched against the whole relative path
+      (a leading `/` is ignored)
+    - a pattern which ends with a `/` only matches directories
+
+    Unlike `.gitignore` files, `*` also matches `/`.
+    """
+
+    include: tuple[str, ...] = field(default=(), converter=_to_tuple)
+    """
+    Patterns of files to keep
+
+    If empty, every file which isn't excluded is kept.
+    """
+
+    exclude: tuple[str, ...] = field(default=(), converter=_to_tuple)
+    """
+    Patterns of files to skip
+
+    Excluded directories are not walked at all.
+    """
+
+    @classmethod
+    def from_ignore_file(
+        cls, ignore_file: Path, include: Iterable[str] = (), exclude: Iterable[str] = ()
+    ) -> FileFilter:
+        """
+        Initialise from an ignore file (e.g. a `.gitignore` file)
+
+        Parameters
+        ----------
+        ignore_file
+            File with one exclude pattern per line.
+
+            Blank lines and lines starting with `#` are skipped.
+
+        include
+            Patterns of files to keep
+
+        exclude
+            Patterns of files to skip, in addition to those in `ignore_file`
+
+        Returns
+        -------
+        :
+            Initialised instance
+
+        Raises
+        ------
+        ValueError
+            The ignore file contains a negated (`!`) pattern,
+            which is not supported
+        """
+        exclude_all = list(exclude)
+        for line_number, line in enumerate(
+            ignore_file.read_text().splitlines(), start=1
+        ):
+            pattern = line.strip()
+            if not pattern or pattern.startswith("#"):
+                continue
+
+            if pattern.startswith("!"):
+                msg = (
+                    f"{ignore_file}:{line_number}: negated patterns are not supported. "
+                    f"Received: {pattern!r}"
+                )
+                raise ValueError(msg)
+
+            exclude_all.append(pattern)
+
+        return cls(include=include, exclude=exclude_all)
+
+    def keeps_file(self, relative_path: str) -> bool:
+        """
+        Whether a file is kept
+
+        Parameters
+        ----------
+        relative_path
+            Path of the file relative to the walked directory
+
+        Returns
+        -------
+        :
+            `True` if the file matches any of `self.include` (or there are none)
+            and doesn't match any of `self.exclude`
+        """
+        if any(_matches(v, relative_path, is_dir=False) for v in self.exclude):
+            return False
+
+        if not self.include:
+            return True
+
+        return any(_matches(v, relative_path, is_dir=False) for v in self.include)
+
+    def walks_dir(self, relative_path: str) -> bool:
+        """
+        Whether a directory is walked
+
+        Parameters
+        ----------
+        relative_path
+            Path of the directory relative to the walked directory
+
+        Returns
+        -------
+        :
+            `True` if the directory doesn't match any of `self.exclude`
+        """
+        return not any(_matches(v, relative_path, is_dir=True) for v in self.exclude)
+
+
+def get_file_filter(
+    include: Optional[Iterable[str]] = None,
+    exclude: Optional[Iterable[str]] = None,
+    ignore_file: Optional[Path] = None,
+) -> FileFilter:
+    """
+    Get a file filter from command-line style options
+
+    Parameters
+    ----------
+    include
+        Patterns of files to keep
+
+    exclude
+        Patterns of files to skip
+
+    ignore_file
+        File with more patterns of files to skip, see
+        [`FileFilter.from_ignore_file`][openscm_zenodo.discovery.FileFilter.from_ignore_file]
+
+    Returns
+    -------
+    :
+        File filter
+    """
+    if ignore_file is not None:
+        return FileFilter.from_ignore_file(
+            ignore_file, include=include or (), exclude=exclude or ()
+        )
+
+    return FileFilter(include=include or (), exclude=exclude or ())
+
+
+def _scan_dir(
+    directory: Path, relative_dir: str, file_filter: FileFilter
+) -> tuple[list[Path], list[tuple[Path, str]]]:
+    files = []
+    sub_dirs = []
+    with os.scandir(directory) as entries:
+        for entry in sorted(entries, key=lambda v: v.name):
+            relative_path = f"{relative_dir}{entry.name}"
+            # Symlinked directories aren't followed, so the walk can't loop
+            if entry.is_dir(follow_symlinks=False):
+                if file_filter.walks_dir(relative_path):
+                    sub_dirs.append((Path(entry.path), f"{relative_path}/"))
+
+            elif entry.is_file() and file_filter.keeps_file(relative_path):
+                files.append(Path(entry.path))
+
+    return files, sub_dirs
+
+
+def iter_files(
+    paths: Sequence[Path],
+    file_filter: Optional[FileFilter] = None,
+    n_threads: int = DEFAULT_DISCOVERY_THREADS,
+) -> Iterator[Path]:
+    """
+    Iterate over the files in, or given by, paths
+
+    Parameters
+    ----------
+    paths
+        Files and directories.
+
+        Files are always yielded (whatever `file_filter` says).
+        Directories are walked and the files in them which `file_filter` keeps
+        are yielded.
+
+    file_filter
+        Rules which decide which files found by the walk are kept.
+
+        If not supplied, every file is kept.
+
+    n_threads
+        Number of threads to use to walk directories
+
+    Yields
+    ------
+    :
+        Files, as they are found.
+
+        Files in the same directory are yielded in order of their name,
+        but files in different directories can be yielded in any order.
+
+    Raises
+    ------
+    FileNotFoundError
+        One of `paths` does not exist
+    """
+    if file_filter is None:
+        file_filter = FileFilter()
+
+    for path in paths:
+        if not path.exists():
+            msg = f"{path} does not exist"
+            raise FileNotFoundError(msg)
+
+    # Each scan is put on this queue when it finishes
+    finished: queue.SimpleQueue[
+        concurrent.futures.Future[tuple[list[Path], list[tuple[Path, str]]]]
+    ] = queue.SimpleQueue()
+    n_files = n_dirs = n_pending = 0
+    with concurrent.futures.ThreadPoolExecutor(max_workers=n_threads) as executor:
+        futures = set()
+
+        def submit(directory: Path, relative_dir: str) -> None:
+            nonlocal n_pending
+            future = executor.submit(_scan_dir, directory, relative_dir, file_filter)
+            future.add_done_callback(finished.put)
+            futures.add(future)
+            n_pending += 1
+
+        try:
+            for path in paths:
+                if path.is_dir():
+                    submit(path, "")
+
+                else:
+                    n_files += 1
+                    yield path
+
+            while n_pending:
+                future = finished.get()
+                futures.discard(future)
+                n_pending -= 1
+                n_dirs += 1
+
+                files, sub_dirs = future.result()
+                for sub_dir in sub_dirs:
+                    submit(*sub_dir)
+
+                n_files += len(files)
+                yield from files
+
+        finally:
+            # Stop the walk promptly if the caller stops early (or it fails)
+            for future in futures:
+                future.cancel()
+
+    logger.debug("Found {} file(s) in {} directories", n_files, n_dirs)
+
+
+def iter_unique_names(files: Iterable[Path]) -> Iterator[Path]:
+    """
+    Check that files have unique names as they are iterated over
+
+    Zenodo depositions have no directories,
+    so files with the same name would overwrite each other.
+
+    Parameters
+    ----------
+    files
+        Files to check
+
+    Yields
+    ------
+    :
+        Each of `files`
+
+    Raises
+    ------
+    ValueError
+        A file has the same name as an earlier file
+    """
+    seen: dict[str, Path] = {}
+    for file in files:
+        if file.name in seen:
+            msg = (
+                "Zenodo depositions can't contain two files with the same name. "
+                f"Received: {seen[file.name]} and {file}"
+            )
+            raise ValueError(msg)
+
+        seen[file.name] = file
+        yield file
@@ -0,0 +1,20 @@
+"""
+Zenodo domains
+
+This module is deliberately kept free of heavy imports
+so that it can be used when building the command-line interface
+without slowing down start-up.
+"""
+
+from __future__ import annotations
+
+from enum import Enum
+
+
+class ZenodoDomain(str, Enum):
+    """
+    Supported zenodo URLs
+    """
+
+    production = "https://zenodo.org"
+    sandbox = "https://sandbox.zenodo.org"
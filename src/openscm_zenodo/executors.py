@@ -0,0 +1,69 @@
+"""
+Helpers for running work in executors
+
+This module only uses the standard library,
+so it is cheap to import,
+e.g. in the worker processes used for compression.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+from collections import deque
+from collections.abc import Generator, Iterable
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+U = TypeVar("U")
+
+
+def iter_bounded_map(
+    func: Callable[[U], T],
+    items: Iterable[U],
+    executor: concurrent.futures.Executor,
+    max_in_flight: int,
+) -> Generator[T, None, None]:
+    """
+    Map a function over items in an executor, with a bounded number in flight
+
+    Unlike `executor.map`, which submits every item straight away,
+    items are only taken from `items` as earlier results are yielded,
+    so arbitrarily long streams can be processed in constant memory.
+
+    Parameters
+    ----------
+    func
+        Function to apply to each item
+
+    items
+        Items to process
+
+    executor
+        Executor in which to run `func`
+
+    max_in_flight
+        Maximum number of items submitted to `executor`
+        whose results haven't been yielded yet
+
+    Yields
+    ------
+    :
+        Result of `func` for each item, in the same order as `items`.
+
+        If the generator is closed early,
+        the items which haven't started are cancelled.
+    """
+    in_flight: deque[concurrent.futures.Future[T]] = deque()
+    try:
+        for item in items:
+            in_flight.append(executor.submit(func, item))
+            if len(in_flight) >= max_in_flight:
+                yield in_flight.popleft().result()
+
+        while in_flight:
+            yield in_flight.popleft().result()
+
+    finally:
+        # Don't run items which haven't started if the caller stops early
+        for future in in_flight:
+            future.cancel()
@@ -0,0 +1,379 @@
+"""
+Local index of the versions (lineage) of Zenodo concepts
+
+Resolving the latest version of a concept on Zenodo
+requires (at least) two requests.
+If you need to do this often, you can instead keep a local index
+of the versions of the concepts you care about
+and answer the question locally,
+refreshing the index from Zenodo only when needed.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Optional, Union
+
+from attrs import define, frozen
+from loguru import logger
+
+from openscm_zenodo.domains import ZenodoDomain
+
+if TYPE_CHECKING:
+    from openscm_zenodo.zenodo import ZenodoInteractor
+
+DEFAULT_LINEAGE_INDEX_PATH = (
+    Path.home() / ".cache" / "openscm-zenodo" / "lineage-index.sqlite"
+)
+"""Default location of the lineage index"""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS concepts (
+    zenodo_domain TEXT NOT NULL,
+    concept_id TEXT NOT NULL,
+    refreshed_at REAL NOT NULL,
+    PRIMARY KEY (zenodo_domain, concept_id)
+);
+CREATE TABLE IF NOT EXISTS versions (
+    zenodo_domain TEXT NOT NULL,
+    record_id TEXT NOT NULL,
+    concept_id TEXT NOT NULL,
+    doi TEXT,
+    concept_doi TEXT,
+    version TEXT,
+    publication_date TEXT,
+    is_latest INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (zenodo_domain, record_id)
+);
+CREATE INDEX IF NOT EXISTS versions_by_concept
+    ON versions (zenodo_domain, concept_id, is_latest);
+"""
+
+
+@frozen
+class LineageEntry:
+    """
+    Entry in the lineage index, i.e. a single version of a concept
+    """
+
+    record_id: str
+    """ID of the record (i.e. this version)"""
+
+    concept_id: str
+    """ID of the concept to which this version belongs"""
+
+    doi: Optional[str]
+    """DOI of this version"""
+
+    concept_doi: Optional[str]
+    """DOI of the concept"""
+
+    version: Optional[str]
+    """Version string from the record's metadata"""
+
+    publication_date: Optional[str]
+    """Publication date of this version"""
+
+    is_latest: bool
+    """Whether this is the latest version of the concept"""
+
+
+@define
+class LineageIndex:
+    """
+    Local, refreshable index of concept ID to version lineage
+
+    The index is stored in SQLite.
+    Entries are keyed by Zenodo domain too,
+    so a single index can hold records from both production and the sandbox.
+    """
+
+    path: Path = DEFAULT_LINEAGE_INDEX_PATH
+    """Path to the SQLite database which holds the index"""
+
+    zenodo_domain: Union[str, ZenodoDomain] = ZenodoDomain.production
+    """Zenodo domain of the records in this index"""
+
+    @property
+    def _domain(self) -> str:
+        if isinstance(self.zenodo_domain, ZenodoDomain):
+            return self.zenodo_domain.value
+
+        return self.zenodo_domain
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = sqlite3.connect(self.path)
+        try:
+            connection.executescript(_SCHEMA)
+            with connection:
+                yield connection
+
+        finally:
+            connection.close()
+
+    def get_concept_id(self, any_id: str) -> Union[str, None]:
+        """
+        Get the concept ID for an ID, using only the local index
+
+        Parameters
+        ----------
+        any_id
+            Any record ID in the concept, or the concept ID itself
+
+        Returns
+        -------
+        :
+            Concept ID.
+            `None` if `any_id` is not in the index.
+        """
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT concept_id FROM concepts "
+                "WHERE zenodo_domain = ? AND concept_id = ? "
+                "UNION ALL "
+                "SELECT concept_id FROM versions "
+                "WHERE zenodo_domain = ? AND record_id = ? "
+                "LIMIT 1",
+                (self._domain, any_id, self._domain, any_id),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return str(row[0])
+
+    def get_versions(self, concept_id: str) -> tuple[LineageEntry, ...]:
+        """
+        Get all the indexed versions of a concept
+
+        Parameters
+        ----------
+        concept_id
+            Concept ID
+
+        Returns
+        -------
+        :
+            Indexed versions, latest first
+        """
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT record_id, concept_id, doi, concept_doi, version, "
+                "publication_date, is_latest FROM versions "
+                "WHERE zenodo_domain = ? AND concept_id = ? "
+                "ORDER BY is_latest DESC, publication_date DESC, "
+                "CAST(record_id AS INTEGER) DESC",
+                (self._domain, concept_id),
+            ).fetchall()
+
+        return tuple(
+            LineageEntry(
+                record_id=row[0],
+                concept_id=row[1],
+                doi=row[2],
+                concept_doi=row[3],
+                version=row[4],
+                publication_date=row[5],
+                is_latest=bool(row[6]),
+            )
+            for row in rows
+        )
+
+    def get_refreshed_at(self, concept_id: str) -> Union[float, None]:
+        """
+        Get the time at which a concept was last refreshed
+
+        Parameters
+        ----------
+        concept_id
+            Concept ID
+
+        Returns
+        -------
+        :
+            Time of the last refresh, in seconds since the epoch.
+            `None` if the concept has never been refreshed.
+        """
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT refreshed_at FROM concepts "
+                "WHERE zenodo_domain = ? AND concept_id = ?",
+                (self._domain, concept_id),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return float(row[0])
+
+    def refresh(
+        self,
+        concept_id: str,
+        zenodo_interactor: ZenodoInteractor,
+        full: bool = False,
+    ) -> tuple[LineageEntry, ...]:
+        """
+        Refresh the index for a concept from Zenodo
+
+        By default, the refresh is incremental.
+        Versions are retrieved newest first
+        and we stop as soon as we reach a version that is already in the index,
+        so a refresh with no new versions costs a single request.
+
+        Parameters
+        ----------
+        concept_id
+            Concept ID to refresh
+
+        zenodo_interactor
+            Object to use to interact with Zenodo
+
+        full
+            Retrieve all versions, even if some are already in the index
+
+        Returns
+        -------
+        :
+            Versions which were added to the index, latest first
+        """
+        logger.info(f"Refreshing lineage index for {concept_id=!r} ({full=})")
+        known_record_ids = {v.record_id for v in self.get_versions(concept_id)}
+
+        new_entries: list[LineageEntry] = []
+        for record in zenodo_interactor.iter_versions(
+            concept_id,
+            # Incremental refreshes usually only need the first few versions
+            page_size=100 if full else 10,
+        ):
+            record_id = str(record["id"])
+            if not full and record_id in known_record_ids:
+                break
+
+            metadata = record.get("metadata", {})
+            new_entries.append(
+                LineageEntry(
+                    record_id=record_id,
+                    concept_id=concept_id,
+                    doi=record.get("doi"),
+                    concept_doi=record.get("conceptdoi"),
+                    version=metadata.get("version"),
+                    publication_date=metadata.get("publication_date"),
+                    # Versions come back newest first
+                    is_latest=not new_entries,
+                )
+            )
+
+        with self._connect() as connection:
+            if new_entries:
+                connection.execute(
+                    "UPDATE versions SET is_latest = 0 "
+                    "WHERE zenodo_domain = ? AND concept_id = ?",
+                    (self._domain, concept_id),
+                )
+                connection.executemany(
+                    "INSERT OR REPLACE INTO versions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (
+                            self._domain,
+                            entry.record_id,
+                            entry.concept_id,
+                            entry.doi,
+                            entry.concept_doi,
+                            entry.version,
+                            entry.publication_date,
+                            int(entry.is_latest),
+                        )
+                        for entry in new_entries
+                    ],
+                )
+
+            connection.execute(
+                "INSERT OR REPLACE INTO concepts VALUES (?, ?, ?)",
+                (self._domain, concept_id, time.time()),
+            )
+
+        logger.info(
+            f"Added {len(new_entries)} version(s) of {concept_id=!r} "
+            "to the lineage index"
+        )
+
+        return tuple(new_entries)
+
+    def resolve_latest(
+        self,
+        any_id: str,
+        zenodo_interactor: Optional[ZenodoInteractor] = None,
+        max_age: Optional[float] = None,
+    ) -> LineageEntry:
+        """
+        Resolve the latest version of a concept
+
+        The answer comes from the local index if possible.
+        Zenodo is only contacted if the concept is not in the index yet
+        or its last refresh is older than `max_age`
+        (and `zenodo_interactor` is supplied).
+
+        Parameters
+        ----------
+        any_id
+            Any record ID in the concept, or the concept ID itself
+
+        zenodo_interactor
+            Object to use to interact with Zenodo if the index must be refreshed.
+
+            If not supplied, only the local index is used.
+
+        max_age
+            Maximum age, in seconds, of the concept's last refresh.
+
+            If not supplied, any age is accepted.
+
+        Returns
+        -------
+        :
+            Latest version of the concept
+
+        Raises
+        ------
+        KeyError
+            The concept is not in the index
+            and we could not refresh it because `zenodo_interactor` was not supplied.
+        """
+        concept_id = self.get_concept_id(any_id)
+
+        needs_refresh = concept_id is None
+        if concept_id is not None and max_age is not None:
+            refreshed_at = self.get_refreshed_at(concept_id)
+            needs_refresh = (
+                refreshed_at is None or (time.time() - refreshed_at) > max_age
+            )
+
+        if needs_refresh:
+            if zenodo_interactor is None:
+                msg = (
+                    f"{any_id!r} is not in the lineage index (or is out of date) "
+                    "and no `zenodo_interactor` was supplied to refresh it"
+                )
+                raise KeyError(msg)
+
+            if concept_id is None:
+                concept_id = zenodo_interactor.get_concept_id(any_id)
+
+            self.refresh(concept_id, zenodo_interactor=zenodo_interactor)
+
+        if concept_id is None:  # pragma: no cover
+            msg = "Should have a concept ID by now"
+            raise AssertionError(msg)
+
+        for entry in self.get_versions(concept_id):
+            if entry.is_latest:
+                return entry
+
+        msg = f"No published versions of {concept_id=!r} are in the lineage index"
+        raise KeyError(msg)
@@ -4,10 +4,14 @@ Logging
 
 from __future__ import annotations
 
+import queue
 import sys
+import threading
+import time
 from pathlib import Path
-from typing import TYPE_CHECKING, Optional, TypedDict, Union
+from typing import TYPE_CHECKING, Optional, TextIO, TypedDict, Union
 
+from attrs import define, field
 from loguru import logger
 
 if TYPE_CHECKING:
@@ -22,8 +26,88 @@ class ConfigLike(TypedDict):
     handlers: list[HandlerConfig]
 
 
+@define
+class QueuedSink:
+    """
+    Sink which writes messages to a stream from a background thread
+
+    Threads which log only put the message on a queue,
+    so they never wait for the stream (e.g. a slow terminal or pipe).
+    loguru's own `enqueue` option does something similar,
+    but it pickles every message so that it can work across processes,
+    which is much more expensive than we need for threads.
+
+    loguru calls [`stop`][openscm_zenodo.logging.QueuedSink.stop]
+    when the handler is removed (including at exit),
+    which writes any messages left in the queue.
+    """
+
+    stream: TextIO
+    """Stream to write messages to"""
+
+    batch_interval: float = 0.05
+    """
+    Time to wait for more messages after the first, before writing (seconds)
+
+    Writing in batches means the background thread wakes up (and competes
+    with the threads which are logging) once per batch, not once per message.
+    """
+
+    _queue: queue.SimpleQueue[Optional[str]] = field(
+        factory=queue.SimpleQueue, init=False, repr=False
+    )
+    _thread: threading.Thread = field(init=False, repr=False)
+
+    @_thread.default
+    def _thread_default(self) -> threading.Thread:
+        thread = threading.Thread(
+            target=self._write_messages, name="openscm-zenodo-logging", daemon=True
+        )
+        thread.start()
+
+        return thread
+
+    def _write_messages(self) -> None:
+        while True:
+            message = self._queue.get()
+            if message is not None:
+                time.sleep(self.batch_interval)
+
+            # Write everything that has queued up before flushing
+            while message is not None:
+                self.stream.write(message)
+                try:
+                    message = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            self.stream.flush()
+            if message is None:
+                return
+
+    def write(self, message: str) -> None:
+        """
+        Queue a message to be written
+
+        Parameters
+        ----------
+        message
+            Message to write
+        """
+        self._queue.put(message)
+
+    def stop(self) -> None:
+        """
+        Write any queued messages, then stop the background thread
+        """
+        self._queue.put(None)
+        self._thread.join()
+
+
 def get_default_config(
     level: str = "INFO",
+    enqueue: bool = False,
+    serialize: bool = False,
 ) -> ConfigLike:
     """
     Get default logging configuration
@@ -33,15 +117,37 @@ def get_default_config(
     level
         Level to apply to the logging
 
+    enqueue
+        Pass messages to stderr through a queue
+        (see [`QueuedSink`][openscm_zenodo.logging.QueuedSink]),
+        so threads which log (e.g. upload threads) never wait for stderr.
+
+    serialize
+        Write each message as a line of JSON, for ingestion by other tools,
+        rather than as colourised text.
+
     Returns
     -------
     :
         Default logging configuration
     """
+    sink: Union[TextIO, QueuedSink] = QueuedSink(sys.stderr) if enqueue else sys.stderr
+    if serialize:
+        return dict(
+            handlers=[
+                dict(
+                    sink=sink,
+                    level=level,
+                    serialize=True,
+                    format="{message}",
+                )
+            ],
+        )
+
     return dict(
         handlers=[
             dict(
-                sink=sys.stderr,
+                sink=sink,
                 level=level,
                 colorize=True,
                 format=" - ".join(
@@ -63,6 +169,8 @@ def setup_logging(
     enable: bool,
     logging_config: Optional[Union[Path, ConfigLike]] = None,
     logging_level: Optional[str] = None,
+    enqueue: bool = False,
+    serialize: bool = False,
 ) -> None:
     """
     Set up logging
@@ -87,6 +195,14 @@ def setup_logging(
 
     logging_level
         Log level to apply to the default config.
+
+    enqueue
+        Write logs through a queue with the default config
+        (see [`get_default_config`][openscm_zenodo.logging.get_default_config]).
+
+    serialize
+        Write logs as JSON with the default config
+        (see [`get_default_config`][openscm_zenodo.logging.get_default_config]).
     """
     if not enable:
         # Should already be disabled, but just in case
@@ -95,9 +211,11 @@ def setup_logging(
 
     if logging_config is None:
         if logging_level is not None:
-            config = get_default_config(level=logging_level)
+            config = get_default_config(
+                level=logging_level, enqueue=enqueue, serialize=serialize
+            )
         else:
-            config = get_default_config()
+            config = get_default_config(enqueue=enqueue, serialize=serialize)
 
         # Not sure what is going on with type hints, one for another day
         logger.configure(handlers=config["handlers"])
@@ -129,6 +247,11 @@ def setup_logging(
     if logging_config is not None and logging_level is not None:
         logger.warning("`logging_level` is ignored if `logging_config` is supplied")
 
+    if logging_config is not None and (enqueue or serialize):
+        logger.warning(
+            "`enqueue` and `serialize` are ignored if `logging_config` is supplied"
+        )
+
 
 def mask_token(input: str, token: Union[str, None]) -> str:
     """
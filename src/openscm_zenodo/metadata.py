@@ -0,0 +1,362 @@
+"""
+Local handling of deposition metadata
+
+This covers validating metadata and comparing it with what is on Zenodo.
+
+Zenodo only checks whether metadata is publishable when a deposition is published,
+i.e. after all the files have been uploaded.
+[`validate_metadata`][openscm_zenodo.metadata.validate_metadata]
+checks metadata against a bundled copy of Zenodo's rules instead,
+so that invalid metadata is caught before any uploads start.
+The bundled rules only cover part of what Zenodo checks
+and only require the keys Zenodo requires at publication,
+so validation is opt-in.
+
+Zenodo doesn't serve a schema for its deposition API,
+so the rules are a JSON schema shipped with the package.
+It is loaded once per process and cached.
+"""
+
+from __future__ import annotations
+
+import copy
+import difflib
+import functools
+import importlib.resources
+import json
+import re
+from typing import Any, Union
+
+ZENODO_CONTROLLED_METADATA_KEYS: tuple[str, ...] = (
+    "doi",
+    "imprint_publisher",
+    "prereserve_doi",
+    "publication_date",
+    "relations",
+)
+"""Metadata keys which are controlled by Zenodo, rather than the user"""
+
+METADATA_SCHEMA_FILENAME: str = "deposition-metadata-schema.json"
+"""Name of the (package data) file which holds the metadata schema"""
+
+_JSON_TYPES: dict[str, tuple[type, ...]] = {
+    "object": (dict,),
+    "array": (list,),
+    "string": (str,),
+    "number": (int, float),
+    "integer": (int,),
+    "boolean": (bool,),
+    "null": (type(None),),
+}
+
+
+class MetadataValidationError(ValueError):
+    """
+    Raised when metadata would not be accepted by Zenodo
+    """
+
+    def __init__(self, errors: list[str]) -> None:
+        self.errors = errors
+
+        error_lines = "\n".join(f"- {v}" for v in errors)
+        super().__init__(f"The metadata is not valid:\n{error_lines}")
+
+
+@functools.cache
+def get_metadata_schema() -> dict[str, Any]:
+    """
+    Get the schema against which metadata is validated
+
+    The schema is only read from disk the first time this is called.
+
+    Returns
+    -------
+    :
+        JSON schema for deposition metadata
+    """
+    schema_file = importlib.resources.files("openscm_zenodo") / METADATA_SCHEMA_FILENAME
+    schema: dict[str, Any] = json.loads(schema_file.read_text())
+
+    return schema
+
+
+def _is_type(value: Any, type_name: str) -> bool:
+    if isinstance(value, bool) and type_name in ("number", "integer"):
+        return False
+
+    return isinstance(value, _JSON_TYPES[type_name])
+
+
+def _get_schema_errors(  # noqa: PLR0912
+    value: Any, schema: dict[str, Any], location: str
+) -> list[str]:
+    """
+    Get the ways in which a value doesn't match a schema
+
+    Only the parts of JSON schema used by the metadata schema are supported
+    (type, enum, const, required, properties, items, minItems, minLength,
+    pattern and allOf of if/then).
+    """
+    if "type" in schema:
+        type_names = (
+            schema["type"] if isinstance(schema["type"], list) else [schema["type"]]
+        )
+        if not any(_is_type(value, v) for v in type_names):
+            return [f"{location}: expected {' or '.join(type_names)}, got {value!r}"]
+
+    if "enum" in schema and value not in schema["enum"]:
+        return [f"{location}: {value!r} is not one of {schema['enum']}"]
+
+    if "const" in schema and value != schema["const"]:
+        return [f"{location}: expected {schema['const']!r}, got {value!r}"]
+
+    errors: list[str] = []
+    if isinstance(value, dict):
+        errors.extend(
+            f"{location}: missing required key {k!r}"
+            for k in schema.get("required", [])
+            if k not in value
+        )
+        for k, sub_schema in schema.get("properties", {}).items():
+            if k in value:
+                errors.extend(
+                    _get_schema_errors(value[k], sub_schema, f"{location}.{k}")
+                )
+
+    if isinstance(value, list):
+        if len(value) < schema.get("minItems", 0):
+            errors.append(f"{location}: expected at least {schema['minItems']} item(s)")
+
+        if "items" in schema:
+            for i, item in enumerate(value):
+                errors.extend(
+                    _get_schema_errors(item, schema["items"], f"{location}[{i}]")
+                )
+
+    if isinstance(value, str):
+        if len(value) < schema.get("minLength", 0):
+            errors.append(f"{location}: must not be empty")
+
+        if "pattern" in schema and not re.search(schema["pattern"], value):
+            errors.append(f"{location}: {value!r} does not match {schema['pattern']!r}")
+
+    for condition in schema.get("allOf", []):
+        if "if" in condition:
+            if not _get_schema_errors(value, condition["if"], location):
+                errors.extend(_get_schema_errors(value, condition["then"], location))
+
+        else:
+            errors.extend(_get_schema_errors(value, condition, location))
+
+    return errors
+
+
+def get_metadata_errors(metadata: Any) -> list[str]:
+    """
+    Get the reasons why Zenodo would not accept some metadata
+
+    Parameters
+    ----------
+    metadata
+        Metadata, in the form used with the Zenodo API
+        (i.e. with a top-level "metadata" key)
+
+    Returns
+    -------
+    :
+        Reasons why the metadata is not valid.
+        If this is empty, the metadata is valid.
+    """
+    return _get_schema_errors(metadata, get_metadata_schema(), location="$")
+
+
+def validate_metadata(metadata: Any) -> None:
+    """
+    Validate metadata
+
+    Parameters
+    ----------
+    metadata
+        Metadata, in the form used with the Zenodo API
+        (i.e. with a top-level "metadata" key)
+
+    Raises
+    ------
+    MetadataValidationError
+        The metadata is not valid
+    """
+    errors = get_metadata_errors(metadata)
+    if errors:
+        raise MetadataValidationError(errors)
+
+
+def get_user_controlled_metadata(metadata: Any) -> Any:
+    """
+    Get the parts of metadata which the user controls
+
+    Parameters
+    ----------
+    metadata
+        Metadata, in the form used with the Zenodo API
+        (i.e. with a top-level "metadata" key)
+
+    Returns
+    -------
+    :
+        Copy of `metadata`, without the keys in
+        [`ZENODO_CONTROLLED_METADATA_KEYS`][openscm_zenodo.metadata.ZENODO_CONTROLLED_METADATA_KEYS]
+    """
+    out = copy.deepcopy(metadata)
+    for k in ZENODO_CONTROLLED_METADATA_KEYS:
+        out["metadata"].pop(k, None)
+
+    return out
+
+
+def get_metadata_diff(current: Any, desired: Any) -> str:
+    """
+    Get the differences between two sets of metadata
+
+    Keys which are controlled by Zenodo are ignored,
+    so metadata retrieved from Zenodo can be compared directly
+    with metadata written by hand.
+
+    Parameters
+    ----------
+    current
+        Current metadata, e.g. retrieved from Zenodo
+
+    desired
+        Desired metadata
+
+    Returns
+    -------
+    :
+        Differences, as a unified diff of the metadata's JSON.
+        If the metadata is the same, this is an empty string.
+    """
+    current_lines, desired_lines = (
+        json.dumps(
+            get_user_controlled_metadata(v), indent=2, sort_keys=True
+        ).splitlines(keepends=True)
+        for v in (current, desired)
+    )
+
+    return "".join(
+        difflib.unified_diff(
+            current_lines, desired_lines, fromfile="current", tofile="desired"
+        )
+    )
+
+
+class MetadataPatchError(ValueError):
+    """
+    Raised when a patch can't be applied to metadata
+    """
+
+
+def _resolve_pointer(document: Any, pointer: str) -> tuple[Any, str]:
+    """
+    Get the container and key which a JSON pointer refers to
+    """
+    if not pointer.startswith("/"):
+        msg = f"Paths must start with '/', received {pointer=!r}"
+        raise MetadataPatchError(msg)
+
+    *parents, last = (
+        v.replace("~1", "/").replace("~0", "~") for v in pointer[1:].split("/")
+    )
+    container = document
+    for key in parents:
+        try:
+            container = container[int(key) if isinstance(container, list) else key]
+        except (KeyError, IndexError, ValueError, TypeError) as exc:
+            msg = f"{pointer=!r} does not exist"
+            raise MetadataPatchError(msg) from exc
+
+    return container, last
+
+
+def _get_index(container: Any, key: str, append: bool) -> Union[int, str, None]:
+    """
+    Get the index into a container for the last part of a JSON pointer
+
+    `None` is returned if `key` can't index into `container`.
+    """
+    if isinstance(container, dict):
+        return key
+
+    if isinstance(container, list) and key == "-" and append:
+        return len(container)
+
+    if isinstance(container, list) and key.isdigit():
+        return int(key)
+
+    return None
+
+
+def apply_metadata_patch(metadata: Any, patch: list[dict[str, Any]]) -> Any:
+    """
+    Apply a patch to metadata
+
+    The patch is a list of operations in the style of JSON patch
+    ([RFC 6902](https://datatracker.ietf.org/doc/html/rfc6902)),
+    e.g. `[{"op": "add", "path": "/metadata/keywords/-", "value": "climate"}]`.
+    The "add", "remove", "replace" and "test" operations are supported.
+
+    Parameters
+    ----------
+    metadata
+        Metadata to patch
+
+    patch
+        Operations to apply, in order
+
+    Returns
+    -------
+    :
+        Patched copy of `metadata`
+
+    Raises
+    ------
+    MetadataPatchError
+        An operation could not be applied (or a "test" operation failed)
+    """
+    out = copy.deepcopy(metadata)
+    for operation in patch:
+        op = operation.get("op")
+        if op not in ("add", "remove", "replace", "test"):
+            msg = f"Unsupported operation {op=!r}"
+            raise MetadataPatchError(msg)
+
+        container, key = _resolve_pointer(out, operation.get("path", ""))
+        index = _get_index(container, key, append=op == "add")
+        if index is None:
+            msg = f"Could not apply {operation=!r}, the path does not exist"
+            raise MetadataPatchError(msg)
+
+        if op == "add":
+            if isinstance(container, list):
+                container.insert(int(index), copy.deepcopy(operation["value"]))
+            else:
+                container[index] = copy.deepcopy(operation["value"])
+
+            continue
+
+        try:
+            current = container[index]
+        except (KeyError, IndexError) as exc:
+            msg = f"Could not apply {operation=!r}, the path does not exist"
+            raise MetadataPatchError(msg) from exc
+
+        if op == "remove":
+            del container[index]
+
+        elif op == "replace":
+            container[index] = copy.deepcopy(operation["value"])
+
+        elif current != operation["value"]:
+            msg = f"Test failed, {operation=!r} but the value is {current!r}"
+            raise MetadataPatchError(msg)
+
+    return out
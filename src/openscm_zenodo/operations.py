@@ -0,0 +1,678 @@
+"""
+Operations which can be run by name
+
+These mirror the commands of our command-line interface,
+but take and return JSON-compatible values.
+This allows them to be sent to a long-running server
+(see [`openscm_zenodo.server`][openscm_zenodo.server])
+or read from a stream of operations.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+from loguru import logger
+
+from openscm_zenodo.compression import COMPRESSION_MANIFEST_FILENAME, CompressionMethod
+from openscm_zenodo.concurrency import (
+    DEFAULT_RUN_LOG_PATH,
+    AdaptiveConcurrency,
+    append_to_run_log,
+    read_last_concurrency,
+)
+from openscm_zenodo.discovery import (
+    DEFAULT_DISCOVERY_THREADS,
+    get_file_filter,
+    iter_files,
+    iter_unique_names,
+)
+from openscm_zenodo.domains import ZenodoDomain
+from openscm_zenodo.metadata import get_metadata_diff, validate_metadata
+from openscm_zenodo.shards import ShardManifest, parse_shard, verify_deposition_files
+from openscm_zenodo.sync import RemoteFile
+from openscm_zenodo.zenodo import (
+    MetadataType,
+    ZenodoInteractor,
+    create_new_version,
+    get_reserved_doi,
+)
+
+
+def retrieve_metadata_operation(
+    zenodo_interactor: ZenodoInteractor,
+    deposition_id: str,
+    user_controlled_only: bool = False,
+) -> MetadataType:
+    """
+    Retrieve metadata
+
+    Parameters
+    ----------
+    zenodo_interactor
+        Object to use to interact with Zenodo
+
+    deposition_id
+        ID of the deposition
+
+    user_controlled_only
+        Only return metadata keys that the user can control
+
+    Returns
+    -------
+    :
+        Metadata
+    """
+    return zenodo_interactor.get_metadata(
+        deposition_id, user_controlled_only=user_controlled_only
+    )
+
+
+def retrieve_bibtex_operation(
+    zenodo_interactor: ZenodoInteractor,
+    deposition_id: str,
+) -> str:
+    """
+    Retrieve bibtex entry
+
+    Parameters
+    ----------
+    zenodo_interactor
+        Object to use to interact with Zenodo
+
+    deposition_id
+        ID of the deposition
+
+    Returns
+    -------
+    :
+        Bibtex entry
+    """
+    return zenodo_interactor.get_bibtex_entry(deposition_id)
+
+
+def update_metadata_operation(  # noqa: PLR0913
+    zenodo_interactor: ZenodoInteractor,
+    deposition_id: str,
+    metadata: MetadataType,
+    reserve_doi: bool = False,
+    validate: bool = False,
+    skip_unchanged: bool = True,
+) -> Union[str, None]:
+    """
+    Update metadata
+
+    Parameters
+    ----------
+    zenodo_interactor
+        Object to use to interact with Zenodo
+
+    deposition_id
+        ID of the deposition
+
+    metadata
+        Metadata to apply
+
+    reserve_doi
+        Reserve a DOI while updating the metadata.
+
+        This overwrites any value of "prereserve_doi" in `metadata`.
+
+    validate
+        Validate `metadata` locally before sending it to Zenodo
+        (see [`validate_metadata`][openscm_zenodo.metadata.validate_metadata])
+
+    skip_unchanged
+        Don't send `metadata` to Zenodo if it is the same as the current metadata
+        (see [`get_metadata_diff`][openscm_zenodo.metadata.get_metadata_diff])
+
+    Returns
+    -------
+    :
+        The reserved DOI if `reserve_doi` is `True`, otherwise `None`
+    """
+    if validate:
+        validate_metadata(metadata)
+
+    if reserve_doi:
+        if (
+            "prereserve_doi" in metadata["metadata"]
+            and not metadata["metadata"]["prereserve_doi"]
+        ):
+            logger.warning(
+                f"The supplied metadata has {metadata['metadata']['prereserve_doi']=}, "
+                "this will be overwritten by the `--reserve-doi` flag"
+            )
+
+        # Type ignore as our metadata type hint is too narrow
+        metadata["metadata"]["prereserve_doi"] = True  # type: ignore[assignment]
+
+    if skip_unchanged:
+        deposition_response = zenodo_interactor.get_deposition(deposition_id)
+        current_metadata = {"metadata": deposition_response.json()["metadata"]}
+
+    if not skip_unchanged or (
+        # Reserving a DOI needs an update, even if nothing else has changed
+        reserve_doi and "prereserve_doi" not in current_metadata["metadata"]
+    ):
+        update_metadata_response = zenodo_interactor.update_metadata(
+            deposition_id, metadata=metadata
+        )
+
+    else:
+        update_metadata_response = (
+            zenodo_interactor.update_metadata_if_changed(
+                deposition_id, metadata=metadata, current_metadata=current_metadata
+            )
+            # The deposition has the reserved DOI if nothing was updated
+            or deposition_response
+        )
+
+    if reserve_doi:
+        return get_reserved_doi(update_metadata_response)
+
+    return None
+
+
+def diff_metadata_operation(
+    zenodo_interactor: ZenodoInteractor,
+    deposition_id: str,
+    metadata: MetadataType,
+) -> str:
+    """
+    Get the differences between a deposition's metadata and some other metadata
+
+    Parameters
+    ----------
+    zenodo_interactor
+        Object to use to interact with Zenodo
+
+    deposition_id
+        ID of the deposition
+
+    metadata
+        Metadata to compare with the deposition's metadata
+
+    Returns
+    -------
+    :
+        Differences, an empty string if there are none
+        (see [`get_metadata_diff`][openscm_zenodo.metadata.get_metadata_diff])
+    """
+    return get_metadata_diff(zenodo_interactor.get_metadata(deposition_id), metadata)
+
+
+def upload_files_operation(  # noqa: PLR0913
+    zenodo_interactor: ZenodoInteractor,
+    deposition_id: str,
+    files_to_upload: list[str],
+    n_threads: int = 4,
+    use_mmap: bool = False,
+    compression: Optional[str] = None,
+    compression_manifest: bool = False,
+    adaptive: bool = False,
+    run_log: Optional[str] = None,
+    fail_fast: bool = True,
+    compression_processes: Optional[int] = None,
+    include: Optional[list[str]] = None,
+    exclude: Optional[list[str]] = None,
+    ignore_file: Optional[str] = None,
+    discovery_threads: int = DEFAULT_DISCOVERY_THREADS,
+) -> list[str]:
+    """
+    Upload files to a deposition
+
+    Parameters
+    ----------
+    zenodo_interactor
+        Object to use to interact with Zenodo
+
+    deposition_id
+        ID of the deposition
+
+    files_to_upload
+        Paths of the files (or directories) to upload.
+
+        Directories are walked (see
+        [`iter_files`][openscm_zenodo.discovery.iter_files])
+        and the files in them are uploaded as they are found.
+
+    n_threads
+        Number of threads to use for the uploads
+
+    use_mmap
+        Send the files from memory maps
+
+    compression
+        Compression method to apply while uploading
+        (see [`CompressionMethod`][openscm_zenodo.compression.CompressionMethod])
+
+    compression_manifest
+        Also upload a manifest describing the compressed files
+
+    adaptive
+        Tune the number of uploads in flight based on the observed throughput
+        (see [`AdaptiveConcurrency`][openscm_zenodo.concurrency.AdaptiveConcurrency]),
+        rather than using `n_threads`.
+
+        The tuning starts from the level chosen by the last run in `run_log`
+        and the chosen level is written back to `run_log`.
+
+    run_log
+        Path to the run log.
+
+        If not supplied, we use
+        [`DEFAULT_RUN_LOG_PATH`][openscm_zenodo.concurrency.DEFAULT_RUN_LOG_PATH].
+
+    fail_fast
+        Cancel the rest of the uploads as soon as one fails,
+        rather than attempting every upload
+
+    compression_processes
+        If supplied, do gzip compression in a pool of this many processes
+
+    include
+        Glob patterns of the files to upload from directories
+        (see [`FileFilter`][openscm_zenodo.discovery.FileFilter])
+
+    exclude
+        Glob patterns of the files (and directories) to skip in directories
+
+    ignore_file
+        Path to a file with more patterns to skip, one per line
+
+    discovery_threads
+        Number of threads to use to walk directories
+
+    Returns
+    -------
+    :
+        Names of the uploaded files
+    """
+    paths = [Path(f) for f in files_to_upload]
+    # Filled as the files are found, if any need to be found
+    to_upload: list[Path] = []
+    uploading: Iterable[Path]
+    if include or exclude or ignore_file or any(p.is_dir() for p in paths):
+        file_filter = get_file_filter(
+            include, exclude, Path(ignore_file) if ignore_file is not None else None
+        )
+
+        def iter_found() -> Iterator[Path]:
+            for file in iter_unique_names(
+                iter_files(paths, file_filter=file_filter, n_threads=discovery_threads)
+            ):
+                to_upload.append(file)
+                yield file
+
+        uploading = iter_found()
+
+    else:
+        to_upload = paths
+        uploading = paths
+
+    compression_method = (
+        CompressionMethod(compression) if compression is not None else None
+    )
+
+    if adaptive:
+        run_log_path = Path(run_log) if run_log is not None else DEFAULT_RUN_LOG_PATH
+        zenodo_domain = (
+            zenodo_interactor.zenodo_domain.value
+            if isinstance(zenodo_interactor.zenodo_domain, ZenodoDomain)
+            else zenodo_interactor.zenodo_domain
+        )
+        adaptive_concurrency = AdaptiveConcurrency()
+        last_limit = read_last_concurrency(zenodo_domain, run_log=run_log_path)
+        if last_limit is not None:
+            logger.info(f"Starting from the last chosen level ({last_limit} uploads)")
+            adaptive_concurrency.limit = last_limit
+
+    else:
+        adaptive_concurrency = None
+
+    zenodo_interactor.upload_files(
+        deposition_id,
+        to_upload=uploading,
+        n_threads=n_threads,
+        use_mmap=use_mmap,
+        compression=compression_method,
+        compression_manifest=compression_manifest,
+        adaptive_concurrency=adaptive_concurrency,
+        fail_fast=fail_fast,
+        compression_processes=compression_processes,
+    )
+
+    if adaptive_concurrency is not None and adaptive_concurrency.best_limit is not None:
+        append_to_run_log(
+            {
+                "operation": "upload-files",
+                "zenodo_domain": zenodo_domain,
+                "n_files": len(to_upload),
+                "n_bytes": sum(f.stat().st_size for f in to_upload),
+                "n_threads": adaptive_concurrency.limit,
+                "best_throughput": adaptive_concurrency.best_throughput,
+                "n_throttled": adaptive_concurrency.n_throttled,
+            },
+            run_log=run_log_path,
+        )
+
+    if compression_method is None:
+        return [f.name for f in to_upload]
+
+    uploaded = [f"{f.name}{compression_method.suffix}" for f in to_upload]
+    if compression_manifest:
+        uploaded.append(COMPRESSION_MANIFEST_FILENAME)
+
+    return uploaded
+
+
+def remove_files_operation(
+    zenodo_interactor: ZenodoInteractor,
+    deposition_id: str,
+    files_to_remove: Optional[list[str]] = None,
+    all: bool = False,
+) -> int:
+    """
+    Remove files from a deposition
+
+    Parameters
+    ----------
+    zenodo_interactor
+        Object to use to interact with Zenodo
+
+    deposition_id
+        ID of the deposition
+
+    files_to_remove
+        Files to remove
+
+    all
+        Remove all files
+
+    Returns
+    -------
+    :
+        Number of removed files
+    """
+    if all:
+        responses = zenodo_interactor.remove_all_files(deposition_id)
+
+    else:
+        if not files_to_remove:
+            msg = "If not using `all`, you must supply files to remove"
+            raise ValueError(msg)
+
+        responses = zenodo_interactor.remove_files(
+            deposition_id, to_remove=[Path(f) for f in files_to_remove]
+        )
+
+    return len(responses)
+
+
+def create_new_version_operation(  # noqa: PLR0913
+    zenodo_interactor: ZenodoInteractor,
+    any_deposition_id: str,
+    metadata: Optional[MetadataType] = None,
+    publish: bool = False,
+    files_to_upload: Optional[list[str]] = None,
+    n_threads: int = 4,
+    incremental: bool = False,
+    checkpoint: Optional[str] = None,
+    resume: bool = False,
+    validate: bool = False,
+) -> str:
+    """
+    Create a new version of a record
+
+    Parameters
+    ----------
+    zenodo_interactor
+        Object to use to interact with Zenodo
+
+    any_deposition_id
+        Any deposition ID in the record
+
+    metadata
+        Metadata to apply to the new version
+
+    publish
+        Publish the new version
+
+    files_to_upload
+        Paths of the files to upload to the new version
+
+    n_threads
+        Number of threads to use for the uploads
+
+    incremental
+        Re-use files carried over from the previous version where possible
+
+    checkpoint
+        Path of the file in which to record the progress of the release
+
+    resume
+        Resume the release recorded in `checkpoint`
+
+    validate
+        Validate `metadata` locally before creating the new version
+
+    Returns
+    -------
+    :
+        Deposition ID of the new version
+    """
+    return create_new_version(
+        any_deposition_id=any_deposition_id,
+        zenodo_interactor=zenodo_interactor,
+        metadata=metadata,
+        publish=publish,
+        files_to_upload=(
+            [Path(f) for f in files_to_upload] if files_to_upload is not None else None
+        ),
+        n_threads=n_threads,
+        incremental=incremental,
+        checkpoint=Path(checkpoint) if checkpoint is not None else None,
+        resume=resume,
+        validate=validate,
+    )
+
+
+def upload_shard_operation(  # noqa: PLR0913
+    zenodo_interactor: ZenodoInteractor,
+    deposition_id: str,
+    manifest_file: str,
+    shard: str,
+    n_threads: int = 4,
+    fail_fast: bool = True,
+) -> list[str]:
+    """
+    Upload one shard of the files in a manifest to a deposition
+
+    Files which are already in the deposition with the right checksum
+    (e.g. from an earlier, interrupted run of the same shard) are skipped
+    and files which are in the deposition with the wrong checksum are replaced.
+
+    Parameters
+    ----------
+    zenodo_interactor
+        Object to use to interact with Zenodo
+
+    deposition_id
+        ID of the deposition (the draft shared by every shard)
+
+    manifest_file
+        Path to the manifest of the files to upload
+        (see [`ShardManifest`][openscm_zenodo.shards.ShardManifest])
+
+    shard
+        Shard to upload, of the form "i/N" (counting from 1)
+
+    n_threads
+        Number of threads to use for the uploads
+
+    fail_fast
+        Cancel the rest of the uploads as soon as one fails
+
+    Returns
+    -------
+    :
+        Names of the uploaded files
+
+    Raises
+    ------
+    ValueError
+        A file's size differs from its size in the manifest
+    """
+    index, n_shards = parse_shard(shard)
+    entries = ShardManifest.from_file(Path(manifest_file)).get_shard(index, n_shards)
+    for entry in entries:
+        if entry.path.stat().st_size != entry.size:
+            msg = (
+                f"{entry.path} has changed since the manifest was created "
+                f"(it is {entry.path.stat().st_size} bytes, "
+                f"the manifest says {entry.size} bytes)"
+            )
+            raise ValueError(msg)
+
+    remote_by_name = {
+        v["filename"]: RemoteFile.from_zenodo_json(v)
+        for v in zenodo_interactor.get_files(deposition_id)
+    }
+    to_upload = [
+        v
+        for v in entries
+        if v.name not in remote_by_name or remote_by_name[v.name].checksum != v.checksum
+    ]
+    logger.info(
+        f"Shard {shard} has {len(entries)} file(s), "
+        f"{len(entries) - len(to_upload)} already uploaded"
+    )
+
+    to_replace = [
+        remote_by_name[v.name].id for v in to_upload if v.name in remote_by_name
+    ]
+    if to_replace:
+        # Zenodo won't let us upload a file with the same name as an existing one
+        zenodo_interactor.remove_files_by_id(
+            deposition_id=deposition_id, file_ids_to_remove=to_replace
+        )
+
+    if to_upload:
+        zenodo_interactor.upload_files(
+            deposition_id,
+            to_upload=[v.path for v in to_upload],
+            n_threads=n_threads,
+            fail_fast=fail_fast,
+        )
+
+    return [v.name for v in to_upload]
+
+
+def verify_uploads_operation(
+    zenodo_interactor: ZenodoInteractor,
+    deposition_id: str,
+    manifest_file: str,
+    publish: bool = False,
+) -> list[str]:
+    """
+    Verify that a deposition holds exactly the files in a manifest
+
+    This is the step which coordinates sharded uploads:
+    run it once every shard has been uploaded
+    (see [`upload_shard_operation`][openscm_zenodo.operations.upload_shard_operation]).
+
+    Parameters
+    ----------
+    zenodo_interactor
+        Object to use to interact with Zenodo
+
+    deposition_id
+        ID of the deposition
+
+    manifest_file
+        Path to the manifest of the files the deposition should hold
+
+    publish
+        Publish the deposition if (and only if) it holds exactly the right files
+
+    Returns
+    -------
+    :
+        Problems with the deposition's files, an empty list if there are none
+        (see [`ManifestVerification`][openscm_zenodo.shards.ManifestVerification])
+    """
+    verification = verify_deposition_files(
+        ShardManifest.from_file(Path(manifest_file)),
+        remote_files=[
+            RemoteFile.from_zenodo_json(v)
+            for v in zenodo_interactor.get_files(deposition_id)
+        ],
+    )
+    if not verification.is_complete:
+        logger.warning(
+            f"{deposition_id=!r} does not match the manifest: "
+            f"{len(verification.missing)} missing, "
+            f"{len(verification.mismatched)} mismatched, "
+            f"{len(verification.unexpected)} unexpected"
+        )
+
+        return list(verification.to_lines())
+
+    logger.info(f"Verified all {verification.n_verified} file(s) in {deposition_id=!r}")
+    if publish:
+        zenodo_interactor.publish(deposition_id)
+
+    return []
+
+
+OPERATIONS: dict[str, Callable[..., Any]] = {
+    "retrieve-metadata": retrieve_metadata_operation,
+    "retrieve-bibtex": retrieve_bibtex_operation,
+    "update-metadata": update_metadata_operation,
+    "diff-metadata": diff_metadata_operation,
+    "upload-files": upload_files_operation,
+    "upload-shard": upload_shard_operation,
+    "verify-uploads": verify_uploads_operation,
+    "remove-files": remove_files_operation,
+    "create-new-version": create_new_version_operation,
+}
+"""Known operations, keyed by the name of the matching command"""
+
+
+def run_operation(
+    operation: str,
+    zenodo_interactor: ZenodoInteractor,
+    arguments: dict[str, Any],
+) -> Any:
+    """
+    Run an operation by name
+
+    Parameters
+    ----------
+    operation
+        Name of the operation to run
+
+    zenodo_interactor
+        Object to use to interact with Zenodo
+
+    arguments
+        Arguments to pass to the operation
+
+    Returns
+    -------
+    :
+        Result of the operation (JSON-compatible)
+
+    Raises
+    ------
+    KeyError
+        `operation` is not a known operation
+    """
+    if operation not in OPERATIONS:
+        msg = f"Unknown {operation=!r}. Known operations: {sorted(OPERATIONS)}"
+        raise KeyError(msg)
+
+    return OPERATIONS[operation](zenodo_interactor, **arguments)
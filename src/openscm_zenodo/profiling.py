@@ -0,0 +1,163 @@
+"""
+Profiling of commands
+
+[`CommandProfiler`][openscm_zenodo.profiling.CommandProfiler]
+profiles everything that happens while it is running,
+including in threads started while it runs (e.g. upload threads),
+and writes the result in pstats format.
+This can be explored with the standard library's `pstats` module
+or turned into a flamegraph with tools like
+[snakeviz](https://jiffyclub.github.io/snakeviz/) or
+[flameprof](https://github.com/baverman/flameprof).
+"""
+
+from __future__ import annotations
+
+import cProfile
+import pstats
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+from attrs import define, field
+
+PROFILE_ALL_THREADS_AT_ONCE: bool = sys.version_info >= (3, 12)
+"""
+Whether a single profiler sees every thread
+
+From Python 3.12, cProfile uses `sys.monitoring`,
+which sees every thread but only allows one profiler at a time.
+Before that, a profiler only sees the thread which enabled it,
+so we need one profiler per thread.
+"""
+
+
+@define
+class CommandProfiler:
+    """
+    Deterministic (cProfile-based) profiler for a command
+    """
+
+    output_file: Path
+    """File in which to write the profile (pstats format)"""
+
+    _profiles: list[cProfile.Profile] = field(factory=list, init=False, repr=False)
+    _lock: threading.Lock = field(factory=threading.Lock, init=False, repr=False)
+
+    def _profile_new_thread(self, frame: Any, event: str, arg: Any) -> None:
+        # Called on the first event in each new thread.
+        # Enabling the profiler replaces this function for the thread.
+        profile = cProfile.Profile()
+        with self._lock:
+            self._profiles.append(profile)
+
+        profile.enable()
+
+    def start(self) -> None:
+        """
+        Start profiling
+        """
+        if not PROFILE_ALL_THREADS_AT_ONCE:
+            threading.setprofile(self._profile_new_thread)
+
+        profile = cProfile.Profile()
+        self._profiles.append(profile)
+        profile.enable()
+
+    def stop(self) -> pstats.Stats:
+        """
+        Stop profiling and write the profile to `self.output_file`
+
+        Returns
+        -------
+        :
+            Profile, combined across all threads
+        """
+        if not PROFILE_ALL_THREADS_AT_ONCE:
+            threading.setprofile(None)
+
+        with self._lock:
+            profiles = list(self._profiles)
+
+        for profile in profiles:
+            profile.disable()
+
+        stats = pstats.Stats(profiles[0])
+        for profile in profiles[1:]:
+            stats.add(profile)
+
+        self.output_file.parent.mkdir(parents=True, exist_ok=True)
+        stats.dump_stats(self.output_file)
+
+        return stats
+
+
+def get_method_timings(stats: pstats.Stats, cls: type) -> list[tuple[str, int, float]]:
+    """
+    Get the time spent in each method of a class
+
+    Parameters
+    ----------
+    stats
+        Profile
+
+    cls
+        Class of interest
+
+    Returns
+    -------
+    :
+        Name, number of calls and cumulative wall time (seconds)
+        of each method which was called, slowest first.
+
+        Times are summed across threads,
+        so methods which run in several threads at once
+        can take longer in total than the command itself.
+    """
+    keys = {}
+    for name, value in vars(cls).items():
+        code = getattr(value, "__code__", None)
+        if code is not None:
+            keys[(code.co_filename, code.co_firstlineno, code.co_name)] = name
+
+    # stats.stats isn't in the type stubs, but is the documented way to get the data
+    raw: dict[tuple[str, int, str], tuple[Any, ...]] = stats.stats  # type: ignore[attr-defined]
+    timings = [
+        (keys[key], n_calls, cumulative_time)
+        for key, (_, n_calls, _, cumulative_time, _) in raw.items()
+        if key in keys
+    ]
+
+    return sorted(timings, key=lambda v: v[2], reverse=True)
+
+
+def format_method_timings(
+    timings: list[tuple[str, int, float]], title: Optional[str] = None
+) -> str:
+    """
+    Format method timings as a table
+
+    Parameters
+    ----------
+    timings
+        Timings to format
+        (see [`get_method_timings`][openscm_zenodo.profiling.get_method_timings])
+
+    title
+        Title of the table
+
+    Returns
+    -------
+    :
+        Formatted table
+    """
+    name_width = max([len("method"), *(len(v[0]) for v in timings)])
+    lines = [] if title is None else [title]
+    lines.append(f"{'method':<{name_width}} {'calls':>8} {'time (s)':>10}")
+    lines.extend(
+        f"{name:<{name_width}} {n_calls:>8} {cumulative_time:>10.3f}"
+        for name, n_calls, cumulative_time in timings
+    )
+
+    return "\n".join(lines)
@@ -0,0 +1,278 @@
+"""
+Long-running local server
+
+Running a command in a fresh process means paying for Python start-up,
+imports and new TLS connections to Zenodo every time.
+The server keeps warm [`ZenodoInteractor`][openscm_zenodo.zenodo.ZenodoInteractor]s
+(with pooled connections and caches) around
+and runs [operations][openscm_zenodo.operations] sent to it over HTTP.
+Use [`ServerClient`][openscm_zenodo.client.ServerClient] to talk to it.
+
+Operations can read any file the user who started the server can read,
+so the server only runs requests from that user.
+When it starts, the server writes a new secret to a file
+which only that user can read
+(see [`get_server_secret_path`][openscm_zenodo.client.get_server_secret_path])
+and rejects requests which don't send the secret.
+It also rejects requests which aren't JSON,
+so web pages can't send it requests either.
+The server only listens on localhost by default
+and should not be exposed to other machines.
+"""
+
+from __future__ import annotations
+
+import collections
+import hmac
+import http
+import http.server
+import json
+import os
+import secrets
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+from loguru import logger
+
+from openscm_zenodo.client import DEFAULT_SERVER_ADDRESS, get_server_secret_path
+from openscm_zenodo.domains import ZenodoDomain
+from openscm_zenodo.operations import OPERATIONS, run_operation
+from openscm_zenodo.zenodo import ZenodoInteractor
+
+MAX_ZENODO_INTERACTORS: int = 8
+"""
+Maximum number of Zenodo interactors the server keeps warm
+
+Once there are more, the least recently used interactor is dropped.
+"""
+
+
+def write_secret_file(path: Path) -> str:
+    """
+    Write a new secret to a file which only the current user can read
+
+    Parameters
+    ----------
+    path
+        Path of the file
+
+    Returns
+    -------
+    :
+        Secret
+    """
+    secret = secrets.token_urlsafe(32)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as fh:
+        # The file may have existed already, with other permissions
+        os.chmod(path, 0o600)
+        fh.write(secret)
+
+    return secret
+
+
+class ZenodoServer(http.server.ThreadingHTTPServer):
+    """
+    Server which runs operations with warm Zenodo interactors
+    """
+
+    def __init__(
+        self, address: str = DEFAULT_SERVER_ADDRESS, secret_file: Optional[Path] = None
+    ) -> None:
+        host, port = address.rsplit(":", 1)
+        self._zenodo_interactors: collections.OrderedDict[
+            tuple[Optional[str], ZenodoDomain], ZenodoInteractor
+        ] = collections.OrderedDict()
+        self._zenodo_interactors_lock = threading.Lock()
+
+        super().__init__((host, int(port)), _ZenodoRequestHandler)
+
+        # Only known once bound (e.g. if the port was 0)
+        self.address = f"{host}:{self.server_address[1]}"
+        self.secret_file = (
+            secret_file
+            if secret_file is not None
+            else get_server_secret_path(self.address)
+        )
+        self.secret = write_secret_file(self.secret_file)
+
+    def server_close(self) -> None:
+        """
+        Close the server and remove its secret file
+        """
+        super().server_close()
+        self.secret_file.unlink(missing_ok=True)
+
+    def get_zenodo_interactor(
+        self, token: Optional[str], zenodo_domain: ZenodoDomain
+    ) -> ZenodoInteractor:
+        """
+        Get the (warm) Zenodo interactor for a token and domain
+
+        Parameters
+        ----------
+        token
+            Zenodo token
+
+        zenodo_domain
+            Zenodo domain
+
+        Returns
+        -------
+        :
+            Zenodo interactor, re-used across operations with the same arguments.
+
+            The number of interactors kept is limited by
+            [`MAX_ZENODO_INTERACTORS`][openscm_zenodo.server.MAX_ZENODO_INTERACTORS].
+        """
+        key = (token, zenodo_domain)
+        with self._zenodo_interactors_lock:
+            if key in self._zenodo_interactors:
+                self._zenodo_interactors.move_to_end(key)
+
+            else:
+                self._zenodo_interactors[key] = ZenodoInteractor(
+                    token=token, zenodo_domain=zenodo_domain
+                )
+                if len(self._zenodo_interactors) > MAX_ZENODO_INTERACTORS:
+                    self._zenodo_interactors.popitem(last=False)
+
+            return self._zenodo_interactors[key]
+
+
+class _InvalidRequestError(ValueError):
+    def __init__(self, status: http.HTTPStatus, error_type: str, message: str) -> None:
+        self.status = status
+        self.error_type = error_type
+
+        super().__init__(message)
+
+
+class _ZenodoRequestHandler(http.server.BaseHTTPRequestHandler):
+    server: ZenodoServer
+
+    def _send_json(self, content: Any, status: int = http.HTTPStatus.OK) -> None:
+        body = json.dumps(content).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, error_type: str, message: str) -> None:
+        self._send_json({"error": {"type": error_type, "message": message}}, status)
+
+    def _check_authorised(self) -> None:
+        authorization = self.headers.get("Authorization", "")
+        if not hmac.compare_digest(
+            authorization.encode(), f"Bearer {self.server.secret}".encode()
+        ):
+            raise _InvalidRequestError(
+                http.HTTPStatus.UNAUTHORIZED,
+                "Unauthorised",
+                f"Send the secret from {self.server.secret_file}",
+            )
+
+    def _read_request(self) -> dict[str, Any]:
+        if self.path != "/run":
+            raise _InvalidRequestError(http.HTTPStatus.NOT_FOUND, "NotFound", self.path)
+
+        if self.headers.get_content_type() != "application/json":
+            raise _InvalidRequestError(
+                http.HTTPStatus.UNSUPPORTED_MEDIA_TYPE,
+                "UnsupportedMediaType",
+                "Requests must be JSON",
+            )
+
+        try:
+            request: dict[str, Any] = json.loads(
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            )
+            operation = request["operation"]
+            zenodo_domain = ZenodoDomain(
+                request.get("zenodo_domain") or ZenodoDomain.production
+            )
+        except (ValueError, KeyError, TypeError) as exc:
+            raise _InvalidRequestError(
+                http.HTTPStatus.BAD_REQUEST, "BadRequest", repr(exc)
+            ) from exc
+
+        if operation not in OPERATIONS:
+            raise _InvalidRequestError(
+                http.HTTPStatus.NOT_FOUND,
+                "KeyError",
+                f"Unknown {operation=!r}. Known operations: {sorted(OPERATIONS)}",
+            )
+
+        request["zenodo_domain"] = zenodo_domain
+
+        return request
+
+    def do_GET(self) -> None:
+        try:
+            self._check_authorised()
+        except _InvalidRequestError as exc:
+            self._send_error(exc.status, exc.error_type, str(exc))
+            return
+
+        if self.path == "/ping":
+            import openscm_zenodo
+
+            self._send_json({"version": openscm_zenodo.__version__})
+
+        else:
+            self._send_error(http.HTTPStatus.NOT_FOUND, "NotFound", self.path)
+
+    def do_POST(self) -> None:
+        try:
+            self._check_authorised()
+            request = self._read_request()
+
+        except _InvalidRequestError as exc:
+            self._send_error(exc.status, exc.error_type, str(exc))
+            return
+
+        logger.info(f"Running {request['operation']!r}")
+        try:
+            zenodo_interactor = self.server.get_zenodo_interactor(
+                token=request.get("token"),
+                zenodo_domain=request["zenodo_domain"],
+            )
+            result = run_operation(
+                request["operation"],
+                zenodo_interactor=zenodo_interactor,
+                arguments=request.get("arguments", {}),
+            )
+
+        except Exception as exc:
+            logger.exception(f"Error running {request['operation']!r}")
+            self._send_error(
+                http.HTTPStatus.INTERNAL_SERVER_ERROR, type(exc).__name__, str(exc)
+            )
+            return
+
+        self._send_json({"result": result})
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Route through our logging rather than straight to stderr
+        logger.debug(format % args)
+
+
+def serve(address: str = DEFAULT_SERVER_ADDRESS) -> None:
+    """
+    Run the server until interrupted
+
+    Parameters
+    ----------
+    address
+        Address on which to listen (host:port)
+    """
+    with ZenodoServer(address) as server:
+        logger.info(f"Serving on {server.address} (secret in {server.secret_file})")
+        try:
+            server.serve_forever()
+
+        except KeyboardInterrupt:
+            logger.info("Shutting down")
@@ -0,0 +1,322 @@
+"""
+Uploads to a single deposition, sharded across several machines
+
+For the largest releases, a single machine's uplink limits how fast the files
+can be uploaded.
+Instead, a [`ShardManifest`][openscm_zenodo.shards.ShardManifest]
+lists every file of the release (with its size and checksum)
+and each of several machines uploads a deterministic subset of the files
+(its shard, see
+[`ShardManifest.get_shard`][openscm_zenodo.shards.ShardManifest.get_shard])
+to the same draft.
+Once every machine has finished,
+[`verify_deposition_files`][openscm_zenodo.shards.verify_deposition_files]
+checks that the draft holds exactly the files in the manifest
+(with matching checksums), so it is safe to publish.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import heapq
+import json
+import os
+from collections.abc import Iterable
+from pathlib import Path
+
+from attrs import frozen
+
+from openscm_zenodo.discovery import iter_unique_names
+from openscm_zenodo.sync import RemoteFile, get_md5_checksum
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """
+    Parse a shard specification
+
+    Parameters
+    ----------
+    value
+        Shard specification, of the form "i/N"
+        (shard `i` of `N`, counting from 1), e.g. "2/4"
+
+    Returns
+    -------
+    :
+        Shard number and number of shards
+
+    Raises
+    ------
+    ValueError
+        `value` is not a valid shard specification
+    """
+    try:
+        index_str, n_shards_str = value.split("/")
+        index, n_shards = int(index_str), int(n_shards_str)
+    except ValueError as exc:
+        msg = f"Shards must be of the form 'i/N', e.g. '2/4'. Received: {value!r}"
+        raise ValueError(msg) from exc
+
+    if not 1 <= index <= n_shards:
+        msg = f"The shard number must be between 1 and {n_shards}. Received: {value!r}"
+        raise ValueError(msg)
+
+    return index, n_shards
+
+
+@frozen
+class ManifestEntry:
+    """
+    A file in a shard manifest
+    """
+
+    name: str
+    """Name of the file in the deposition"""
+
+    path: Path
+    """Path of the file"""
+
+    size: int
+    """Size of the file in bytes"""
+
+    checksum: str
+    """MD5 checksum of the file (hex digest)"""
+
+
+@frozen
+class ShardManifest:
+    """
+    Manifest of the files to upload to a deposition, shared by every shard
+    """
+
+    entries: tuple[ManifestEntry, ...]
+    """Files to upload, in order of their name"""
+
+    @classmethod
+    def from_files(cls, files: Iterable[Path], n_threads: int = 4) -> ShardManifest:
+        """
+        Create a manifest from files
+
+        Parameters
+        ----------
+        files
+            Files to upload
+
+        n_threads
+            Number of threads to use for calculating checksums
+
+        Returns
+        -------
+        :
+            Manifest of `files`
+
+        Raises
+        ------
+        ValueError
+            More than one of `files` has the same name
+        """
+        files = sorted(iter_unique_names(files), key=lambda v: v.name)
+        with concurrent.futures.ThreadPoolExecutor(max_workers=n_threads) as executor:
+            checksums = executor.map(get_md5_checksum, files)
+
+            entries = tuple(
+                ManifestEntry(
+                    name=file.name,
+                    path=file,
+                    size=file.stat().st_size,
+                    checksum=checksum,
+                )
+                for file, checksum in zip(files, checksums)
+            )
+
+        return cls(entries=entries)
+
+    @classmethod
+    def from_file(cls, path: Path) -> ShardManifest:
+        """
+        Load a manifest from disk
+
+        Parameters
+        ----------
+        path
+            Path of the manifest file
+
+        Returns
+        -------
+        :
+            Loaded manifest
+        """
+        with open(path) as fh:
+            raw = json.load(fh)
+
+        return cls(
+            entries=tuple(
+                ManifestEntry(
+                    name=v["name"],
+                    # Relative to the manifest (see `save`)
+                    path=path.parent / v["path"],
+                    size=v["size"],
+                    checksum=v["checksum"],
+                )
+                for v in raw["files"]
+            )
+        )
+
+    def save(self, path: Path) -> None:
+        """
+        Save the manifest to disk
+
+        Paths are saved relative to the manifest file,
+        so the files can be at a different location on each machine,
+        as long as they are in the same place relative to the manifest.
+
+        Parameters
+        ----------
+        path
+            Path of the manifest file
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        manifest_dir = path.parent.resolve()
+        with open(path, "w") as fh:
+            json.dump(
+                {
+                    "files": [
+                        {
+                            "name": v.name,
+                            "path": Path(
+                                os.path.relpath(v.path.resolve(), manifest_dir)
+                            ).as_posix(),
+                            "size": v.size,
+                            "checksum": v.checksum,
+                        }
+                        for v in self.entries
+                    ]
+                },
+                fh,
+                indent=2,
+            )
+
+    def get_shard(self, index: int, n_shards: int) -> tuple[ManifestEntry, ...]:
+        """
+        Get the files in a shard
+
+        Files are assigned to shards largest first,
+        each to the shard with the fewest bytes so far,
+        so every shard has a similar number of bytes to upload.
+        The assignment only depends on the manifest,
+        so every machine agrees on it without having to communicate.
+
+        Parameters
+        ----------
+        index
+            Number of the shard (counting from 1)
+
+        n_shards
+            Number of shards
+
+        Returns
+        -------
+        :
+            Files in the shard, largest first
+        """
+        # (bytes assigned so far, shard number) for each shard
+        loads = [(0, i) for i in range(1, n_shards + 1)]
+        shard = []
+        for entry in sorted(self.entries, key=lambda v: (-v.size, v.name)):
+            n_bytes, i = heapq.heappop(loads)
+            if i == index:
+                shard.append(entry)
+
+            heapq.heappush(loads, (n_bytes + entry.size, i))
+
+        return tuple(shard)
+
+
+@frozen
+class ManifestVerification:
+    """
+    Comparison of a deposition's files with a manifest
+    """
+
+    missing: tuple[ManifestEntry, ...]
+    """Files in the manifest which are not in the deposition"""
+
+    mismatched: tuple[tuple[ManifestEntry, RemoteFile], ...]
+    """Files whose size or checksum differs between the manifest and the deposition"""
+
+    unexpected: tuple[RemoteFile, ...]
+    """Files in the deposition which are not in the manifest"""
+
+    n_verified: int
+    """Number of files which match the manifest"""
+
+    @property
+    def is_complete(self) -> bool:
+        """
+        Whether the deposition holds exactly the files in the manifest
+        """
+        return not (self.missing or self.mismatched or self.unexpected)
+
+    def to_lines(self) -> tuple[str, ...]:
+        """
+        Get a human-readable description of the problems
+
+        Returns
+        -------
+        :
+            One line per problem (empty if the deposition is complete)
+        """
+        return (
+            *(f"missing {v.name}" for v in self.missing),
+            *(
+                f"mismatched {v.name} (expected {v.size} bytes with checksum "
+                f"{v.checksum}, found {r.filesize} bytes with checksum {r.checksum})"
+                for v, r in self.mismatched
+            ),
+            *(f"unexpected {v.filename}" for v in self.unexpected),
+        )
+
+
+def verify_deposition_files(
+    manifest: ShardManifest, remote_files: Iterable[RemoteFile]
+) -> ManifestVerification:
+    """
+    Verify that a deposition holds exactly the files in a manifest
+
+    Parameters
+    ----------
+    manifest
+        Manifest of the files the deposition should hold
+
+    remote_files
+        Files in the deposition
+
+    Returns
+    -------
+    :
+        Comparison of the deposition's files with the manifest
+    """
+    remote_by_name = {v.filename: v for v in remote_files}
+    expected_names = {v.name for v in manifest.entries}
+
+    missing = []
+    mismatched = []
+    for entry in manifest.entries:
+        remote_file = remote_by_name.get(entry.name)
+        if remote_file is None:
+            missing.append(entry)
+
+        elif (remote_file.filesize, remote_file.checksum) != (
+            entry.size,
+            entry.checksum,
+        ):
+            mismatched.append((entry, remote_file))
+
+    return ManifestVerification(
+        missing=tuple(missing),
+        mismatched=tuple(mismatched),
+        unexpected=tuple(
+            v for name, v in remote_by_name.items() if name not in expected_names
+        ),
+        n_verified=len(manifest.entries) - len(missing) - len(mismatched),
+    )
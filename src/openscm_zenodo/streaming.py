@@ -0,0 +1,227 @@
+"""
+Upload bodies which are streamed in chunks
+
+[`StreamBody`][openscm_zenodo.streaming.StreamBody] allows outputs
+which are generated on the fly
+(e.g. piped to stdin or produced by a generator)
+to be uploaded without first writing them to disk.
+[`MmapFileBody`][openscm_zenodo.streaming.MmapFileBody] allows large files
+to be uploaded with fewer copies and less Python overhead
+than reading them through a file handle.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import BinaryIO, Callable, Optional, Union, cast
+
+from attrs import define
+
+STREAM_CHUNK_SIZE: int = 2**20
+"""Default size of the chunks (in bytes) read from binary streams"""
+
+MMAP_CHUNK_SIZE: int = 8 * 2**20
+"""Default size of the chunks (in bytes) sent from memory-mapped files"""
+
+MMAP_PROGRESS_INTERVAL: int = 64 * 2**20
+"""Default number of bytes to send between progress updates for memory-mapped files"""
+
+
+def iter_chunks(
+    stream: BinaryIO, chunk_size: int = STREAM_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """
+    Iterate over a binary stream in chunks
+
+    Parameters
+    ----------
+    stream
+        Stream to read from
+
+    chunk_size
+        Maximum size of each chunk (in bytes)
+
+    Yields
+    ------
+    :
+        Chunks of the stream, until the stream is exhausted
+    """
+    while chunk := stream.read(chunk_size):
+        yield chunk
+
+
+@define
+class StreamBody:
+    """
+    Request body which streams chunks from a source
+
+    If `size` is supplied, the body reports it as its length,
+    so `requests` sends a `Content-Length` header.
+    Otherwise, pass `iter(body)` as the data to send
+    so that the upload uses chunked transfer encoding
+    (`requests` would otherwise try to get the body's length).
+    """
+
+    source: Union[BinaryIO, Iterable[bytes]]
+    """
+    Source of the data
+
+    Either a binary stream (i.e. something with a `read` method)
+    or an iterable of chunks of bytes.
+    """
+
+    size: Optional[int] = None
+    """Size hint (in bytes), if known"""
+
+    callback: Optional[Callable[[int], object]] = None
+    """Callback to call with the size of each chunk as it is sent"""
+
+    throttle: Optional[Callable[[int], object]] = None
+    """
+    Callback to call with the size of each chunk before it is sent
+
+    This can block to limit bandwidth (see
+    [`BandwidthLimiter.consume`][openscm_zenodo.bandwidth.BandwidthLimiter.consume]).
+    """
+
+    chunk_size: int = STREAM_CHUNK_SIZE
+    """Size of the chunks to read (only used if `source` is a binary stream)"""
+
+    bytes_sent: int = 0
+    """Number of bytes sent so far"""
+
+    def __iter__(self) -> Iterator[bytes]:
+        """
+        Iterate over the chunks to send
+
+        Raises
+        ------
+        ValueError
+            The number of bytes in the source doesn't match `size`
+        """
+        chunks: Iterable[bytes]
+        if hasattr(self.source, "read"):
+            chunks = iter_chunks(cast(BinaryIO, self.source), self.chunk_size)
+        else:
+            chunks = self.source
+
+        for chunk in chunks:
+            if not chunk:
+                # An empty chunk would signal the end of a chunked upload
+                continue
+
+            self.bytes_sent += len(chunk)
+            if self.size is not None and self.bytes_sent > self.size:
+                msg = f"Source is larger than the size hint ({self.size} bytes)"
+                raise ValueError(msg)
+
+            if self.throttle is not None:
+                self.throttle(len(chunk))
+
+            if self.callback is not None:
+                self.callback(len(chunk))
+
+            yield chunk
+
+        if self.size is not None and self.bytes_sent != self.size:
+            msg = (
+                f"Source is smaller than the size hint ({self.size} bytes), "
+                f"only {self.bytes_sent} bytes were read"
+            )
+            raise ValueError(msg)
+
+    def __len__(self) -> int:
+        """
+        Get the size of the body
+
+        Raises
+        ------
+        TypeError
+            The size of the body is not known
+        """
+        if self.size is None:
+            msg = "The size of this body is not known"
+            raise TypeError(msg)
+
+        return self.size
+
+
+@define
+class MmapFileBody:
+    """
+    Request body which sends a file from a memory map
+
+    When a file handle is uploaded,
+    the standard library reads and sends it in small (8 KiB) blocks,
+    each of which is copied into a new Python bytes object.
+    For large files on fast disks, this loop (not the network) is the bottleneck.
+    This body instead maps the file into memory
+    and sends large zero-copy slices (memoryviews) of it.
+    Progress is also only reported every `progress_interval` bytes,
+    rather than for every block.
+
+    The body reports the file's size as its length,
+    so `requests` sends a `Content-Length` header.
+    """
+
+    path: Path
+    """Path of the file to send"""
+
+    callback: Optional[Callable[[int], object]] = None
+    """Callback to call with the number of bytes sent since the last call"""
+
+    throttle: Optional[Callable[[int], object]] = None
+    """
+    Callback to call with the size of each chunk before it is sent
+
+    Unlike `callback`, this is called for every chunk.
+    """
+
+    chunk_size: int = MMAP_CHUNK_SIZE
+    """Size of the chunks to send"""
+
+    progress_interval: int = MMAP_PROGRESS_INTERVAL
+    """Number of bytes to send between calls to `callback`"""
+
+    def __iter__(self) -> Iterator[memoryview]:
+        """
+        Iterate over the chunks to send
+        """
+        size = len(self)
+        if size == 0:
+            # Empty files can't be memory-mapped
+            return
+
+        not_reported = 0
+        with open(self.path, "rb") as fh:
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if hasattr(mapped, "madvise"):
+                    mapped.madvise(mmap.MADV_SEQUENTIAL)
+
+                with memoryview(mapped) as view:
+                    for start in range(0, size, self.chunk_size):
+                        with view[start : start + self.chunk_size] as chunk:
+                            if self.throttle is not None:
+                                self.throttle(len(chunk))
+
+                            yield chunk
+
+                            not_reported += len(chunk)
+
+                        if self.callback is not None and (
+                            not_reported >= self.progress_interval
+                        ):
+                            self.callback(not_reported)
+                            not_reported = 0
+
+        if self.callback is not None and not_reported:
+            self.callback(not_reported)
+
+    def __len__(self) -> int:
+        """
+        Get the size of the body
+        """
+        return os.stat(self.path).st_size
@@ -0,0 +1,416 @@
+"""
+Synchronisation of local files with a Zenodo deposition
+
+This gives rsync-like behaviour for Zenodo drafts:
+only the files that differ between the local files and the deposition
+are deleted, uploaded or replaced.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import hashlib
+import itertools
+from collections.abc import Collection, Iterable, Iterator
+from pathlib import Path
+from typing import Any, Optional
+
+from attrs import frozen
+from loguru import logger
+
+from openscm_zenodo.executors import iter_bounded_map
+from openscm_zenodo.zenodo import UploadFilesError, ZenodoInteractor
+
+CHECKSUM_CHUNK_SIZE: int = 2**20
+"""Size of the chunks (in bytes) read when calculating checksums"""
+
+
+def get_md5_checksum(file: Path, chunk_size: int = CHECKSUM_CHUNK_SIZE) -> str:
+    """
+    Get the MD5 checksum of a file
+
+    This is the checksum that Zenodo reports for its files.
+
+    Parameters
+    ----------
+    file
+        File for which to calculate the checksum
+
+    chunk_size
+        Size of the chunks (in bytes) to read from `file`
+
+    Returns
+    -------
+    :
+        Hex digest of the MD5 checksum of `file`
+    """
+    # Not used for security, just for comparing with Zenodo
+    md5 = hashlib.md5()  # noqa: S324
+    with open(file, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            md5.update(chunk)
+
+    return md5.hexdigest()
+
+
+@frozen
+class RemoteFile:
+    """
+    A file in a Zenodo deposition
+    """
+
+    id: str
+    """ID of the file"""
+
+    filename: str
+    """Name of the file"""
+
+    filesize: int
+    """Size of the file in bytes"""
+
+    checksum: str
+    """MD5 checksum of the file (hex digest)"""
+
+    @classmethod
+    def from_zenodo_json(cls, file_json: dict[str, Any]) -> RemoteFile:
+        """
+        Initialise from the file information returned by Zenodo
+
+        Parameters
+        ----------
+        file_json
+            File information returned by Zenodo
+
+        Returns
+        -------
+        :
+            Initialised instance
+        """
+        return cls(
+            id=str(file_json["id"]),
+            filename=str(file_json["filename"]),
+            filesize=int(file_json["filesize"]),
+            # Newer parts of the Zenodo API prefix the algorithm
+            checksum=str(file_json["checksum"]).removeprefix("md5:"),
+        )
+
+
+@frozen
+class SyncPlan:
+    """
+    Plan for making a deposition's files match local files
+    """
+
+    to_upload: tuple[Path, ...]
+    """Local files which are not in the deposition"""
+
+    to_replace: tuple[tuple[Path, RemoteFile], ...]
+    """Local files which differ from their counterpart in the deposition"""
+
+    to_delete: tuple[RemoteFile, ...]
+    """Files in the deposition which have no local counterpart"""
+
+    unchanged: tuple[Path, ...]
+    """Local files which are identical to their counterpart in the deposition"""
+
+    @property
+    def is_empty(self) -> bool:
+        """
+        Whether the plan requires no changes to the deposition
+        """
+        return not (self.to_upload or self.to_replace or self.to_delete)
+
+    def to_lines(self) -> tuple[str, ...]:
+        """
+        Get a human-readable description of the plan
+
+        Returns
+        -------
+        :
+            One line per change in the plan
+        """
+        return (
+            *(f"upload {f.name}" for f in self.to_upload),
+            *(f"replace {f.name}" for f, _ in self.to_replace),
+            *(f"delete {f.filename}" for f in self.to_delete),
+        )
+
+
+def plan_sync(
+    local_files: Collection[Path],
+    remote_files: Iterable[RemoteFile],
+    delete: bool = True,
+    n_threads: int = 4,
+) -> SyncPlan:
+    """
+    Plan how to make a deposition's files match local files
+
+    Files are matched by name (Zenodo does not support directories).
+    Files with the same name are compared by size first
+    and only checksummed if their sizes match.
+
+    Parameters
+    ----------
+    local_files
+        Local files which the deposition should contain
+
+    remote_files
+        Files currently in the deposition
+
+    delete
+        Should files in the deposition which have no local counterpart be deleted?
+
+    n_threads
+        Number of threads to use for calculating checksums
+
+    Returns
+    -------
+    :
+        Plan for synchronising the deposition
+
+    Raises
+    ------
+    ValueError
+        More than one file in `local_files` has the same name
+    """
+    local_by_name: dict[str, Path] = {}
+    for file in local_files:
+        if file.name in local_by_name:
+            msg = (
+                "Zenodo does not support directories, so file names must be unique. "
+                f"Received both {local_by_name[file.name]} and {file}"
+            )
+            raise ValueError(msg)
+
+        local_by_name[file.name] = file
+
+    remote_by_name = {f.filename: f for f in remote_files}
+
+    to_upload = tuple(
+        f for name, f in local_by_name.items() if name not in remote_by_name
+    )
+    to_delete = (
+        tuple(f for name, f in remote_by_name.items() if name not in local_by_name)
+        if delete
+        else ()
+    )
+
+    to_replace = []
+    unchanged = []
+    to_checksum = []
+    for name, local_file in local_by_name.items():
+        if name not in remote_by_name:
+            continue
+
+        remote_file = remote_by_name[name]
+        if local_file.stat().st_size != remote_file.filesize:
+            to_replace.append((local_file, remote_file))
+        else:
+            to_checksum.append((local_file, remote_file))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=n_threads) as executor:
+        checksums = executor.map(get_md5_checksum, [f for f, _ in to_checksum])
+
+        for (local_file, remote_file), checksum in zip(to_checksum, checksums):
+            if checksum == remote_file.checksum:
+                unchanged.append(local_file)
+            else:
+                to_replace.append((local_file, remote_file))
+
+    return SyncPlan(
+        to_upload=to_upload,
+        to_replace=tuple(to_replace),
+        to_delete=to_delete,
+        unchanged=tuple(unchanged),
+    )
+
+
+def apply_sync_plan(
+    deposition_id: str,
+    sync_plan: SyncPlan,
+    zenodo_interactor: ZenodoInteractor,
+    n_threads: int = 4,
+) -> None:
+    """
+    Apply a sync plan to a deposition
+
+    Deletions run in a pool of threads, alongside the uploads.
+    Zenodo won't let us upload a file with the same name as an existing one,
+    so each replacement is only uploaded once the file it replaces is deleted.
+    The files being replaced are only deleted shortly before they are uploaded,
+    so if an upload fails, the rest of them are left in place.
+
+    Parameters
+    ----------
+    deposition_id
+        ID of the deposition to alter
+
+    sync_plan
+        Plan to apply
+
+    zenodo_interactor
+        Object to use to interact with Zenodo
+
+    n_threads
+        Number of threads to use for the deletions and for the uploads
+
+    Raises
+    ------
+    UploadFilesError
+        Any of the uploads failed.
+
+        Files which were never uploaded because of the failure
+        are included in the error's cancelled files.
+        If the remote copies of any replaced files were deleted
+        but they weren't uploaded again, they are logged,
+        so the sync can be re-run to upload them.
+    """
+    taken: list[Path] = []
+    # Files being replaced whose remote copies have been deleted
+    deleted: list[Path] = []
+
+    def remove_replaced(replacement: tuple[Path, RemoteFile]) -> Path:
+        local_file, remote_file = replacement
+        zenodo_interactor.remove_file_id(
+            deposition_id=deposition_id, to_remove_id=remote_file.id
+        )
+        deleted.append(local_file)
+
+        return local_file
+
+    upload_error: Optional[UploadFilesError] = None
+    with concurrent.futures.ThreadPoolExecutor(max_workers=n_threads) as executor:
+        deletions = [
+            executor.submit(
+                zenodo_interactor.remove_file_id,
+                deposition_id=deposition_id,
+                to_remove_id=remote_file.id,
+            )
+            for remote_file in sync_plan.to_delete
+        ]
+        # Only a few deletions run ahead of the uploads
+        replacements = iter_bounded_map(
+            remove_replaced,
+            sync_plan.to_replace,
+            executor=executor,
+            max_in_flight=n_threads,
+        )
+
+        def iter_to_upload() -> Iterator[Path]:
+            for file in itertools.chain(sync_plan.to_upload, replacements):
+                taken.append(file)
+                yield file
+
+        try:
+            if sync_plan.to_upload or sync_plan.to_replace:
+                # Each upload starts as soon as its file is taken from the iterator
+                zenodo_interactor.upload_files(
+                    deposition_id=deposition_id,
+                    to_upload=iter_to_upload(),
+                    n_threads=n_threads,
+                )
+
+        except UploadFilesError as exc:
+            upload_error = exc
+
+        finally:
+            # Cancels the deletions which haven't started
+            replacements.close()
+
+        for future in deletions:
+            future.result()
+
+    if upload_error is not None:
+        not_uploaded = set(upload_error.not_uploaded)
+        lost = [f for f in deleted if f in not_uploaded or f not in taken]
+        if lost:
+            lost_lines = "\n".join(f"- {f.name}" for f in lost)
+            logger.error(
+                "The remote copies of these files were deleted, "
+                "but the files were not uploaded again. "
+                f"Re-run the sync to upload them:\n{lost_lines}"
+            )
+
+        never_taken = [
+            f
+            for f in (*sync_plan.to_upload, *(f for f, _ in sync_plan.to_replace))
+            if f not in taken
+        ]
+        raise UploadFilesError(
+            failures=upload_error.failures,
+            cancelled=[*upload_error.cancelled, *never_taken],
+            responses=upload_error.responses,
+        ) from upload_error
+
+
+def sync_deposition(  # noqa: PLR0913
+    deposition_id: str,
+    local_files: Collection[Path],
+    zenodo_interactor: ZenodoInteractor,
+    delete: bool = True,
+    dry_run: bool = False,
+    n_threads: int = 4,
+    remote_files: Optional[Iterable[RemoteFile]] = None,
+) -> SyncPlan:
+    """
+    Make a deposition's files match local files
+
+    Parameters
+    ----------
+    deposition_id
+        ID of the deposition to alter
+
+    local_files
+        Local files which the deposition should contain
+
+    zenodo_interactor
+        Object to use to interact with Zenodo
+
+    delete
+        Should files in the deposition which have no local counterpart be deleted?
+
+    dry_run
+        If `True`, only work out what needs to change, don't change anything.
+
+    n_threads
+        Number of threads to use for checksums and uploads
+
+    remote_files
+        Files currently in the deposition.
+
+        If not supplied, these are retrieved from Zenodo.
+
+    Returns
+    -------
+    :
+        The plan that was (or, if `dry_run` is `True`, would have been) applied
+    """
+    if remote_files is None:
+        remote_files = [
+            RemoteFile.from_zenodo_json(v)
+            for v in zenodo_interactor.get_files(deposition_id)
+        ]
+
+    sync_plan = plan_sync(
+        local_files=local_files,
+        remote_files=remote_files,
+        delete=delete,
+        n_threads=n_threads,
+    )
+    logger.info(
+        f"Sync plan for {deposition_id=!r}: "
+        f"{len(sync_plan.to_upload)} to upload, "
+        f"{len(sync_plan.to_replace)} to replace, "
+        f"{len(sync_plan.to_delete)} to delete, "
+        f"{len(sync_plan.unchanged)} unchanged"
+    )
+
+    if not dry_run and not sync_plan.is_empty:
+        apply_sync_plan(
+            deposition_id=deposition_id,
+            sync_plan=sync_plan,
+            zenodo_interactor=zenodo_interactor,
+            n_threads=n_threads,
+        )
+
+    return sync_plan
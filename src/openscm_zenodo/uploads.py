@@ -0,0 +1,314 @@
+"""
+Uploads which run in the background
+
+[`ZenodoInteractor.upload_files`][openscm_zenodo.zenodo.ZenodoInteractor.upload_files]
+blocks until every file is uploaded.
+[`ZenodoInteractor.start_upload_files`][openscm_zenodo.zenodo.ZenodoInteractor.start_upload_files]
+instead starts the uploads in a thread pool and returns an
+[`UploadHandle`][openscm_zenodo.uploads.UploadHandle] straight away,
+so callers can do other work (e.g. preparing metadata) while the uploads run.
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import functools
+import threading
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Callable, Optional
+
+import requests
+from attrs import define, field, frozen
+from loguru import logger
+
+from openscm_zenodo.discovery import iter_unique_names
+from openscm_zenodo.zenodo import CANCELLED_ERRORS, UploadFilesError
+
+
+@frozen
+class UploadProgress:
+    """
+    Progress of a set of uploads
+    """
+
+    n_files: int
+    """Number of files to upload"""
+
+    n_uploaded: int
+    """Number of files which have been uploaded"""
+
+    n_failed: int
+    """Number of files whose uploads failed"""
+
+    n_cancelled: int
+    """Number of files whose uploads were cancelled"""
+
+    n_bytes: int
+    """Total size of the files to upload (bytes)"""
+
+    n_bytes_uploaded: int
+    """Total size of the files which have been uploaded (bytes)"""
+
+    @property
+    def n_pending(self) -> int:
+        """
+        Number of files which are waiting to be, or are being, uploaded
+        """
+        return self.n_files - self.n_uploaded - self.n_failed - self.n_cancelled
+
+
+@define
+class UploadHandle:
+    """
+    Handle to uploads running in the background
+
+    Use
+    [`ZenodoInteractor.start_upload_files`][openscm_zenodo.zenodo.ZenodoInteractor.start_upload_files]
+    to create one.
+    """
+
+    futures: dict[Path, concurrent.futures.Future[requests.models.Response]]
+    """Future for each file's upload"""
+
+    sizes: dict[Path, int]
+    """Size of each file (bytes)"""
+
+    cancel_event: threading.Event
+    """Event which, once set, aborts the uploads in flight before their next chunk"""
+
+    _executor: concurrent.futures.ThreadPoolExecutor = field(repr=False)
+    _done: threading.Event = field(factory=threading.Event, init=False, repr=False)
+    _lock: threading.Lock = field(factory=threading.Lock, init=False, repr=False)
+    _n_remaining: int = field(default=0, init=False, repr=False)
+    _callbacks: list[Callable[[UploadHandle], object]] = field(
+        factory=list, init=False, repr=False
+    )
+
+    @classmethod
+    def start(
+        cls,
+        tasks: Sequence[tuple[Path, Callable[[], requests.models.Response], int]],
+        n_threads: int,
+        cancel_event: threading.Event,
+        fail_fast: bool = True,
+    ) -> UploadHandle:
+        """
+        Start uploads in the background
+
+        Parameters
+        ----------
+        tasks
+            Uploads to run.
+
+            Each upload is the file it uploads,
+            a callable which does the upload
+            and the number of bytes it uploads.
+
+        n_threads
+            Number of threads to use for the uploads
+
+        cancel_event
+            Event which the uploads check before each chunk
+
+        fail_fast
+            Cancel the rest of the uploads as soon as one fails
+
+        Returns
+        -------
+        :
+            Handle to the uploads
+
+        Raises
+        ------
+        ValueError
+            More than one of `tasks` uploads a file with the same name
+        """
+        # Checked before anything starts.
+        # Each file has a single future, so repeats would also never finish.
+        for _ in iter_unique_names(file for file, _, _ in tasks):
+            pass
+
+        handle = cls(
+            futures={},
+            sizes={file: size for file, _, size in tasks},
+            cancel_event=cancel_event,
+            executor=concurrent.futures.ThreadPoolExecutor(max_workers=n_threads),
+        )
+        for file, task, _ in tasks:
+            future = handle._executor.submit(task)
+            handle.futures[file] = future
+
+        handle._n_remaining = len(handle.futures)
+        if not handle.futures:
+            handle._finish()
+
+        # Only added once every future exists,
+        # so a quick failure can cancel all the others
+        for file, future in handle.futures.items():
+            future.add_done_callback(
+                functools.partial(handle._on_file_done, file, fail_fast=fail_fast)
+            )
+
+        return handle
+
+    def _on_file_done(
+        self,
+        file: Path,
+        future: concurrent.futures.Future[requests.models.Response],
+        fail_fast: bool,
+    ) -> None:
+        # Called in the thread which finished (or cancelled) the upload
+        if not future.cancelled():
+            exc = future.exception()
+            if exc is not None and not isinstance(exc, CANCELLED_ERRORS):
+                logger.error("Failed to upload {}: {!r}", file, exc)
+                if fail_fast and not self.cancel_event.is_set():
+                    logger.warning("Cancelling the other uploads")
+                    self.cancel()
+
+        with self._lock:
+            self._n_remaining -= 1
+            finished = self._n_remaining == 0
+
+        if finished:
+            self._finish()
+
+    def _finish(self) -> None:
+        self._executor.shutdown(wait=False)
+        self._done.set()
+        with self._lock:
+            callbacks = list(self._callbacks)
+
+        for callback in callbacks:
+            callback(self)
+
+    def add_done_callback(self, callback: Callable[[UploadHandle], object]) -> None:
+        """
+        Add a callback to call once every upload has finished
+
+        Parameters
+        ----------
+        callback
+            Callback to call with the handle.
+
+            It is called in the thread which finished the last upload,
+            or straight away if the uploads have already finished.
+            Per-file callbacks can be added to the futures in `self.futures`.
+        """
+        with self._lock:
+            if not self._done.is_set():
+                self._callbacks.append(callback)
+                return
+
+        callback(self)
+
+    def cancel(self) -> None:
+        """
+        Cancel the uploads
+
+        Uploads which haven't started are cancelled
+        and uploads in flight are aborted before their next chunk.
+        """
+        self.cancel_event.set()
+        for future in self.futures.values():
+            future.cancel()
+
+    def done(self) -> bool:
+        """
+        Whether every upload has finished (successfully or not)
+        """
+        return self._done.is_set()
+
+    def progress(self) -> UploadProgress:
+        """
+        Get the progress of the uploads
+
+        Returns
+        -------
+        :
+            Progress of the uploads
+        """
+        n_uploaded = n_failed = n_cancelled = n_bytes_uploaded = 0
+        for file, future in self.futures.items():
+            if not future.done():
+                continue
+
+            if future.cancelled() or isinstance(future.exception(), CANCELLED_ERRORS):
+                n_cancelled += 1
+
+            elif future.exception() is not None:
+                n_failed += 1
+
+            else:
+                n_uploaded += 1
+                n_bytes_uploaded += self.sizes[file]
+
+        return UploadProgress(
+            n_files=len(self.futures),
+            n_uploaded=n_uploaded,
+            n_failed=n_failed,
+            n_cancelled=n_cancelled,
+            n_bytes=sum(self.sizes.values()),
+            n_bytes_uploaded=n_bytes_uploaded,
+        )
+
+    def wait(
+        self, timeout: Optional[float] = None
+    ) -> tuple[requests.models.Response, ...]:
+        """
+        Wait for the uploads to finish
+
+        If the wait is interrupted (e.g. by `KeyboardInterrupt`),
+        the uploads are cancelled.
+
+        Parameters
+        ----------
+        timeout
+            Maximum time to wait (seconds).
+
+            If `None`, wait for as long as it takes.
+
+        Returns
+        -------
+        :
+            Responses from the uploads, in the same order as the files
+
+        Raises
+        ------
+        TimeoutError
+            The uploads did not finish within `timeout`
+
+        UploadFilesError
+            Any of the uploads failed (or were cancelled)
+        """
+        try:
+            finished = self._done.wait(timeout)
+        except BaseException:
+            self.cancel()
+            raise
+
+        if not finished:
+            msg = f"The uploads did not finish within {timeout=}s"
+            raise TimeoutError(msg)
+
+        responses = []
+        failures: dict[Path, Exception] = {}
+        cancelled = []
+        for file, future in self.futures.items():
+            exc = None if future.cancelled() else future.exception()
+            if future.cancelled() or isinstance(exc, CANCELLED_ERRORS):
+                cancelled.append(file)
+
+            elif isinstance(exc, Exception):
+                failures[file] = exc
+
+            else:
+                responses.append(future.result())
+
+        if failures or cancelled:
+            raise UploadFilesError(
+                failures=failures, cancelled=cancelled, responses=tuple(responses)
+            )
+
+        return tuple(responses)
@@ -0,0 +1,214 @@
+"""
+Detection of stalled uploads
+
+The socket timeouts of an upload only fire if no data moves at all.
+A connection which trickles data (e.g. a few bytes every few seconds)
+never hits them, so an upload can take hours to finish (or fail).
+A [`ThroughputWatchdog`][openscm_zenodo.watchdog.ThroughputWatchdog]
+watches the rate at which an upload's data is sent
+and aborts the upload if it stays below a minimum for too long,
+so that it can be retried on a fresh connection.
+
+The throughput is checked as each chunk is sent
+and, by a [`StallMonitor`][openscm_zenodo.watchdog.StallMonitor],
+in the background while a chunk is being sent.
+A single chunk can be large (e.g. when sending from a memory map),
+so a connection which trickles it out would otherwise go unnoticed
+until the whole chunk had been sent.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import threading
+import time
+from collections.abc import Iterator
+from typing import Callable, Optional
+
+from attrs import define, field
+from loguru import logger
+
+
+class UploadStalledError(RuntimeError):
+    """
+    Raised when an upload's throughput is too low for too long
+    """
+
+
+@define
+class ThroughputWatchdog:
+    """
+    Watchdog for the throughput of a single upload
+
+    Throughput is measured over windows of `window_seconds`.
+    If less than `min_bytes_per_second * window_seconds` bytes are sent in a window,
+    the upload is considered stalled.
+    Time spent waiting deliberately (e.g. for a bandwidth limit
+    or while uploads are paused) is excluded, see
+    [`paused`][openscm_zenodo.watchdog.ThroughputWatchdog.paused].
+    """
+
+    min_bytes_per_second: float
+    """Minimum throughput (bytes per second)"""
+
+    window_seconds: float = 60.0
+    """Length of time over which the throughput must stay low to be a stall"""
+
+    name: str = "upload"
+    """Name of the upload (used in error messages)"""
+
+    abort: Optional[Callable[[], object]] = field(default=None, repr=False)
+    """
+    Callback which aborts the upload (e.g. by shutting down its connection)
+
+    Called by a [`StallMonitor`][openscm_zenodo.watchdog.StallMonitor]
+    if it finds the upload stalled part-way through sending a chunk.
+    """
+
+    _lock: threading.Lock = field(factory=threading.Lock, init=False, repr=False)
+    _window_start: float = field(factory=time.monotonic, init=False, repr=False)
+    _window_bytes: int = field(default=0, init=False, repr=False)
+    _paused_since: Optional[float] = field(default=None, init=False, repr=False)
+    _stall: Optional[UploadStalledError] = field(default=None, init=False, repr=False)
+
+    @property
+    def stall(self) -> Optional[UploadStalledError]:
+        """
+        Error describing the stall, if the upload has stalled
+        """
+        return self._stall
+
+    def check(self) -> None:
+        """
+        Check the throughput over the current window
+
+        Once a window is complete (and the throughput was high enough),
+        a new window starts.
+        Time spent paused is excluded.
+
+        Raises
+        ------
+        UploadStalledError
+            The throughput over the last window was below the minimum
+            (or the upload stalled earlier)
+        """
+        with self._lock:
+            if self._stall is not None:
+                raise self._stall
+
+            if self._paused_since is not None:
+                return
+
+            elapsed = time.monotonic() - self._window_start
+            if elapsed < self.window_seconds:
+                return
+
+            throughput = self._window_bytes / elapsed
+            if throughput < self.min_bytes_per_second:
+                msg = (
+                    f"{self.name} stalled: {throughput:.0f} B/s over the last "
+                    f"{elapsed:.0f}s, "
+                    f"the minimum is {self.min_bytes_per_second:.0f} B/s"
+                )
+                self._stall = UploadStalledError(msg)
+                raise self._stall
+
+            self._window_start = time.monotonic()
+            self._window_bytes = 0
+
+    def on_progress(self, n_bytes: int) -> None:
+        """
+        Record that data was sent
+
+        Parameters
+        ----------
+        n_bytes
+            Number of bytes sent
+
+        Raises
+        ------
+        UploadStalledError
+            The throughput over the last window was below the minimum
+        """
+        with self._lock:
+            self._window_bytes += n_bytes
+
+        self.check()
+
+    @contextlib.contextmanager
+    def paused(self) -> Iterator[None]:
+        """
+        Exclude the time spent in this context from the throughput
+        """
+        start = time.monotonic()
+        with self._lock:
+            self._paused_since = start
+
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._window_start += time.monotonic() - start
+                self._paused_since = None
+
+
+@define
+class StallMonitor:
+    """
+    Background thread which checks the throughput of uploads
+
+    One monitor can watch any number of uploads.
+    Its thread is only running while there is something to watch.
+    If it finds an upload stalled, it calls the upload's
+    [`abort`][openscm_zenodo.watchdog.ThroughputWatchdog.abort] callback,
+    so an upload stuck sending a chunk doesn't have to finish the chunk first.
+    """
+
+    check_interval: float = 1.0
+    """Interval (seconds) between checks"""
+
+    _lock: threading.Lock = field(factory=threading.Lock, init=False, repr=False)
+    _watchdogs: list[ThroughputWatchdog] = field(factory=list, init=False, repr=False)
+    _running: bool = field(default=False, init=False, repr=False)
+
+    @contextlib.contextmanager
+    def watching(self, watchdog: ThroughputWatchdog) -> Iterator[None]:
+        """
+        Watch an upload while in this context
+
+        Parameters
+        ----------
+        watchdog
+            Watchdog of the upload
+        """
+        with self._lock:
+            self._watchdogs.append(watchdog)
+            if not self._running:
+                self._running = True
+                threading.Thread(
+                    target=self._run, name="openscm-zenodo-stall-monitor", daemon=True
+                ).start()
+
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._watchdogs.remove(watchdog)
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.check_interval)
+            with self._lock:
+                if not self._watchdogs:
+                    self._running = False
+                    return
+
+                watchdogs = [v for v in self._watchdogs if v.stall is None]
+
+            for watchdog in watchdogs:
+                try:
+                    watchdog.check()
+                except UploadStalledError as exc:
+                    logger.warning("{}, aborting it", exc)
+                    if watchdog.abort is not None:
+                        watchdog.abort()
@@ -5,22 +5,60 @@ Zenodo interactions handling
 from __future__ import annotations
 
 import concurrent.futures
+import contextlib
+import functools
 import json
 import logging
 import os.path
-from collections.abc import Collection, Iterable
+import queue
+import socket
+import threading
+import warnings
+from collections.abc import Collection, Iterable, Iterator
 from enum import Enum, auto
 from pathlib import Path
-from typing import Any, Optional, Union
+from typing import TYPE_CHECKING, Any, BinaryIO, Callable, Optional, Union
 
 import requests
 import tqdm
 import tqdm.utils
+import urllib3
 from attrs import define, field
 from loguru import logger
 from typing_extensions import TypeAlias
 
+from openscm_zenodo.bandwidth import BandwidthLimiter, UploadCancelledError
+from openscm_zenodo.compression import (
+    COMPRESSION_MANIFEST_FILENAME,
+    CompressedFile,
+    CompressionMethod,
+    create_compression_process_pool,
+    get_compression_manifest,
+)
+from openscm_zenodo.concurrency import AdaptiveConcurrency
+from openscm_zenodo.domains import ZenodoDomain
 from openscm_zenodo.logging import mask_token
+from openscm_zenodo.metadata import (
+    get_metadata_diff,
+    get_user_controlled_metadata,
+    validate_metadata,
+)
+
+if TYPE_CHECKING:
+    from openscm_zenodo.checkpoint import ReleaseCheckpoint
+    from openscm_zenodo.uploads import UploadHandle
+
+from openscm_zenodo.streaming import (
+    MMAP_CHUNK_SIZE,
+    STREAM_CHUNK_SIZE,
+    MmapFileBody,
+    StreamBody,
+)
+from openscm_zenodo.watchdog import (
+    StallMonitor,
+    ThroughputWatchdog,
+    UploadStalledError,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -32,15 +70,6 @@ TQDM_UPLOAD_PROGRESS_KWARGS_DEFAULT = dict(
 """Default configuration for upload progress bar"""
 
 
-class ZenodoDomain(str, Enum):
-    """
-    Supported zenodo URLs
-    """
-
-    production = "https://zenodo.org"
-    sandbox = "https://sandbox.zenodo.org"
-
-
 class RestAction(Enum):
     """
     Known rest actions
@@ -70,6 +99,153 @@ class RestAction(Enum):
 MetadataType: TypeAlias = dict[str, dict[str, str]]
 
 
+CANCELLED_ERRORS = (UploadCancelledError, concurrent.futures.CancelledError)
+"""
+Exceptions which mean an upload was cancelled rather than failing
+
+Cancelled uploads are reported separately from failed ones,
+see [`UploadFilesError`][openscm_zenodo.zenodo.UploadFilesError].
+"""
+
+
+class UploadFilesError(Exception):
+    """
+    Raised when some of the uploads in a call to `upload_files` fail
+
+    Every failure is recorded (not just the first),
+    so the files which weren't uploaded can be retried on their own.
+    """
+
+    def __init__(
+        self,
+        failures: dict[Path, Exception],
+        cancelled: list[Path],
+        responses: tuple[requests.models.Response, ...],
+    ) -> None:
+        self.failures = failures
+        """Exception raised by each upload which failed"""
+
+        self.cancelled = cancelled
+        """Files whose uploads were cancelled (after another upload failed)"""
+
+        self.responses = responses
+        """Responses from the uploads which succeeded"""
+
+        failure_lines = "\n".join(f"- {k}: {v!r}" for k, v in failures.items())
+        msg = f"{len(failures)} upload(s) failed:\n{failure_lines}"
+        if cancelled:
+            msg = f"{msg}\n{len(cancelled)} upload(s) were cancelled"
+
+        super().__init__(msg)
+
+    @property
+    def not_uploaded(self) -> list[Path]:
+        """
+        Files which were not uploaded, i.e. which failed or were cancelled
+        """
+        return [*self.failures, *self.cancelled]
+
+
+_watched_uploads = threading.local()
+"""
+Upload being sent by each thread, if it is watched for stalls
+
+Set to a (monitor, watchdog) tuple while the upload is sent.
+"""
+
+
+@contextlib.contextmanager
+def _watch_request(connection: urllib3.connection.HTTPConnection) -> Iterator[None]:
+    """
+    Watch the upload in this thread (if any) while its body is sent
+
+    The monitor can then abort the upload by shutting down its connection,
+    even part-way through sending a chunk.
+    Waiting for the response isn't watched,
+    as Zenodo can take a while to respond once it has the whole file.
+    """
+    watched: Optional[tuple[StallMonitor, ThroughputWatchdog]] = getattr(
+        _watched_uploads, "value", None
+    )
+    if watched is None:
+        yield
+        return
+
+    stall_monitor, watchdog = watched
+
+    def abort() -> None:
+        if connection.sock is not None:
+            with contextlib.suppress(OSError):
+                connection.sock.shutdown(socket.SHUT_RDWR)
+
+    watchdog.abort = abort
+    with stall_monitor.watching(watchdog):
+        yield
+
+
+class _WatchedHTTPConnection(urllib3.connection.HTTPConnection):
+    def request(self, *args: Any, **kwargs: Any) -> None:
+        with _watch_request(self):
+            super().request(*args, **kwargs)
+
+
+class _WatchedHTTPSConnection(urllib3.connection.HTTPSConnection):
+    def request(self, *args: Any, **kwargs: Any) -> None:
+        with _watch_request(self):
+            super().request(*args, **kwargs)
+
+
+class _WatchedHTTPConnectionPool(urllib3.HTTPConnectionPool):
+    ConnectionCls = _WatchedHTTPConnection
+
+
+class _WatchedHTTPSConnectionPool(urllib3.HTTPSConnectionPool):
+    ConnectionCls = _WatchedHTTPSConnection
+
+
+class _WatchedHTTPAdapter(requests.adapters.HTTPAdapter):
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _WatchedHTTPConnectionPool,
+            "https": _WatchedHTTPSConnectionPool,
+        }
+
+
+SESSION_POOL_MAXSIZE: int = 32
+"""Maximum number of connections to keep per host in a session's pool"""
+
+
+def create_session(pool_maxsize: int = SESSION_POOL_MAXSIZE) -> requests.Session:
+    """
+    Create a session for interacting with Zenodo
+
+    The session keeps connections alive between requests,
+    so repeated requests don't pay for new TLS connections every time.
+    Its connections can also be shut down part-way through an upload
+    if the upload stalls (see [`openscm_zenodo.watchdog`][openscm_zenodo.watchdog]).
+
+    Parameters
+    ----------
+    pool_maxsize
+        Maximum number of connections to keep per host.
+
+        This should be at least the number of threads used for uploads,
+        otherwise connections will be discarded rather than re-used.
+
+    Returns
+    -------
+    :
+        Session
+    """
+    session = requests.Session()
+    adapter = _WatchedHTTPAdapter(pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    return session
+
+
 @define
 class ZenodoInteractor:
     """
@@ -85,8 +261,115 @@ class ZenodoInteractor:
     timeout: int = 10
     """Timeout to apply to requests calls"""
 
-    timeout_upload: int = 60 * 60
-    """Timeout to apply to uploads"""
+    timeout_upload: Optional[float] = field(
+        default=None,
+        on_setattr=lambda instance, attribute, value: instance._set_timeout_upload(
+            value
+        ),
+    )
+    """
+    Deprecated alias for `timeout_upload_read`
+
+    If supplied, this sets `timeout_upload_read` and a `DeprecationWarning` is raised.
+    Use `timeout_upload_connect` and `timeout_upload_read` instead.
+    """
+
+    timeout_upload_connect: float = 10.0
+    """Timeout for connecting to Zenodo for uploads (seconds)"""
+
+    timeout_upload_read: float = 10 * 60.0
+    """
+    Timeout for waiting on Zenodo during uploads (seconds)
+
+    This applies to each read from (or write to) the connection,
+    e.g. while waiting for Zenodo's response once all the data has been sent,
+    not to the upload as a whole.
+    """
+
+    min_upload_throughput: Optional[float] = None
+    """
+    Minimum throughput of each upload (bytes per second)
+
+    Uploads whose throughput stays below this for `stall_seconds`
+    are aborted (and retried, see `upload_retries`).
+    If `None`, uploads are only stopped by the timeouts.
+    """
+
+    stall_seconds: float = 60.0
+    """Time for which an upload's throughput must be too low to be aborted"""
+
+    upload_retries: int = 2
+    """
+    Number of times to retry uploads which stall or time out
+
+    Uploads of streams which can't be read again are not retried.
+    """
+
+    n_upload_retries: int = field(default=0, init=False, eq=False)
+    """Number of times uploads have been retried (after stalls or timeouts)"""
+
+    _n_upload_retries_lock: threading.Lock = field(
+        factory=threading.Lock, init=False, repr=False, eq=False
+    )
+    _stall_monitor: StallMonitor = field(init=False, repr=False, eq=False)
+
+    def __attrs_post_init__(self) -> None:
+        """
+        Apply the deprecated `timeout_upload`, if it was supplied
+        """
+        self._set_timeout_upload(self.timeout_upload)
+
+    def _set_timeout_upload(self, value: Optional[float]) -> Optional[float]:
+        if value is not None:
+            warnings.warn(
+                "`timeout_upload` is deprecated, "
+                "use `timeout_upload_read` (and `timeout_upload_connect`) instead",
+                DeprecationWarning,
+                stacklevel=4,
+            )
+            self.timeout_upload_read = value
+
+        return value
+
+    @_stall_monitor.default
+    def _stall_monitor_default(self) -> StallMonitor:
+        # Often enough that stalls are caught soon after `stall_seconds`
+        return StallMonitor(check_interval=min(1.0, self.stall_seconds / 4))
+
+    max_bandwidth: Optional[float] = None
+    """
+    Maximum total bandwidth to use for uploads (bytes per second)
+
+    The limit applies across all upload threads.
+    If `None`, there is no limit.
+    """
+
+    bandwidth_limiter: BandwidthLimiter = field(init=False, repr=False, eq=False)
+    """
+    Limiter which applies `max_bandwidth` to all uploads
+
+    This can also be used to pause and resume uploads.
+    """
+
+    session: requests.Session = field(factory=create_session, repr=False, eq=False)
+    """
+    Session to use for requests
+
+    Connections are pooled and re-used across requests (and threads).
+    """
+
+    @bandwidth_limiter.default
+    def _bandwidth_limiter_default(self) -> BandwidthLimiter:
+        return BandwidthLimiter(max_bytes_per_second=self.max_bandwidth)
+
+    _draft_deposition_ids: dict[str, str] = field(factory=dict, init=False, repr=False)
+    """
+    Index from concept ID to the ID of the draft deposition for that concept
+
+    Populated as drafts are found or created,
+    so repeated draft look-ups do not have to go back to Zenodo.
+    Entries are dropped when this interactor publishes or deletes the draft.
+    """
 
     def create_new_version_from_latest(
         self,
@@ -128,11 +411,16 @@ class ZenodoInteractor:
                 post_domain_part=f"/api/deposit/depositions/{latest_deposition_id}/actions/newversion",
                 rest_action=RestAction.post,
             )
+            create_new_version_response_json = create_new_version_response.json()
             logger.info(
                 "Successfully created new version. "
                 "The new version's deposition id is "
-                f"{create_new_version_response.json()['id']!r}"
+                f"{create_new_version_response_json['id']!r}"
             )
+            if "conceptrecid" in create_new_version_response_json:
+                self._draft_deposition_ids[
+                    str(create_new_version_response_json["conceptrecid"])
+                ] = str(create_new_version_response_json["id"])
 
         except requests.exceptions.HTTPError as exc:
             exc_response_json = exc.response.json()
@@ -182,8 +470,61 @@ class ZenodoInteractor:
             f"/api/deposit/depositions/{deposition_id}",
             rest_action=RestAction.delete,
         )
+        self._forget_draft_deposition_id(deposition_id)
         logger.info(f"Successfully deleted {deposition_id=!r}")
 
+    def find_draft_deposition_id(
+        self,
+        concept_id: str,
+        page_size: int = 100,
+    ) -> Union[str, None]:
+        """
+        Find the ID of an existing draft deposition for a concept
+
+        Parameters
+        ----------
+        concept_id
+            Concept ID for which to find the draft
+
+        page_size
+            Number of drafts to request per page.
+
+            Drafts are requested page by page
+            and the search stops as soon as a matching draft is found.
+
+        Returns
+        -------
+        :
+            ID of the draft deposition.
+            `None` if there is no draft deposition for `concept_id`.
+        """
+        if concept_id in self._draft_deposition_ids:
+            draft_deposition_id = self._draft_deposition_ids[concept_id]
+            logger.debug(
+                f"Using known draft {draft_deposition_id!r} for {concept_id=!r}"
+            )
+            return draft_deposition_id
+
+        logger.info(f"Searching for an existing draft for {concept_id=!r}")
+        for draft in self.iter_depositions(
+            status="draft",
+            # Let Zenodo do the filtering where it can,
+            # we still check the concept ID below in case it doesn't
+            query=f"conceptrecid:{concept_id}",
+            page_size=page_size,
+        ):
+            if str(draft["conceptrecid"]) == concept_id:
+                draft_deposition_id = str(draft["id"])
+                logger.info(
+                    f"Found existing draft {draft_deposition_id!r} for {concept_id=!r}"
+                )
+                self._draft_deposition_ids[concept_id] = draft_deposition_id
+
+                return draft_deposition_id
+
+        logger.info(f"No existing draft found for {concept_id=!r}")
+        return None
+
     def get_bibtex_entry(
         self,
         deposition_id: str,
@@ -284,6 +625,10 @@ class ZenodoInteractor:
         If no draft exists, it is created from the latest deposition ID.
         Otherwise, the existing draft is returned.
 
+        We look for an existing draft first (see
+        [`find_draft_deposition_id`][openscm_zenodo.zenodo.ZenodoInteractor.find_draft_deposition_id])
+        and only ask Zenodo to create a new version if there isn't one.
+
         Parameters
         ----------
         latest_deposition_id
@@ -294,26 +639,22 @@ class ZenodoInteractor:
         :
             ID of the draft deposition
         """
-        draft_deposition_id: None | str = None
+        concept_id = self.get_concept_id(any_deposition_id=latest_deposition_id)
+
+        draft_deposition_id = self.find_draft_deposition_id(concept_id=concept_id)
+        if draft_deposition_id is not None:
+            return draft_deposition_id
+
         try:
-            draft_deposition_id = self.create_new_version_from_latest(
-                latest_deposition_id=latest_deposition_id
-            ).json()["id"]
+            draft_deposition_id = str(
+                self.create_new_version_from_latest(
+                    latest_deposition_id=latest_deposition_id
+                ).json()["id"]
+            )
 
         except AssertionError:
-            concept_id_record = self.get_record(record_id=latest_deposition_id).json()[
-                "conceptrecid"
-            ]
-
-            drafts = self.get_response(
-                post_domain_part="/api/deposit/depositions",
-                rest_action=RestAction.get,
-                params={"status": "draft"},
-            ).json()
-            for draft in drafts:
-                if draft["conceptrecid"] == concept_id_record:
-                    draft_deposition_id = draft["record_id"]
-                    break
+            # Someone else created a draft since we looked
+            draft_deposition_id = self.find_draft_deposition_id(concept_id=concept_id)
 
         if draft_deposition_id is None:
             msg = "Should have created a new draft or found an existing draft"
@@ -321,6 +662,30 @@ class ZenodoInteractor:
 
         return draft_deposition_id
 
+    def get_files(self, deposition_id: str) -> list[dict[str, Any]]:
+        """
+        Get the files currently associated with a deposition
+
+        Parameters
+        ----------
+        deposition_id
+            The ID of the deposition
+
+        Returns
+        -------
+        :
+            Information about each file, as returned by Zenodo
+            (keys include "id", "filename", "filesize" and "checksum").
+        """
+        logger.info(f"Retrieving files for {deposition_id=!r}")
+        files_response = self.get_response(
+            f"/api/deposit/depositions/{deposition_id}/files",
+        )
+
+        files: list[dict[str, Any]] = files_response.json()
+
+        return files
+
     def get_latest_deposition_id(
         self,
         any_deposition_id: str,
@@ -354,9 +719,7 @@ class ZenodoInteractor:
         record = self.get_record(record_id=any_deposition_id)
         record_json = record.json()
 
-        record_latest = requests.get(
-            record_json["links"]["latest"], timeout=self.timeout
-        )
+        record_latest = self.get_response_from_url(record_json["links"]["latest"])
 
         latest_deposition_id = str(record_latest.json()["id"])
         logger.info(
@@ -408,15 +771,7 @@ class ZenodoInteractor:
         metadata = {"metadata": deposition.json()["metadata"]}
 
         if user_controlled_only:
-            for k in [
-                "doi",
-                "imprint_publisher",
-                "prereserve_doi",
-                "publication_date",
-                "relations",
-            ]:
-                if k in metadata["metadata"]:
-                    metadata["metadata"].pop(k)
+            metadata = get_user_controlled_metadata(metadata)
 
         return metadata
 
@@ -481,17 +836,64 @@ class ZenodoInteractor:
         else:
             zenodo_domain = self.zenodo_domain
 
+        return self.get_response_from_url(
+            url=f"{zenodo_domain}{post_domain_part}",
+            rest_action=rest_action,
+            params=params,
+            **kwargs,
+        )
+
+    def get_response_from_url(
+        self,
+        url: str,
+        rest_action: RestAction = RestAction.get,
+        params: Union[dict[str, str], None] = None,
+        **kwargs: Any,
+    ) -> requests.models.Response:
+        """
+        Get a response from a complete Zenodo URL
+
+        This is useful for following the links that Zenodo includes in its responses
+        (e.g. `links.latest`) while still applying our authentication and timeouts.
+        In most cases, you will want
+        [`get_response`][openscm_zenodo.zenodo.ZenodoInteractor.get_response].
+
+        Parameters
+        ----------
+        url
+            The URL to hit
+
+        rest_action
+            The REST action to use
+
+        params
+            Headers to use as part of the request.
+
+            The authentication token is automatically added
+            before passing to the relevant requests action
+            so you don't need to included that in `params`.
+
+        **kwargs
+            Passed to the relevant requests action.
+
+        Returns
+        -------
+        :
+            Response from the URL that was hit
+        """
         if params is None:
             params = {}
 
         if self.token:
             params["access_token"] = self.token
 
-        url_to_hit = f"{zenodo_domain}{post_domain_part}"
-        # Mask just in case the user put the token in the URL by accident
-        logger.debug(
-            f"Sending {rest_action} request to "
-            f"{mask_token(url_to_hit, token=self.token)}"
+        # Mask just in case the user put the token in the URL by accident.
+        # This is called for every request,
+        # so only mask if the message will actually be logged.
+        logger.opt(lazy=True).debug(
+            "Sending {} request to {}",
+            lambda: rest_action,
+            lambda: mask_token(url, token=self.token),
         )
 
         requests_kwargs = dict(
@@ -499,20 +901,16 @@ class ZenodoInteractor:
             **kwargs,
         )
         if rest_action == RestAction.get:
-            response = requests.get(url_to_hit, **requests_kwargs, timeout=self.timeout)
+            response = self.session.get(url, **requests_kwargs, timeout=self.timeout)
 
         elif rest_action == RestAction.post:
-            response = requests.post(
-                url_to_hit, **requests_kwargs, timeout=self.timeout
-            )
+            response = self.session.post(url, **requests_kwargs, timeout=self.timeout)
 
         elif rest_action == RestAction.put:
-            response = requests.put(url_to_hit, **requests_kwargs, timeout=self.timeout)
+            response = self.session.put(url, **requests_kwargs, timeout=self.timeout)
 
         elif rest_action == RestAction.delete:
-            response = requests.delete(
-                url_to_hit, **requests_kwargs, timeout=self.timeout
-            )
+            response = self.session.delete(url, **requests_kwargs, timeout=self.timeout)
 
         else:
             raise NotImplementedError(rest_action)
@@ -525,6 +923,125 @@ class ZenodoInteractor:
 
         return response
 
+    def iter_depositions(
+        self,
+        status: Optional[str] = None,
+        query: Optional[str] = None,
+        page_size: int = 100,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Iterate over the depositions of the authenticated user
+
+        Pages are only requested from Zenodo as they are needed,
+        so stopping the iteration early avoids requesting the remaining pages.
+
+        Parameters
+        ----------
+        status
+            Only return depositions with this status
+            (e.g. "draft" or "published").
+
+            If not supplied, depositions of all statuses are returned.
+
+        query
+            Search query (Elasticsearch syntax) to pass to Zenodo
+
+        page_size
+            Number of depositions to request per page
+
+        Yields
+        ------
+        :
+            Deposition JSON, as returned by Zenodo
+        """
+        params = {"size": str(page_size)}
+        if status is not None:
+            params["status"] = status
+
+        if query is not None:
+            params["q"] = query
+
+        page = 1
+        while True:
+            logger.debug(f"Retrieving page {page} of depositions")
+            depositions = self.get_response(
+                post_domain_part="/api/deposit/depositions",
+                rest_action=RestAction.get,
+                params={**params, "page": str(page)},
+            ).json()
+
+            yield from depositions
+
+            if len(depositions) < page_size:
+                return
+
+            page += 1
+
+    def iter_drafts(self, page_size: int = 100) -> Iterator[dict[str, Any]]:
+        """
+        Iterate over the draft depositions of the authenticated user
+
+        Parameters
+        ----------
+        page_size
+            Number of drafts to request per page
+
+        Yields
+        ------
+        :
+            Draft deposition JSON, as returned by Zenodo
+        """
+        yield from self.iter_depositions(status="draft", page_size=page_size)
+
+    def iter_versions(
+        self,
+        concept_id: str,
+        page_size: int = 100,
+    ) -> Iterator[dict[str, Any]]:
+        """
+        Iterate over the published versions of a concept
+
+        Versions are returned newest first.
+
+        Parameters
+        ----------
+        concept_id
+            Concept ID for which to retrieve the versions.
+
+            If you only have the ID of a deposition, see
+            [`get_concept_id`][openscm_zenodo.zenodo.ZenodoInteractor.get_concept_id].
+
+        page_size
+            Number of versions to request per page
+
+        Yields
+        ------
+        :
+            Record JSON for each version, as returned by Zenodo
+        """
+        page = 1
+        while True:
+            logger.debug(f"Retrieving page {page} of versions of {concept_id=!r}")
+            records = self.get_response(
+                post_domain_part="/api/records",
+                rest_action=RestAction.get,
+                params={
+                    "q": f"conceptrecid:{concept_id}",
+                    "all_versions": "true",
+                    "sort": "-version",
+                    "size": str(page_size),
+                    "page": str(page),
+                },
+            ).json()
+
+            hits = records["hits"]["hits"]
+            yield from hits
+
+            if not hits or "next" not in records.get("links", {}):
+                return
+
+            page += 1
+
     def publish(self, deposition_id: str) -> requests.models.Response:
         """
         Publish a deposition
@@ -546,10 +1063,26 @@ class ZenodoInteractor:
             f"/api/deposit/depositions/{deposition_id}/actions/publish",
             rest_action=RestAction.post,
         )
+        self._forget_draft_deposition_id(deposition_id)
         logger.info(f"Successfully published {deposition_id=!r}")
 
         return response
 
+    def _forget_draft_deposition_id(self, deposition_id: str) -> None:
+        """
+        Remove a deposition from our index of known drafts
+
+        Parameters
+        ----------
+        deposition_id
+            Deposition ID which is no longer a draft
+        """
+        for concept_id, draft_deposition_id in tuple(
+            self._draft_deposition_ids.items()
+        ):
+            if draft_deposition_id == str(deposition_id):
+                self._draft_deposition_ids.pop(concept_id)
+
     def remove_all_files(
         self,
         deposition_id: str,
@@ -570,11 +1103,7 @@ class ZenodoInteractor:
             The response(s) from the file removal request(s)
         """
         logger.info(f"Removing all files from {deposition_id=!r}")
-        files_response = self.get_response(
-            f"/api/deposit/depositions/{deposition_id}/files",
-        )
-
-        file_ids_to_remove = [v["id"] for v in files_response.json()]
+        file_ids_to_remove = [v["id"] for v in self.get_files(deposition_id)]
 
         return self.remove_files_by_id(
             deposition_id=deposition_id,
@@ -639,12 +1168,9 @@ class ZenodoInteractor:
         )
         filenames_to_delete = set(f.name for f in to_remove)
 
-        files_response = self.get_response(
-            f"/api/deposit/depositions/{deposition_id}/files",
-        )
         file_ids_to_remove = [
             v["id"]
-            for v in files_response.json()
+            for v in self.get_files(deposition_id)
             if v["filename"] in filenames_to_delete
         ]
 
@@ -708,12 +1234,274 @@ class ZenodoInteractor:
 
         return responses
 
-    def upload_file_to_bucket_url(
+    def _throttle_upload(
         self,
-        to_upload: Path,
-        bucket_url: str,
-        tqdm_kwargs: Optional[dict[str, Any]] = None,
-    ) -> requests.models.Response:
+        n_bytes: int,
+        watchdog: Optional[ThroughputWatchdog],
+        cancel_event: Optional[threading.Event],
+    ) -> None:
+        """
+        Wait until a chunk of an upload can be sent
+        """
+        if watchdog is None:
+            self.bandwidth_limiter.consume(n_bytes, cancel_event=cancel_event)
+        else:
+            with watchdog.paused():
+                self.bandwidth_limiter.consume(n_bytes, cancel_event=cancel_event)
+
+            watchdog.on_progress(n_bytes)
+
+        # Checked after waiting, so paused uploads also stop once resumed
+        if cancel_event is not None and cancel_event.is_set():
+            msg = "The uploads were cancelled"
+            raise UploadCancelledError(msg)
+
+    def _put_upload(
+        self,
+        upload_url: str,
+        get_data: Callable[[Callable[[int], None]], Any],
+        retry: bool = True,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> requests.models.Response:
+        """
+        Send data to an upload URL, retrying if the upload stalls or times out
+
+        Parameters
+        ----------
+        upload_url
+            URL to upload to
+
+        get_data
+            Function which creates the data to send.
+
+            This is called for each attempt with a callback
+            which the data must call with the size of each chunk before it is sent.
+            The callback applies the bandwidth limit and watches for stalls.
+
+        retry
+            Retry uploads which stall or time out (up to `self.upload_retries` times)
+
+        cancel_event
+            If supplied, the upload is aborted (before its next chunk)
+            once this is set
+
+        Returns
+        -------
+        :
+            The response from the upload request
+
+        Raises
+        ------
+        UploadStalledError
+            The upload stalled (on every attempt)
+
+        UploadCancelledError
+            `cancel_event` was set
+        """
+        attempt = 0
+        while True:
+            watchdog = (
+                ThroughputWatchdog(
+                    min_bytes_per_second=self.min_upload_throughput,
+                    window_seconds=self.stall_seconds,
+                    name=f"Upload to {upload_url!r}",
+                )
+                if self.min_upload_throughput is not None
+                else None
+            )
+            throttle = functools.partial(
+                self._throttle_upload, watchdog=watchdog, cancel_event=cancel_event
+            )
+            # Don't even connect if the uploads have already been cancelled
+            throttle(0)
+
+            try:
+                return self._send_upload(
+                    upload_url, data=get_data(throttle), watchdog=watchdog
+                )
+
+            except (
+                UploadStalledError,
+                requests.ConnectionError,
+                requests.Timeout,
+            ) as exc:
+                if not retry or attempt >= self.upload_retries:
+                    raise
+
+                attempt += 1
+                with self._n_upload_retries_lock:
+                    self.n_upload_retries += 1
+
+                logger.warning(
+                    "Retrying upload to {!r} ({} of {}) after: {}",
+                    upload_url,
+                    attempt,
+                    self.upload_retries,
+                    exc,
+                )
+
+    def _send_upload(
+        self, upload_url: str, data: Any, watchdog: Optional[ThroughputWatchdog]
+    ) -> requests.models.Response:
+        """
+        Send data to an upload URL, watching it for stalls if there is a watchdog
+
+        If the upload stalls part-way through a chunk,
+        the watchdog's monitor shuts down the connection.
+        The error from the connection is then raised as an `UploadStalledError`.
+        """
+        _watched_uploads.value = (
+            (self._stall_monitor, watchdog) if watchdog is not None else None
+        )
+        try:
+            return self.session.put(
+                upload_url,
+                data=data,
+                params={"access_token": self.token},
+                timeout=(self.timeout_upload_connect, self.timeout_upload_read),
+            )
+
+        except (requests.ConnectionError, OSError) as exc:
+            if watchdog is None or watchdog.stall is None:
+                raise
+
+            raise watchdog.stall from exc
+
+        finally:
+            _watched_uploads.value = None
+
+    def _get_upload_task(  # noqa: PLR0913
+        self,
+        bucket_url: str,
+        to_upload: Path,
+        compressed_file: Optional[CompressedFile],
+        tqdm_kwargs: Optional[dict[str, Any]],
+        use_mmap: bool,
+        cancel_event: threading.Event,
+    ) -> tuple[Callable[[], requests.models.Response], int]:
+        """
+        Get the task which uploads a file
+
+        The task is a callable which does the upload
+        and the number of bytes it uploads (before any compression).
+        """
+        if compressed_file is not None:
+            return (
+                functools.partial(
+                    self.upload_stream_to_bucket_url,
+                    source=compressed_file,
+                    filename=compressed_file.filename,
+                    bucket_url=bucket_url,
+                    tqdm_kwargs=tqdm_kwargs,
+                    cancel_event=cancel_event,
+                ),
+                os.stat(compressed_file.path).st_size,
+            )
+
+        return (
+            functools.partial(
+                self.upload_file_to_bucket_url,
+                to_upload=to_upload,
+                bucket_url=bucket_url,
+                tqdm_kwargs=tqdm_kwargs,
+                use_mmap=use_mmap,
+                cancel_event=cancel_event,
+            ),
+            os.stat(to_upload).st_size,
+        )
+
+    def start_upload_files(  # noqa: PLR0913
+        self,
+        deposition_id: str,
+        to_upload: Collection[Path],
+        tqdm_kwargs: Optional[dict[str, Any]] = None,
+        n_threads: int = 4,
+        use_mmap: bool = False,
+        compression: Optional[CompressionMethod] = None,
+        fail_fast: bool = True,
+    ) -> UploadHandle:
+        """
+        Start uploading file(s) to a deposition in the background
+
+        Unlike [`upload_files`][openscm_zenodo.zenodo.ZenodoInteractor.upload_files],
+        this returns as soon as the uploads have started,
+        so other work can be done while they run.
+
+        Parameters
+        ----------
+        deposition_id
+            ID of the deposition to upload to
+
+        to_upload
+            File(s) to upload
+
+        tqdm_kwargs
+            Keyword arguments to use with each upload's progress bar
+
+        n_threads
+            Number of threads to use for the uploads
+
+        use_mmap
+            Send the files from memory maps
+
+        compression
+            If supplied, compress each file with this method while uploading it
+            (see [`upload_files`][openscm_zenodo.zenodo.ZenodoInteractor.upload_files])
+
+        fail_fast
+            Cancel the rest of the uploads as soon as one fails
+
+        Returns
+        -------
+        :
+            Handle to the uploads.
+
+            Use it to follow their progress, cancel them or wait for them
+            (see [`UploadHandle`][openscm_zenodo.uploads.UploadHandle]).
+
+        Raises
+        ------
+        ValueError
+            More than one of `to_upload` has the same name
+        """
+        from openscm_zenodo.uploads import UploadHandle
+
+        logger.info(
+            "Starting {} upload(s) to deposition_id={!r}", len(to_upload), deposition_id
+        )
+        bucket_url = self.get_bucket_url(deposition_id)
+        cancel_event = threading.Event()
+        tasks = []
+        for file in to_upload:
+            task, size = self._get_upload_task(
+                bucket_url,
+                to_upload=file,
+                compressed_file=(
+                    CompressedFile(file, method=compression, n_threads=n_threads)
+                    if compression is not None
+                    else None
+                ),
+                tqdm_kwargs=tqdm_kwargs,
+                use_mmap=use_mmap,
+                cancel_event=cancel_event,
+            )
+            tasks.append((file, task, size))
+
+        return UploadHandle.start(
+            tasks,
+            n_threads=n_threads,
+            cancel_event=cancel_event,
+            fail_fast=fail_fast,
+        )
+
+    def upload_file_to_bucket_url(
+        self,
+        to_upload: Path,
+        bucket_url: str,
+        tqdm_kwargs: Optional[dict[str, Any]] = None,
+        use_mmap: bool = False,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> requests.models.Response:
         """
         Upload a file to a bucket URL
 
@@ -741,6 +1529,19 @@ class ZenodoInteractor:
             If not supplied, we use
             [`TQDM_UPLOAD_PROGRESS_KWARGS_DEFAULT`][openscm_zenodo.zenodo.TQDM_UPLOAD_PROGRESS_KWARGS_DEFAULT].
 
+        use_mmap
+            Send the file from a memory map in large chunks
+            (see [`MmapFileBody`][openscm_zenodo.streaming.MmapFileBody]).
+
+            This reduces copies and Python overhead,
+            which helps for very large files on fast disks.
+            The progress bar is then only updated periodically.
+
+        cancel_event
+            If supplied, the upload is aborted before its next chunk
+            once this is set, with an
+            [`UploadCancelledError`][openscm_zenodo.bandwidth.UploadCancelledError].
+
         Returns
         -------
         :
@@ -751,35 +1552,67 @@ class ZenodoInteractor:
 
         upload_url = f"{bucket_url}/{to_upload.name}"
 
-        logger.info(f"Uploading {to_upload} to {upload_url=!r}")
+        # Formatted by loguru, only if the message is logged
+        logger.info("Uploading {} to upload_url={!r}", to_upload, upload_url)
 
         file_size = os.stat(to_upload).st_size
-        with tqdm.tqdm(total=file_size, **tqdm_kwargs) as tqdm_bar:
-            with open(to_upload, "rb") as file_handle:
-                wrapped_file = tqdm.utils.CallbackIOWrapper(
-                    tqdm_bar.update, file_handle, "read"
-                )
-                response = requests.put(
-                    upload_url,
-                    data=wrapped_file,
-                    params={"access_token": self.token},
-                    timeout=self.timeout_upload,
-                )
+        with contextlib.ExitStack() as stack:
+            tqdm_bar = stack.enter_context(tqdm.tqdm(total=file_size, **tqdm_kwargs))
+
+            def get_data(throttle: Callable[[int], None]) -> Any:
+                # Start from scratch on each attempt
+                tqdm_bar.reset()
+                if use_mmap:
+                    return MmapFileBody(
+                        to_upload,
+                        callback=tqdm_bar.update,
+                        throttle=throttle,
+                        chunk_size=self.bandwidth_limiter.get_chunk_size(
+                            MMAP_CHUNK_SIZE
+                        ),
+                    )
+
+                def on_read(n_bytes: int) -> None:
+                    # Called after each read, but before the data is sent
+                    throttle(n_bytes)
+                    tqdm_bar.update(n_bytes)
+
+                # Closed once the upload is done
+                file_handle = stack.enter_context(open(to_upload, "rb"))
+
+                return tqdm.utils.CallbackIOWrapper(on_read, file_handle, "read")
+
+            response = self._put_upload(
+                upload_url, get_data=get_data, cancel_event=cancel_event
+            )
 
         response.raise_for_status()
-        logger.info(f"Successfully uploaded {to_upload}")
+        logger.info("Successfully uploaded {}", to_upload)
         return response
 
-    def upload_files(
+    def upload_files(  # noqa: PLR0913
         self,
         deposition_id: str,
-        to_upload: Collection[Path],
+        to_upload: Iterable[Path],
         tqdm_kwargs: Optional[dict[str, Any]] = None,
         n_threads: int = 4,
+        use_mmap: bool = False,
+        compression: Optional[CompressionMethod] = None,
+        compression_manifest: bool = False,
+        adaptive_concurrency: Optional[AdaptiveConcurrency] = None,
+        fail_fast: bool = True,
+        compression_processes: Optional[int] = None,
     ) -> tuple[requests.models.Response, ...]:
         """
         Upload file(s) to a deposition
 
+        If an upload fails and `fail_fast` is `True`,
+        the other uploads are cancelled:
+        uploads which haven't started are skipped
+        and uploads in flight are aborted before their next chunk.
+        The same happens if the uploads are interrupted (e.g. with Ctrl-C),
+        so the interruption doesn't have to wait for every upload in flight to finish.
+
         Note that zenodo does not allow you to upload folders.
         As noted in [this response](https://support.zenodo.org/help/en-gb/1-upload-deposit/74-can-i-upload-folders-directories):
 
@@ -792,7 +1625,14 @@ class ZenodoInteractor:
             ID of the deposition to upload to
 
         to_upload
-            File(s) to upload
+            File(s) to upload.
+
+            If this is an iterator (e.g. from
+            [`iter_files`][openscm_zenodo.discovery.iter_files]),
+            each file's upload starts as soon as the file is taken from it,
+            so uploads can start before every file has been found.
+            If an upload fails and `fail_fast` is `True`,
+            no more files are taken from it.
 
         tqdm_kwargs
             Keyword arguments to use with our progress bar.
@@ -803,41 +1643,331 @@ class ZenodoInteractor:
         n_threads
             Number of threads to use for the uploads.
 
+        use_mmap
+            Send the files from memory maps.
+
+            Passed to
+            [`upload_file_to_bucket_url`][openscm_zenodo.zenodo.ZenodoInteractor.upload_file_to_bucket_url].
+
+            Ignored if `compression` is supplied.
+
+        compression
+            If supplied, compress each file with this method while uploading it.
+
+            The method's suffix (e.g. ".gz") is added to the uploaded file's name.
+            See [`openscm_zenodo.compression`][openscm_zenodo.compression].
+
+        compression_manifest
+            Also upload a manifest describing the compressed files.
+
+            The manifest's name is given by
+            [`COMPRESSION_MANIFEST_FILENAME`][openscm_zenodo.compression.COMPRESSION_MANIFEST_FILENAME].
+            Ignored if `compression` is not supplied.
+
+        adaptive_concurrency
+            If supplied, this controls the number of uploads in flight
+            based on the observed throughput, rather than using `n_threads`.
+
+            After the uploads, `adaptive_concurrency.limit` is the chosen level.
+            This needs every file up front,
+            so if `to_upload` is an iterator, it is exhausted before any upload starts.
+
+        fail_fast
+            Cancel the rest of the uploads as soon as one fails.
+
+            If `False`, every upload is attempted.
+
+        compression_processes
+            If supplied, gzip compression is done in a pool of this many processes
+            (shared by all the files), rather than in threads of this process.
+
+            The upload threads then only read, queue and send data,
+            so compression and uploading don't compete for the GIL
+            and throughput is limited by the slower of the two,
+            rather than by their sum.
+            Each upload holds at most `2 * compression_processes` blocks
+            in memory at once, each of size
+            [`COMPRESSION_BLOCK_SIZE`][openscm_zenodo.compression.COMPRESSION_BLOCK_SIZE].
+
         Returns
         -------
         :
             The response(s) from the file upload request(s)
+
+        Raises
+        ------
+        UploadFilesError
+            Any of the uploads failed.
+
+            This holds every failure (and every cancelled upload),
+            so the files which weren't uploaded can be retried.
         """
-        logger.info(
-            f"Uploading {len(to_upload)} {'files' if len(to_upload) > 1 else 'file'} "
-            f"to {deposition_id=!r}"
-        )
+        if isinstance(to_upload, Collection):
+            logger.info(
+                f"Uploading {len(to_upload)} "
+                f"{'files' if len(to_upload) > 1 else 'file'} to {deposition_id=!r}"
+            )
+
+        else:
+            logger.info(f"Uploading files to {deposition_id=!r} as they are found")
+
         bucket_url = self.get_bucket_url(deposition_id)
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=n_threads) as executor:
-            futures = [
-                executor.submit(
-                    self.upload_file_to_bucket_url,
+        compression_pool = (
+            create_compression_process_pool(compression_processes)
+            if compression is not None and compression_processes
+            else None
+        )
+        cancel_event = threading.Event()
+        # Filled as the files are taken from `to_upload`
+        files: list[Path] = []
+        compressed_files: list[CompressedFile] = []
+
+        def iter_tasks() -> (
+            Iterator[tuple[Callable[[], requests.models.Response], int]]
+        ):
+            for file in to_upload:
+                compressed_file = None
+                if compression is not None:
+                    compressed_file = CompressedFile(
+                        file,
+                        method=compression,
+                        n_threads=compression_processes or n_threads,
+                        executor=compression_pool,
+                    )
+                    compressed_files.append(compressed_file)
+
+                files.append(file)
+                yield self._get_upload_task(
+                    bucket_url,
                     to_upload=file,
-                    bucket_url=bucket_url,
+                    compressed_file=compressed_file,
                     tqdm_kwargs=tqdm_kwargs,
+                    use_mmap=use_mmap,
+                    cancel_event=cancel_event,
                 )
-                for file in tqdm.tqdm(to_upload, desc="Submitting files to queue")
-            ]
 
-            responses = tuple(
-                [
-                    future.result()
-                    for future in tqdm.tqdm(
-                        concurrent.futures.as_completed(futures),
-                        desc="Files to upload",
-                        total=len(futures),
+        failures: dict[Path, Exception] = {}
+        cancelled: list[Path] = []
+
+        def on_error(i: int, exc: Exception) -> None:
+            if isinstance(exc, CANCELLED_ERRORS):
+                cancelled.append(files[i])
+                return
+
+            failures[files[i]] = exc
+            logger.error("Failed to upload {}: {!r}", files[i], exc)
+            if fail_fast and not cancel_event.is_set():
+                logger.warning("Cancelling the other uploads")
+                cancel_event.set()
+
+        try:
+            if adaptive_concurrency is not None:
+                tasks = list(iter_tasks())
+                with tqdm.tqdm(desc="Files to upload", total=len(tasks)) as tqdm_bar:
+                    responses = adaptive_concurrency.run(
+                        tasks,
+                        progress=tqdm_bar.update,
+                        on_error=on_error,
+                        cancel_event=cancel_event,
                     )
-                ]
+
+            else:
+                responses = _run_upload_tasks(
+                    (task for task, _ in iter_tasks()),
+                    n_threads=n_threads,
+                    on_error=on_error,
+                    cancel_event=cancel_event,
+                )
+
+        finally:
+            if compression_pool is not None:
+                compression_pool.shutdown()
+
+        if cancel_event.is_set() and isinstance(to_upload, Collection):
+            # Files which were never taken from `to_upload` weren't uploaded either
+            cancelled.extend(list(to_upload)[len(files) :])
+
+        if failures or cancelled:
+            raise UploadFilesError(
+                failures=failures, cancelled=cancelled, responses=responses
             )
 
+        if compression is not None:
+            manifest_entries = [f.to_manifest_entry() for f in compressed_files]
+            for entry in manifest_entries:
+                logger.info(
+                    f"Uploaded {entry.original_filename} as {entry.filename} "
+                    f"(compression ratio: "
+                    f"{entry.original_size / max(entry.compressed_size, 1):.1f})"
+                )
+
+            if compression_manifest:
+                manifest = get_compression_manifest(manifest_entries)
+                responses = (
+                    *responses,
+                    self.upload_stream_to_bucket_url(
+                        source=[manifest],
+                        filename=COMPRESSION_MANIFEST_FILENAME,
+                        bucket_url=bucket_url,
+                        size=len(manifest),
+                        tqdm_kwargs=tqdm_kwargs,
+                    ),
+                )
+
         return responses
 
+    def upload_stream(
+        self,
+        deposition_id: str,
+        source: Union[BinaryIO, Iterable[bytes]],
+        filename: str,
+        size: Optional[int] = None,
+        tqdm_kwargs: Optional[dict[str, Any]] = None,
+    ) -> requests.models.Response:
+        """
+        Upload data from a stream to a deposition
+
+        Parameters
+        ----------
+        deposition_id
+            ID of the deposition to upload to
+
+        source
+            Source of the data.
+
+            Either a binary stream (e.g. `sys.stdin.buffer`)
+            or an iterable of chunks of bytes (e.g. a generator).
+
+        filename
+            Name of the file to create in the deposition
+
+        size
+            Size of the data (in bytes), if known.
+
+            Passed to
+            [`upload_stream_to_bucket_url`][openscm_zenodo.zenodo.ZenodoInteractor.upload_stream_to_bucket_url].
+
+        tqdm_kwargs
+            Keyword arguments to use with our progress bar.
+
+            Passed to
+            [`upload_stream_to_bucket_url`][openscm_zenodo.zenodo.ZenodoInteractor.upload_stream_to_bucket_url].
+
+        Returns
+        -------
+        :
+            The response from the file upload request
+        """
+        bucket_url = self.get_bucket_url(deposition_id)
+
+        return self.upload_stream_to_bucket_url(
+            source=source,
+            filename=filename,
+            bucket_url=bucket_url,
+            size=size,
+            tqdm_kwargs=tqdm_kwargs,
+        )
+
+    def upload_stream_to_bucket_url(  # noqa: PLR0913
+        self,
+        source: Union[BinaryIO, Iterable[bytes]],
+        filename: str,
+        bucket_url: str,
+        size: Optional[int] = None,
+        tqdm_kwargs: Optional[dict[str, Any]] = None,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> requests.models.Response:
+        """
+        Upload data from a stream to a bucket URL
+
+        Unlike
+        [`upload_file_to_bucket_url`][openscm_zenodo.zenodo.ZenodoInteractor.upload_file_to_bucket_url],
+        the data does not have to be on disk,
+        so outputs which are generated on the fly can be uploaded directly.
+
+        Parameters
+        ----------
+        source
+            Source of the data.
+
+            Either a binary stream (e.g. `sys.stdin.buffer`)
+            or an iterable of chunks of bytes (e.g. a generator).
+
+        filename
+            Name of the file to create in the bucket
+
+        bucket_url
+            The bucket URL to use for the upload
+
+        size
+            Size of the data (in bytes), if known.
+
+            If supplied, it is sent as the upload's `Content-Length`
+            (and the upload fails if the source's size doesn't match).
+            Otherwise, the data is sent using chunked transfer encoding.
+            Supplying the size is preferred where possible,
+            as it also gives a progress bar with a total.
+
+        tqdm_kwargs
+            Keyword arguments to use with our progress bar.
+
+            If not supplied, we use
+            [`TQDM_UPLOAD_PROGRESS_KWARGS_DEFAULT`][openscm_zenodo.zenodo.TQDM_UPLOAD_PROGRESS_KWARGS_DEFAULT].
+
+        cancel_event
+            If supplied, the upload is aborted before its next chunk
+            once this is set, with an
+            [`UploadCancelledError`][openscm_zenodo.bandwidth.UploadCancelledError].
+
+        Returns
+        -------
+        :
+            The response from the file upload request
+        """
+        if tqdm_kwargs is None:
+            tqdm_kwargs = TQDM_UPLOAD_PROGRESS_KWARGS_DEFAULT
+
+        upload_url = f"{bucket_url}/{filename}"
+
+        logger.info("Uploading stream to upload_url={!r}", upload_url)
+
+        # Only sources which can be read again (e.g. lists of chunks) can be retried
+        can_retry = not hasattr(source, "read") and iter(source) is not source
+        bodies = []
+        with tqdm.tqdm(total=size, **tqdm_kwargs) as tqdm_bar:
+
+            def get_data(throttle: Callable[[int], None]) -> Any:
+                tqdm_bar.reset()
+                bodies.append(
+                    StreamBody(
+                        source=source,
+                        size=size,
+                        callback=tqdm_bar.update,
+                        throttle=throttle,
+                        chunk_size=self.bandwidth_limiter.get_chunk_size(
+                            STREAM_CHUNK_SIZE
+                        ),
+                    )
+                )
+
+                # Without a size, hide the body's length from requests
+                # so that it uses chunked transfer encoding
+                return bodies[-1] if size is not None else iter(bodies[-1])
+
+            response = self._put_upload(
+                upload_url,
+                get_data=get_data,
+                retry=can_retry,
+                cancel_event=cancel_event,
+            )
+
+        response.raise_for_status()
+        logger.info(
+            "Successfully uploaded {} bytes to {}", bodies[-1].bytes_sent, filename
+        )
+        return response
+
     def update_metadata(
         self, deposition_id: str, metadata: MetadataType
     ) -> requests.models.Response:
@@ -866,7 +1996,7 @@ class ZenodoInteractor:
             Response to the metadata update request.
         """
         logger.info(f"Updating metadata for {deposition_id=!r}")
-        logger.debug(f"New metadata: {metadata}")
+        logger.debug("New metadata: {}", metadata)
 
         update_metadata_response = self.get_response(
             post_domain_part=f"/api/deposit/depositions/{deposition_id}",
@@ -877,6 +2007,50 @@ class ZenodoInteractor:
 
         return update_metadata_response
 
+    def update_metadata_if_changed(
+        self,
+        deposition_id: str,
+        metadata: MetadataType,
+        current_metadata: Optional[MetadataType] = None,
+    ) -> Optional[requests.models.Response]:
+        """
+        Update the metadata for a given deposition, if it has changed
+
+        Keys which are controlled by Zenodo are ignored when comparing
+        (see [`get_metadata_diff`][openscm_zenodo.metadata.get_metadata_diff]).
+        The changes are logged before updating.
+
+        Parameters
+        ----------
+        deposition_id
+            Deposition ID of which to update the metadata
+
+        metadata
+            Metadata to apply to the deposition
+
+        current_metadata
+            Current metadata of the deposition.
+
+            If not supplied, this is retrieved from Zenodo.
+
+        Returns
+        -------
+        :
+            Response to the metadata update request,
+            `None` if the metadata was unchanged (so no request was made).
+        """
+        if current_metadata is None:
+            current_metadata = self.get_metadata(deposition_id)
+
+        diff = get_metadata_diff(current_metadata, metadata)
+        if not diff:
+            logger.info(f"Metadata for {deposition_id=!r} is unchanged, not updating")
+            return None
+
+        logger.info(f"Metadata changes for {deposition_id=!r}:\n{diff}")
+
+        return self.update_metadata(deposition_id=deposition_id, metadata=metadata)
+
 
 def retrieve_metadata(
     deposition_id: str,
@@ -1014,6 +2188,215 @@ def retrieve_bibtex_entry(
     return zenodo_interactor.get_bibtex_entry(deposition_id)
 
 
+def _run_upload_tasks(
+    tasks: Iterable[Callable[[], requests.models.Response]],
+    n_threads: int,
+    on_error: Callable[[int, Exception], object],
+    cancel_event: threading.Event,
+) -> tuple[requests.models.Response, ...]:
+    """
+    Run upload tasks in a thread pool
+
+    Each task is submitted as soon as it is taken from `tasks`,
+    so `tasks` can be a generator which is still finding files to upload.
+    Failures are passed to `on_error` (with the task's index).
+    Once `cancel_event` is set, no more tasks are taken from `tasks`
+    and tasks which haven't started are cancelled
+    (and passed to `on_error` with a `concurrent.futures.CancelledError`).
+    If the run is interrupted (e.g. by `KeyboardInterrupt`),
+    `cancel_event` is set before waiting for the tasks in flight.
+    """
+    responses: list[requests.models.Response] = []
+    futures: dict[concurrent.futures.Future[requests.models.Response], int] = {}
+    # Each task is put on this queue when it finishes (or is cancelled)
+    finished: queue.SimpleQueue[concurrent.futures.Future[requests.models.Response]] = (
+        queue.SimpleQueue()
+    )
+    n_finished = 0
+    cancelling = False
+
+    def handle(future: concurrent.futures.Future[requests.models.Response]) -> None:
+        nonlocal n_finished, cancelling
+        n_finished += 1
+        tqdm_bar.update()
+        if future.cancelled():
+            on_error(futures[future], concurrent.futures.CancelledError())
+
+        else:
+            try:
+                responses.append(future.result())
+            except Exception as exc:
+                on_error(futures[future], exc)
+
+        if cancel_event.is_set() and not cancelling:
+            cancelling = True
+            for v in futures:
+                v.cancel()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=n_threads) as executor:
+        with tqdm.tqdm(desc="Files to upload", total=0) as tqdm_bar:
+            try:
+                for i, task in enumerate(tasks):
+                    future = executor.submit(task)
+                    futures[future] = i
+                    future.add_done_callback(finished.put)
+                    tqdm_bar.total = len(futures)
+                    tqdm_bar.refresh()
+
+                    # Handle the uploads which have finished while submitting,
+                    # so a failure stops us taking more tasks straight away
+                    while not finished.empty():
+                        handle(finished.get())
+
+                    if cancel_event.is_set():
+                        break
+
+                while n_finished < len(futures):
+                    handle(finished.get())
+
+            except BaseException:
+                cancel_event.set()
+                for future in futures:
+                    future.cancel()
+
+                raise
+
+    return tuple(responses)
+
+
+def _get_new_version_draft(
+    any_deposition_id: str,
+    zenodo_interactor: ZenodoInteractor,
+    release_checkpoint: Optional[ReleaseCheckpoint],
+) -> tuple[str, Optional[dict[str, Any]]]:
+    """
+    Get the draft for a new version
+
+    Parameters
+    ----------
+    any_deposition_id
+        Any deposition ID which belongs to the series/record of interest
+
+    zenodo_interactor
+        Object to use to interact with Zenodo
+
+    release_checkpoint
+        Checkpoint of the release.
+
+        If it already has a draft, that draft is re-used.
+        Otherwise, an existing draft for the record is re-used if there is one
+        (see
+        [`find_draft_deposition_id`][openscm_zenodo.zenodo.ZenodoInteractor.find_draft_deposition_id]),
+        so a release which died after creating its draft
+        but before recording it doesn't leave the draft dangling.
+
+    Returns
+    -------
+    :
+        Deposition ID of the draft
+        and, if the draft was newly created, its JSON
+    """
+    if (
+        release_checkpoint is not None
+        and release_checkpoint.draft_deposition_id is not None
+    ):
+        logger.info(
+            f"Re-using draft {release_checkpoint.draft_deposition_id} "
+            "from the checkpoint"
+        )
+        return release_checkpoint.draft_deposition_id, None
+
+    latest_deposition_id = zenodo_interactor.get_latest_deposition_id(
+        any_deposition_id=any_deposition_id,
+    )
+
+    if release_checkpoint is not None:
+        draft_deposition_id = zenodo_interactor.find_draft_deposition_id(
+            concept_id=zenodo_interactor.get_concept_id(
+                any_deposition_id=latest_deposition_id
+            )
+        )
+        if draft_deposition_id is not None:
+            release_checkpoint.draft_deposition_id = draft_deposition_id
+            release_checkpoint.save()
+
+            return draft_deposition_id, None
+
+    new_deposition_json: dict[str, Any] = (
+        zenodo_interactor.create_new_version_from_latest(
+            latest_deposition_id=latest_deposition_id
+        ).json()
+    )
+    new_deposition_id = str(new_deposition_json["id"])
+
+    if release_checkpoint is not None:
+        release_checkpoint.draft_deposition_id = new_deposition_id
+        release_checkpoint.save()
+
+    return new_deposition_id, new_deposition_json
+
+
+def _upload_files_to_new_version(  # noqa: PLR0913
+    new_deposition_id: str,
+    new_deposition_json: Optional[dict[str, Any]],
+    zenodo_interactor: ZenodoInteractor,
+    files_to_upload: list[Path],
+    n_threads: int,
+    incremental: bool,
+    release_checkpoint: Optional[ReleaseCheckpoint],
+) -> None:
+    """
+    Upload files to the draft for a new version
+
+    See [`create_new_version`][openscm_zenodo.zenodo.create_new_version]
+    for the meaning of the parameters.
+    """
+    if incremental:
+        # Avoid circular import
+        from openscm_zenodo.sync import RemoteFile, get_md5_checksum, sync_deposition
+
+        remote_files = None
+        if new_deposition_json is not None and "files" in new_deposition_json:
+            # The new version's carried-over files come back with the new version,
+            # so we don't need another request to find out what is there
+            remote_files = [
+                RemoteFile.from_zenodo_json(v) for v in new_deposition_json["files"]
+            ]
+
+        # Syncing only changes what differs, so it is safe to repeat on resume
+        sync_plan = sync_deposition(
+            deposition_id=new_deposition_id,
+            local_files=files_to_upload,
+            zenodo_interactor=zenodo_interactor,
+            n_threads=n_threads,
+            remote_files=remote_files,
+        )
+
+        if release_checkpoint is not None:
+            for file in (*sync_plan.to_upload, *(f for f, _ in sync_plan.to_replace)):
+                release_checkpoint.uploaded_files[file.name] = get_md5_checksum(file)
+
+            release_checkpoint.save()
+
+    elif release_checkpoint is not None:
+        # Avoid circular import
+        from openscm_zenodo.checkpoint import upload_files_with_checkpoint
+
+        upload_files_with_checkpoint(
+            release_checkpoint,
+            files_to_upload=files_to_upload,
+            zenodo_interactor=zenodo_interactor,
+            n_threads=n_threads,
+        )
+
+    else:
+        zenodo_interactor.upload_files(
+            deposition_id=new_deposition_id,
+            to_upload=files_to_upload,
+            n_threads=n_threads,
+        )
+
+
 def create_new_version(  # noqa: PLR0913
     any_deposition_id: str,
     zenodo_interactor: ZenodoInteractor,
@@ -1021,6 +2404,10 @@ def create_new_version(  # noqa: PLR0913
     publish: bool = False,
     files_to_upload: Optional[list[Path]] = None,
     n_threads: int = 4,
+    incremental: bool = False,
+    checkpoint: Optional[Path] = None,
+    resume: bool = False,
+    validate: bool = False,
 ) -> str:
     """
     Create a new version of a given record
@@ -1044,6 +2431,8 @@ def create_new_version(  # noqa: PLR0913
         Path to the file that contains the metadata to apply to the new version.
 
         If not supplied, the metadata from the previous version will not be updated.
+        If it is the same as the previous version's metadata
+        (ignoring keys controlled by Zenodo), it is not sent again.
 
         For futher information about the required form,
         see the docstring of
@@ -1061,34 +2450,118 @@ def create_new_version(  # noqa: PLR0913
         If `files_to_upload` is supplied,
         the number of threads to use for parallel uploads.
 
+    incremental
+        If `True` and `files_to_upload` is supplied,
+        make the new version's files match `files_to_upload`
+        by re-using the files carried over from the previous version where possible.
+
+        Zenodo links the previous version's files into the new version.
+        In incremental mode, carried-over files whose checksum matches
+        the file to upload are kept, changed files are replaced
+        and files which are not in `files_to_upload` are removed
+        (see [`sync_deposition`][openscm_zenodo.sync.sync_deposition]).
+        Otherwise, `files_to_upload` are simply uploaded.
+
+    checkpoint
+        If supplied, path of a file in which to record each completed stage
+        (see [`ReleaseCheckpoint`][openscm_zenodo.checkpoint.ReleaseCheckpoint]).
+
+    resume
+        Continue the release recorded in `checkpoint`
+        from its last completed stage.
+
+        The draft is re-used (rather than a new one being created),
+        metadata is only re-applied if it has changed
+        and files which were already uploaded are not uploaded again.
+
+    validate
+        If `True` and `metadata` is supplied, validate `metadata`
+        (see [`validate_metadata`][openscm_zenodo.metadata.validate_metadata])
+        before anything is sent to Zenodo.
+
+        This means that invalid metadata is caught straight away,
+        rather than when publishing, after all the files have been uploaded.
+
     Returns
     -------
     :
         Deposition ID of the new version
+
+    Raises
+    ------
+    MetadataValidationError
+        `validate` is `True` and `metadata` is not valid
     """
-    latest_deposition_id = zenodo_interactor.get_latest_deposition_id(
+    if validate and metadata is not None:
+        validate_metadata(metadata)
+
+    if checkpoint is not None:
+        # Avoid circular import
+        from openscm_zenodo.checkpoint import (
+            get_metadata_hash,
+            load_or_start_checkpoint,
+        )
+
+        release_checkpoint = load_or_start_checkpoint(
+            checkpoint, any_deposition_id=any_deposition_id, resume=resume
+        )
+        if release_checkpoint.published:
+            logger.info("The checkpointed release was already published")
+            return str(release_checkpoint.draft_deposition_id)
+
+    elif resume:
+        msg = "`checkpoint` must be supplied to resume"
+        raise ValueError(msg)
+
+    else:
+        release_checkpoint = None
+
+    new_deposition_id, new_deposition_json = _get_new_version_draft(
         any_deposition_id=any_deposition_id,
+        zenodo_interactor=zenodo_interactor,
+        release_checkpoint=release_checkpoint,
     )
 
-    new_deposition_id = zenodo_interactor.create_new_version_from_latest(
-        latest_deposition_id=latest_deposition_id
-    ).json()["id"]
-
     if metadata is not None:
-        zenodo_interactor.update_metadata(
-            deposition_id=new_deposition_id,
-            metadata=metadata,
-        )
+        if (
+            release_checkpoint is not None
+            and release_checkpoint.metadata_hash == get_metadata_hash(metadata)
+        ):
+            logger.info("Metadata already applied, not applying again")
+
+        else:
+            # The new version starts with the previous version's metadata,
+            # which we already have if we just created the draft
+            zenodo_interactor.update_metadata_if_changed(
+                deposition_id=new_deposition_id,
+                metadata=metadata,
+                current_metadata=(
+                    {"metadata": new_deposition_json["metadata"]}
+                    if new_deposition_json is not None
+                    and "metadata" in new_deposition_json
+                    else None
+                ),
+            )
+            if release_checkpoint is not None:
+                release_checkpoint.metadata_hash = get_metadata_hash(metadata)
+                release_checkpoint.save()
 
     if files_to_upload is not None:
-        zenodo_interactor.upload_files(
-            deposition_id=new_deposition_id,
-            to_upload=files_to_upload,
+        _upload_files_to_new_version(
+            new_deposition_id=new_deposition_id,
+            new_deposition_json=new_deposition_json,
+            zenodo_interactor=zenodo_interactor,
+            files_to_upload=files_to_upload,
             n_threads=n_threads,
+            incremental=incremental,
+            release_checkpoint=release_checkpoint,
         )
 
     if publish:
         zenodo_interactor.publish(new_deposition_id)
+        if release_checkpoint is not None:
+            release_checkpoint.published = True
+            release_checkpoint.save()
 
     return str(new_deposition_id)
 
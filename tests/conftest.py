@@ -6,7 +6,9 @@ See https://docs.pytest.org/en/7.1.x/reference/fixtures.html#conftest-py-sharing
 
 from __future__ import annotations
 
+import http.server
 import os
+import threading
 from pathlib import Path
 from typing import TYPE_CHECKING
 
@@ -33,3 +35,46 @@ def pytest_runtest_setup(item: _pytest.python.Function) -> None:
     for mark in item.iter_markers():
         if mark.name == "zenodo_token" and not ZENODO_TOKEN_AVAILABLE:
             pytest.skip("`ZENODO_TOKEN` environment variable not set")
+
+
+class _RecordingHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_PUT(self):
+        if self.headers.get("Transfer-Encoding") == "chunked":
+            body = b""
+            while True:
+                chunk_size = int(self.rfile.readline().strip(), 16)
+                if chunk_size == 0:
+                    self.rfile.readline()
+                    break
+
+                body += self.rfile.read(chunk_size)
+                self.rfile.readline()
+
+        else:
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+
+        self.server.received.append((self.path, dict(self.headers), body))
+        self.send_response(201)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def bucket_server():
+    """
+    Local stand-in for Zenodo's bucket API, which records what is uploaded
+    """
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _RecordingHandler)
+    server.received = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
@@ -4,6 +4,10 @@ Integration tests of the CLI
 
 from __future__ import annotations
 
+import subprocess
+import sys
+
+import pytest
 from typer.testing import CliRunner
 
 import openscm_zenodo
@@ -17,3 +21,42 @@ def test_version():
 
     assert result.exit_code == 0, result.exc_info
     assert result.stdout == f"openscm-zenodo {openscm_zenodo.__version__}\n"
+
+
+@pytest.mark.parametrize(
+    "code",
+    (
+        pytest.param("import openscm_zenodo.cli", id="cli"),
+        pytest.param("import openscm_zenodo; openscm_zenodo.__version__", id="version"),
+    ),
+)
+def test_start_up_does_not_import_heavy_dependencies(code):
+    """
+    Guard the start-up time of the CLI
+
+    Heavy dependencies should only be imported
+    when a command that needs them is actually run.
+    """
+    heavy = ("requests", "tqdm", "openscm_zenodo.zenodo")
+    res = subprocess.run(  # noqa: S603
+        [
+            sys.executable,
+            "-c",
+            f"{code}; import sys; print([m for m in {heavy!r} if m in sys.modules])",
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+    assert res.stdout.strip() == "[]"
+
+
+def test_lazy_attributes():
+    from openscm_zenodo.zenodo import ZenodoInteractor
+
+    assert openscm_zenodo.ZenodoInteractor is ZenodoInteractor
+    assert "ZenodoInteractor" in dir(openscm_zenodo)
+
+    with pytest.raises(AttributeError):
+        openscm_zenodo.junk
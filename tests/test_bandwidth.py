@@ -0,0 +1,131 @@
+"""
+Tests of `openscm_zenodo.bandwidth`
+"""
+
+from __future__ import annotations
+
+import os
+import signal
+import threading
+import time
+
+import pytest
+
+from openscm_zenodo.bandwidth import (
+    BandwidthLimiter,
+    UploadCancelledError,
+    install_pause_signal_handler,
+    parse_bandwidth,
+)
+from openscm_zenodo.zenodo import ZenodoInteractor
+
+
+@pytest.mark.parametrize(
+    "value, exp",
+    (
+        ("1000", 1000.0),
+        ("500k", 500e3),
+        ("10MB/s", 10e6),
+        ("1.5MiB", 1.5 * 2**20),
+        ("2 GiB/s", 2.0 * 2**30),
+    ),
+)
+def test_parse_bandwidth(value, exp):
+    assert parse_bandwidth(value) == exp
+
+
+def test_parse_bandwidth_error():
+    with pytest.raises(ValueError, match="Could not parse"):
+        parse_bandwidth("fast")
+
+
+def test_limiter_shared_across_threads():
+    limiter = BandwidthLimiter(max_bytes_per_second=1e6, burst_seconds=0.05)
+
+    def send():
+        for _ in range(10):
+            limiter.consume(10_000)
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=send) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    # 300 kB in total at 1 MB/s
+    assert time.monotonic() - start >= 0.25
+
+
+def test_limiter_pause_resume():
+    limiter = BandwidthLimiter()
+    limiter.pause()
+
+    thread = threading.Thread(target=limiter.consume, args=(10,))
+    thread.start()
+    thread.join(timeout=0.1)
+    assert thread.is_alive()
+
+    limiter.resume()
+    thread.join(timeout=1)
+    assert not thread.is_alive()
+
+
+def test_limiter_cancel_while_paused():
+    limiter = BandwidthLimiter()
+    limiter.pause()
+    cancel_event = threading.Event()
+    errors = []
+
+    def send():
+        try:
+            limiter.consume(10, cancel_event=cancel_event)
+        except UploadCancelledError as exc:
+            errors.append(exc)
+
+    thread = threading.Thread(target=send)
+    thread.start()
+    thread.join(timeout=0.2)
+    assert thread.is_alive()
+
+    cancel_event.set()
+    thread.join(timeout=1)
+    assert not thread.is_alive()
+    assert len(errors) == 1
+    assert limiter.paused
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGUSR1"), reason="No SIGUSR1")
+def test_pause_signal_handler():
+    limiter = BandwidthLimiter()
+    original = signal.getsignal(signal.SIGUSR1)
+    try:
+        assert install_pause_signal_handler(limiter)
+
+        os.kill(os.getpid(), signal.SIGUSR1)
+        for _ in range(100):
+            if limiter.paused:
+                break
+            time.sleep(0.01)
+
+        assert limiter.paused
+
+    finally:
+        signal.signal(signal.SIGUSR1, original)
+
+
+def test_upload_with_max_bandwidth(bucket_server, tmp_path):
+    to_upload = tmp_path / "file.bin"
+    to_upload.write_bytes(b"a" * 200_000)
+    zi = ZenodoInteractor(token="special", max_bandwidth=1e6)  # noqa: S106
+
+    start = time.monotonic()
+    zi.upload_file_to_bucket_url(
+        to_upload,
+        bucket_url=f"http://127.0.0.1:{bucket_server.server_address[1]}/bucket",
+    )
+
+    assert time.monotonic() - start >= 0.15
+    [(_, _, body)] = bucket_server.received
+    assert body == to_upload.read_bytes()
@@ -0,0 +1,82 @@
+"""
+Tests of `openscm_zenodo.batch`
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+
+from openscm_zenodo.batch import run_batch
+from openscm_zenodo.zenodo import ZenodoInteractor
+
+
+def test_run_batch(monkeypatch):
+    def get_bibtex_entry(self, deposition_id):
+        # Make earlier lines finish later to check that the output is ordered
+        time.sleep(0.01 * (5 - int(deposition_id)))
+        return f"@misc{{{deposition_id}}}"
+
+    monkeypatch.setattr(ZenodoInteractor, "get_bibtex_entry", get_bibtex_entry)
+
+    lines = [
+        json.dumps(
+            {"operation": "retrieve-bibtex", "arguments": {"deposition_id": str(i)}}
+        )
+        for i in range(5)
+    ]
+    lines.insert(2, "")
+    lines.insert(3, "# comment")
+    lines.append('{"id": "bad", "operation": "not-an-operation"}')
+    lines.append("not json")
+
+    res = list(
+        run_batch(
+            lines,
+            zenodo_interactor=ZenodoInteractor(token="special"),  # noqa: S106
+            max_workers=2,
+        )
+    )
+
+    assert [r.get("result") for r in res[:5]] == [f"@misc{{{i}}}" for i in range(5)]
+    assert [r["id"] for r in res[:5]] == [1, 2, 5, 6, 7]
+    assert res[5]["id"] == "bad"
+    assert res[5]["error"]["type"] == "KeyError"
+    assert res[6]["id"] == 9
+    assert res[6]["error"]["type"] == "JSONDecodeError"
+
+
+def test_run_batch_bounded(monkeypatch):
+    started = []
+    release = threading.Event()
+
+    def get_bibtex_entry(self, deposition_id):
+        started.append(deposition_id)
+        release.wait(timeout=5)
+        return deposition_id
+
+    monkeypatch.setattr(ZenodoInteractor, "get_bibtex_entry", get_bibtex_entry)
+
+    lines_read = []
+
+    def lines():
+        for i in range(100):
+            lines_read.append(i)
+            yield json.dumps(
+                {"operation": "retrieve-bibtex", "arguments": {"deposition_id": str(i)}}
+            )
+
+    res = run_batch(
+        lines(),
+        zenodo_interactor=ZenodoInteractor(token="special"),  # noqa: S106
+        max_workers=2,
+    )
+    release.set()
+    first = next(res)
+
+    assert first["result"] == "0"
+    # Only a bounded window of lines has been read from the input
+    assert len(lines_read) <= 2 * 2 + 1
+
+    assert len(list(res)) == 99
@@ -0,0 +1,151 @@
+"""
+Tests of `openscm_zenodo.bulk`
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import threading
+from unittest.mock import Mock
+
+from typer.testing import CliRunner
+
+from openscm_zenodo.bulk import get_bulk_update_summary, update_metadata_bulk
+from openscm_zenodo.cli.app import app
+from openscm_zenodo.zenodo import ZenodoInteractor
+
+PATCH = [{"op": "replace", "path": "/metadata/license", "value": "cc-by-4.0"}]
+
+
+def get_metadata_store():
+    base = {
+        "title": "Record",
+        "upload_type": "dataset",
+        "description": "A record",
+        "creators": [{"name": "Test, Creator"}],
+    }
+
+    return {
+        "1": {"metadata": {**base, "license": "cc-by-4.0"}},
+        "2": {"metadata": {**base, "license": "cc-zero"}},
+        "3": {"metadata": {**base, "license": "mit"}},
+        # No license, so the patch can't be applied
+        "4": {"metadata": base},
+    }
+
+
+def mock_zenodo_interactor(store):
+    lock = threading.Lock()
+
+    def get_metadata(deposition_id):
+        with lock:
+            return copy.deepcopy(store[deposition_id])
+
+    def update_metadata(deposition_id, metadata):
+        with lock:
+            store[deposition_id] = metadata
+
+    zenodo_interactor = Mock()
+    zenodo_interactor.get_metadata.side_effect = get_metadata
+    zenodo_interactor.update_metadata.side_effect = update_metadata
+
+    return zenodo_interactor
+
+
+def test_update_metadata_bulk():
+    store = get_metadata_store()
+    zenodo_interactor = mock_zenodo_interactor(store)
+
+    res = list(
+        update_metadata_bulk(
+            ["1", "2", "3", "4"],
+            patch=PATCH,
+            zenodo_interactor=zenodo_interactor,
+            max_workers=2,
+        )
+    )
+
+    assert [v.deposition_id for v in res] == ["1", "2", "3", "4"]
+    assert [v.status for v in res] == ["unchanged", "updated", "updated", "failed"]
+    assert '+    "license": "cc-by-4.0",' in res[1].diff
+    assert res[3].error.startswith("MetadataPatchError")
+    assert get_bulk_update_summary(res) == {"unchanged": 1, "updated": 2, "failed": 1}
+
+    # Only the changed records were sent to Zenodo
+    assert sorted(
+        c.kwargs["deposition_id"]
+        for c in zenodo_interactor.update_metadata.call_args_list
+    ) == ["2", "3"]
+    assert all(v["metadata"].get("license") != "mit" for v in store.values())
+
+
+def test_update_metadata_bulk_dry_run():
+    zenodo_interactor = mock_zenodo_interactor(get_metadata_store())
+
+    res = list(
+        update_metadata_bulk(
+            ["1", "2"], patch=PATCH, zenodo_interactor=zenodo_interactor, dry_run=True
+        )
+    )
+
+    assert [v.status for v in res] == ["unchanged", "would-update"]
+    zenodo_interactor.update_metadata.assert_not_called()
+
+
+def test_update_metadata_bulk_invalid_result():
+    zenodo_interactor = mock_zenodo_interactor(get_metadata_store())
+
+    [res] = update_metadata_bulk(
+        ["2"],
+        patch=[{"op": "remove", "path": "/metadata/title"}],
+        zenodo_interactor=zenodo_interactor,
+        validate=True,
+    )
+
+    assert res.status == "failed"
+    assert res.error.startswith("MetadataValidationError")
+    zenodo_interactor.update_metadata.assert_not_called()
+
+
+def test_update_metadata_bulk_unchanged_not_validated():
+    store = get_metadata_store()
+    # Not valid, but the patch doesn't change it
+    del store["1"]["metadata"]["title"]
+    zenodo_interactor = mock_zenodo_interactor(store)
+
+    [res] = update_metadata_bulk(
+        ["1"], patch=PATCH, zenodo_interactor=zenodo_interactor, validate=True
+    )
+
+    assert res.status == "unchanged"
+
+
+def test_update_metadata_bulk_command(tmp_path, monkeypatch):
+    store = get_metadata_store()
+
+    def get_metadata(self, deposition_id):
+        return copy.deepcopy(store[deposition_id])
+
+    def update_metadata(self, deposition_id, metadata):
+        store[deposition_id] = metadata
+
+    monkeypatch.setattr(ZenodoInteractor, "get_metadata", get_metadata)
+    monkeypatch.setattr(ZenodoInteractor, "update_metadata", update_metadata)
+    patch_file = tmp_path / "patch.json"
+    patch_file.write_text(json.dumps(PATCH))
+
+    res = CliRunner(mix_stderr=False).invoke(
+        app,
+        ["update-metadata-bulk", str(patch_file)],
+        input="1\n2\n\n4\n",
+        env={"ZENODO_TOKEN": "special"},
+    )
+
+    assert res.exit_code == 1, res.stderr
+    assert [json.loads(v)["status"] for v in res.stdout.splitlines()] == [
+        "unchanged",
+        "updated",
+        "failed",
+    ]
+    assert store["2"]["metadata"]["license"] == "cc-by-4.0"
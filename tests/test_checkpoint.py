@@ -0,0 +1,255 @@
+"""
+Tests of `openscm_zenodo.checkpoint`
+"""
+
+from __future__ import annotations
+
+import json
+from unittest.mock import Mock
+
+import pytest
+
+from openscm_zenodo import checkpoint as checkpoint_module
+from openscm_zenodo.checkpoint import (
+    ReleaseCheckpoint,
+    get_metadata_hash,
+    load_or_start_checkpoint,
+    upload_files_with_checkpoint,
+)
+from openscm_zenodo.sync import get_md5_checksum
+from openscm_zenodo.zenodo import (
+    UploadFilesError,
+    ZenodoInteractor,
+    create_new_version,
+)
+
+
+def test_metadata_hash_ignores_key_order():
+    assert get_metadata_hash({"a": 1, "b": [1, 2]}) == get_metadata_hash(
+        {"b": [1, 2], "a": 1}
+    )
+    assert get_metadata_hash({"a": 1}) != get_metadata_hash({"a": 2})
+
+
+def test_checkpoint_round_trip(tmp_path):
+    checkpoint = ReleaseCheckpoint(
+        path=tmp_path / "checkpoint.json",
+        any_deposition_id="123",
+        draft_deposition_id="456",
+        uploaded_files={"file.txt": "abc"},
+    )
+    checkpoint.save()
+
+    assert ReleaseCheckpoint.from_file(checkpoint.path) == checkpoint
+    assert "path" not in json.loads(checkpoint.path.read_text())
+    assert not (tmp_path / "checkpoint.json.tmp").exists()
+
+
+def test_unfinished_checkpoint_requires_resume(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    ReleaseCheckpoint(path=path, any_deposition_id="123").save()
+
+    with pytest.raises(ValueError, match="unfinished release"):
+        load_or_start_checkpoint(path, any_deposition_id="123", resume=False)
+
+
+def test_checkpoint_for_other_deposition(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    ReleaseCheckpoint(path=path, any_deposition_id="123").save()
+
+    with pytest.raises(ValueError, match="not any_deposition_id='789'"):
+        load_or_start_checkpoint(path, any_deposition_id="789", resume=True)
+
+
+def test_upload_files_with_checkpoint(tmp_path, monkeypatch):
+    files_to_upload = []
+    for i in range(3):
+        files_to_upload.append(tmp_path / f"file-{i}.txt")
+        files_to_upload[-1].write_text(f"content {i}")
+
+    checkpoint = ReleaseCheckpoint(
+        path=tmp_path / "checkpoint.json",
+        any_deposition_id="123",
+        draft_deposition_id="456",
+        uploaded_files={
+            "file-0.txt": get_md5_checksum(files_to_upload[0]),
+            "file-1.txt": "changed-since",
+        },
+    )
+    checksummed = []
+
+    def get_md5_checksum_tracked(file):
+        checksummed.append(file.name)
+
+        return get_md5_checksum(file)
+
+    monkeypatch.setattr(checkpoint_module, "get_md5_checksum", get_md5_checksum_tracked)
+    response = Mock()
+    response.json.return_value = {"key": "file-1.txt", "checksum": "md5:abc"}
+    zenodo_interactor = Mock()
+    zenodo_interactor.upload_files.side_effect = UploadFilesError(
+        failures={files_to_upload[2]: ConnectionError()},
+        cancelled=[],
+        responses=(response,),
+    )
+
+    with pytest.raises(UploadFilesError):
+        upload_files_with_checkpoint(
+            checkpoint,
+            files_to_upload=files_to_upload,
+            zenodo_interactor=zenodo_interactor,
+        )
+
+    # Only the files which were recorded before need checking
+    assert sorted(checksummed) == ["file-0.txt", "file-1.txt"]
+    zenodo_interactor.upload_files.assert_called_once_with(
+        "456", to_upload=files_to_upload[1:], n_threads=4
+    )
+    assert ReleaseCheckpoint.from_file(checkpoint.path).uploaded_files == {
+        "file-0.txt": get_md5_checksum(files_to_upload[0]),
+        "file-1.txt": "abc",
+    }
+
+
+def test_create_new_version_reuses_unrecorded_draft(tmp_path):
+    # E.g. the release died after creating the draft, but before recording it
+    checkpoint = tmp_path / "checkpoint.json"
+    ReleaseCheckpoint(path=checkpoint, any_deposition_id="123").save()
+    zenodo_interactor = Mock()
+    zenodo_interactor.get_latest_deposition_id.return_value = "122"
+    zenodo_interactor.get_concept_id.return_value = "100"
+    zenodo_interactor.find_draft_deposition_id.return_value = "456"
+
+    res = create_new_version(
+        any_deposition_id="123",
+        zenodo_interactor=zenodo_interactor,
+        checkpoint=checkpoint,
+        resume=True,
+    )
+
+    assert res == "456"
+    zenodo_interactor.find_draft_deposition_id.assert_called_once_with(concept_id="100")
+    zenodo_interactor.create_new_version_from_latest.assert_not_called()
+    assert ReleaseCheckpoint.from_file(checkpoint).draft_deposition_id == "456"
+
+
+def test_resume_without_checkpoint():
+    with pytest.raises(ValueError, match="must be supplied to resume"):
+        create_new_version(
+            any_deposition_id="123",
+            zenodo_interactor=Mock(),
+            resume=True,
+        )
+
+
+def test_create_new_version_resume(tmp_path, monkeypatch):
+    files_to_upload = []
+    for i in range(3):
+        files_to_upload.append(tmp_path / f"file-{i}.txt")
+        files_to_upload[-1].write_text(f"content {i}")
+
+    checkpoint = tmp_path / "checkpoint.json"
+    metadata = {
+        "metadata": {
+            "title": "Release",
+            "upload_type": "dataset",
+            "description": "A release",
+            "creators": [{"name": "Test, Creator"}],
+        }
+    }
+
+    calls: dict[str, list[str]] = {"create": [], "metadata": [], "upload": []}
+
+    def get_latest_deposition_id(self, any_deposition_id):
+        return "122"
+
+    def get_concept_id(self, any_deposition_id):
+        return "100"
+
+    def find_draft_deposition_id(self, concept_id):
+        return None
+
+    def create_new_version_from_latest(self, latest_deposition_id):
+        calls["create"].append(latest_deposition_id)
+        response = Mock()
+        response.json.return_value = {"id": 456, "metadata": {}}
+
+        return response
+
+    def update_metadata(self, deposition_id, metadata):
+        calls["metadata"].append(deposition_id)
+
+    def get_bucket_url(self, deposition_id):
+        return f"https://bucket/{deposition_id}"
+
+    fail_on = {"file-2.txt"}
+
+    def upload_file_to_bucket_url(self, to_upload, bucket_url, **kwargs):
+        if to_upload.name in fail_on:
+            msg = "Connection dropped"
+            raise ConnectionError(msg)
+
+        calls["upload"].append(to_upload.name)
+        response = Mock()
+        response.json.return_value = {
+            "key": to_upload.name,
+            "checksum": f"md5:{get_md5_checksum(to_upload)}",
+        }
+
+        return response
+
+    def publish(self, deposition_id):
+        calls.setdefault("publish", []).append(deposition_id)
+
+    for name, func in (
+        ("get_latest_deposition_id", get_latest_deposition_id),
+        ("get_concept_id", get_concept_id),
+        ("find_draft_deposition_id", find_draft_deposition_id),
+        ("create_new_version_from_latest", create_new_version_from_latest),
+        ("update_metadata", update_metadata),
+        ("get_bucket_url", get_bucket_url),
+        ("upload_file_to_bucket_url", upload_file_to_bucket_url),
+        ("publish", publish),
+    ):
+        monkeypatch.setattr(ZenodoInteractor, name, func)
+
+    zi = ZenodoInteractor(token="special")  # noqa: S106
+    kwargs = dict(
+        any_deposition_id="123",
+        zenodo_interactor=zi,
+        metadata=metadata,
+        publish=True,
+        files_to_upload=files_to_upload,
+        n_threads=1,
+        checkpoint=checkpoint,
+    )
+
+    with pytest.raises(UploadFilesError):
+        create_new_version(**kwargs)
+
+    recorded = ReleaseCheckpoint.from_file(checkpoint)
+    assert recorded.draft_deposition_id == "456"
+    assert recorded.uploaded_files == {
+        f.name: get_md5_checksum(f) for f in files_to_upload[:2]
+    }
+    assert not recorded.published
+
+    # Re-running without resuming would risk a second draft
+    with pytest.raises(ValueError, match="unfinished release"):
+        create_new_version(**kwargs)
+
+    fail_on.clear()
+    res = create_new_version(**kwargs, resume=True)
+
+    assert res == "456"
+    assert calls == {
+        "create": ["122"],
+        "metadata": ["456"],
+        "upload": ["file-0.txt", "file-1.txt", "file-2.txt"],
+        "publish": ["456"],
+    }
+    assert ReleaseCheckpoint.from_file(checkpoint).published
+
+    # Resuming a published release does nothing more
+    assert create_new_version(**kwargs, resume=True) == "456"
+    assert calls["publish"] == ["456"]
@@ -0,0 +1,161 @@
+"""
+Tests of `openscm_zenodo.compression`
+"""
+
+from __future__ import annotations
+
+import gzip
+import json
+import subprocess
+import sys
+
+import pytest
+
+from openscm_zenodo.compression import (
+    COMPRESSION_BLOCK_SIZE,
+    COMPRESSION_MANIFEST_FILENAME,
+    CompressedFile,
+    CompressionMethod,
+    estimate_compression_ratio,
+)
+from openscm_zenodo.zenodo import ZenodoInteractor
+
+
+@pytest.fixture
+def csv_file(tmp_path):
+    out = tmp_path / "data.csv"
+    # Several blocks, so that blocks are compressed in parallel
+    n_rows = 3 * COMPRESSION_BLOCK_SIZE // 20
+    out.write_text("".join(f"{i},{i % 97},{i % 13}\n" for i in range(n_rows)))
+
+    return out
+
+
+def test_compressed_file_gzip(csv_file):
+    compressed_file = CompressedFile(csv_file, method=CompressionMethod.gzip)
+
+    compressed = b"".join(compressed_file)
+
+    assert compressed_file.filename == "data.csv.gz"
+    assert compressed_file.compressed_size == len(compressed)
+    # Multi-member gzip files decompress to the concatenated members
+    assert gzip.decompress(compressed) == csv_file.read_bytes()
+
+
+def test_compressed_file_zstd(csv_file):
+    zstandard = pytest.importorskip("zstandard")
+    compressed_file = CompressedFile(csv_file, method=CompressionMethod.zstd)
+
+    compressed = b"".join(compressed_file)
+
+    assert compressed_file.filename == "data.csv.zst"
+    assert compressed_file.compressed_size == len(compressed)
+    decompressed = zstandard.ZstdDecompressor().decompressobj().decompress(compressed)
+    assert decompressed == csv_file.read_bytes()
+
+
+def test_compressed_file_zstd_not_installed(csv_file, monkeypatch):
+    # Makes `import zstandard` raise an ImportError
+    monkeypatch.setitem(sys.modules, "zstandard", None)
+    compressed_file = CompressedFile(csv_file, method=CompressionMethod.zstd)
+
+    with pytest.raises(ImportError, match=r"openscm-zenodo\[zstd\]"):
+        b"".join(compressed_file)
+
+
+def test_compression_does_not_import_requests():
+    # Compression runs in worker processes, which shouldn't load the HTTP stack
+    res = subprocess.run(  # noqa: S603
+        [
+            sys.executable,
+            "-c",
+            "import sys; import openscm_zenodo.compression; "
+            "print('requests' in sys.modules)",
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+    assert res.stdout.strip() == "False"
+
+
+def test_estimate_compression_ratio(csv_file):
+    estimate = estimate_compression_ratio(csv_file, method=CompressionMethod.gzip)
+
+    actual = csv_file.stat().st_size / len(
+        b"".join(CompressedFile(csv_file, method=CompressionMethod.gzip))
+    )
+    assert estimate == pytest.approx(actual, rel=0.2)
+
+
+def test_upload_files_compressed(bucket_server, csv_file, monkeypatch):
+    def get_bucket_url(self, deposition_id):
+        return f"http://127.0.0.1:{bucket_server.server_address[1]}/{deposition_id}"
+
+    monkeypatch.setattr(ZenodoInteractor, "get_bucket_url", get_bucket_url)
+    zi = ZenodoInteractor(token="special")  # noqa: S106
+
+    zi.upload_files(
+        "123",
+        to_upload=[csv_file],
+        compression=CompressionMethod.gzip,
+        compression_manifest=True,
+    )
+
+    received = {path.split("?")[0]: body for path, _, body in bucket_server.received}
+    assert set(received) == {
+        "/123/data.csv.gz",
+        f"/123/{COMPRESSION_MANIFEST_FILENAME}",
+    }
+    assert gzip.decompress(received["/123/data.csv.gz"]) == csv_file.read_bytes()
+
+    manifest = json.loads(received[f"/123/{COMPRESSION_MANIFEST_FILENAME}"])
+    assert manifest == {
+        "files": [
+            {
+                "filename": "data.csv.gz",
+                "original_filename": "data.csv",
+                "method": "gzip",
+                "original_size": csv_file.stat().st_size,
+                "compressed_size": len(received["/123/data.csv.gz"]),
+            }
+        ]
+    }
+
+
+def test_upload_files_compressed_in_processes(bucket_server, csv_file, monkeypatch):
+    def get_bucket_url(self, deposition_id):
+        return f"http://127.0.0.1:{bucket_server.server_address[1]}/{deposition_id}"
+
+    monkeypatch.setattr(ZenodoInteractor, "get_bucket_url", get_bucket_url)
+    zi = ZenodoInteractor(token="special")  # noqa: S106
+
+    zi.upload_files(
+        "123",
+        to_upload=[csv_file],
+        compression=CompressionMethod.gzip,
+        compression_processes=2,
+    )
+
+    [(path, _, body)] = bucket_server.received
+    assert path.split("?")[0] == "/123/data.csv.gz"
+    # Same result as compressing in threads
+    assert body == b"".join(CompressedFile(csv_file, method=CompressionMethod.gzip))
+
+
+def test_upload_files_compressed_zstd(bucket_server, csv_file, monkeypatch):
+    zstandard = pytest.importorskip("zstandard")
+
+    def get_bucket_url(self, deposition_id):
+        return f"http://127.0.0.1:{bucket_server.server_address[1]}/{deposition_id}"
+
+    monkeypatch.setattr(ZenodoInteractor, "get_bucket_url", get_bucket_url)
+    zi = ZenodoInteractor(token="special")  # noqa: S106
+
+    zi.upload_files("123", to_upload=[csv_file], compression=CompressionMethod.zstd)
+
+    [(path, _, body)] = bucket_server.received
+    assert path.split("?")[0] == "/123/data.csv.zst"
+    decompressed = zstandard.ZstdDecompressor().decompressobj().decompress(body)
+    assert decompressed == csv_file.read_bytes()
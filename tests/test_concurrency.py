@@ -0,0 +1,146 @@
+"""
+Tests of `openscm_zenodo.concurrency`
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import threading
+
+import pytest
+import requests
+
+from openscm_zenodo import concurrency
+from openscm_zenodo.concurrency import (
+    AdaptiveConcurrency,
+    append_to_run_log,
+    read_last_concurrency,
+)
+from openscm_zenodo.zenodo import ZenodoInteractor
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_adaptive_concurrency_converges(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(concurrency.time, "monotonic", clock)
+
+    # Throughput (bytes per second) for each number of uploads in flight
+    link = {2: 10.0, 4: 20.0, 8: 21.0, 16: 5.0}
+
+    controller = AdaptiveConcurrency(limit=2, min_window_seconds=0.0)
+    controller._start_window()
+    for _ in range(10):
+        limit = controller.limit
+        clock.now += 1.0
+        for _ in range(limit):
+            controller.on_complete(int(link[limit] / limit))
+
+    # 8 isn't enough better than 4 to be kept
+    assert controller.converged
+    assert controller.limit == 4
+    assert controller.best_throughput == 20.0
+
+
+def _throttled_error():
+    response = requests.Response()
+    response.status_code = 429
+
+    return requests.HTTPError(response=response)
+
+
+def test_adaptive_concurrency_throttled():
+    calls = {"a": 0, "b": 0}
+
+    def upload(name):
+        calls[name] += 1
+        if name == "a" and calls[name] == 1:
+            raise _throttled_error()
+
+        return name
+
+    controller = AdaptiveConcurrency(limit=4)
+    res = controller.run([(lambda: upload("a"), 10), (lambda: upload("b"), 10)])
+
+    assert sorted(res) == ["a", "b"]
+    assert calls == {"a": 2, "b": 1}
+    assert controller.limit == 2
+    assert controller.n_throttled == 1
+
+
+def test_adaptive_concurrency_throttled_too_often():
+    def upload():
+        raise _throttled_error()
+
+    controller = AdaptiveConcurrency(limit=4, max_throttled_retries=2)
+    with pytest.raises(requests.HTTPError):
+        controller.run([(upload, 10)])
+
+    assert controller.n_throttled == 2
+
+
+def test_adaptive_concurrency_on_error_cancels_pending():
+    def fail():
+        raise ValueError("failed")
+
+    cancel_event = threading.Event()
+    errors = {}
+
+    def on_error(i, exc):
+        errors[i] = exc
+        cancel_event.set()
+
+    controller = AdaptiveConcurrency(limit=1)
+    res = controller.run(
+        [(fail, 10), (lambda: "b", 10), (lambda: "c", 10)],
+        on_error=on_error,
+        cancel_event=cancel_event,
+    )
+
+    assert res == ()
+    assert isinstance(errors[0], ValueError)
+    assert isinstance(errors[1], concurrent.futures.CancelledError)
+    assert isinstance(errors[2], concurrent.futures.CancelledError)
+
+
+def test_run_log(tmp_path):
+    run_log = tmp_path / "sub" / "run-log.jsonl"
+
+    assert read_last_concurrency("https://zenodo.org", run_log=run_log) is None
+
+    append_to_run_log({"zenodo_domain": "https://zenodo.org", "n_threads": 8}, run_log)
+    append_to_run_log(
+        {"zenodo_domain": "https://sandbox.zenodo.org", "n_threads": 2}, run_log
+    )
+    append_to_run_log({"zenodo_domain": "https://zenodo.org", "n_threads": 6}, run_log)
+
+    assert read_last_concurrency("https://zenodo.org", run_log=run_log) == 6
+    assert read_last_concurrency("https://sandbox.zenodo.org", run_log=run_log) == 2
+
+
+def test_upload_files_adaptive(bucket_server, tmp_path, monkeypatch):
+    def get_bucket_url(self, deposition_id):
+        return f"http://127.0.0.1:{bucket_server.server_address[1]}/{deposition_id}"
+
+    monkeypatch.setattr(ZenodoInteractor, "get_bucket_url", get_bucket_url)
+    to_upload = []
+    for i in range(10):
+        to_upload.append(tmp_path / f"file-{i}.txt")
+        to_upload[-1].write_text(f"content {i}")
+
+    controller = AdaptiveConcurrency(limit=2, min_window_seconds=0.0)
+    responses = ZenodoInteractor(token="special").upload_files(  # noqa: S106
+        "123", to_upload=to_upload, adaptive_concurrency=controller
+    )
+
+    assert len(responses) == len(to_upload)
+    assert {path.split("?")[0] for path, _, _ in bucket_server.received} == {
+        f"/123/{f.name}" for f in to_upload
+    }
+    assert controller.best_limit is not None
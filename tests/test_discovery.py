@@ -0,0 +1,118 @@
+"""
+Tests of `openscm_zenodo.discovery`
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from openscm_zenodo.discovery import (
+    FileFilter,
+    get_file_filter,
+    iter_files,
+    iter_unique_names,
+)
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for relative_path in (
+        "a.nc",
+        "a.csv",
+        ".hidden",
+        "sub/b.nc",
+        "sub/scratch/c.nc",
+        "scratch/d.nc",
+        "other/deep/e.nc",
+    ):
+        path = tmp_path / "tree" / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(relative_path)
+
+    return tmp_path / "tree"
+
+
+def found(tree, **kwargs):
+    return sorted(v.relative_to(tree).as_posix() for v in iter_files([tree], **kwargs))
+
+
+@pytest.mark.parametrize(
+    "file_filter, exp",
+    (
+        pytest.param(
+            None,
+            [
+                ".hidden",
+                "a.csv",
+                "a.nc",
+                "other/deep/e.nc",
+                "scratch/d.nc",
+                "sub/b.nc",
+                "sub/scratch/c.nc",
+            ],
+            id="everything",
+        ),
+        pytest.param(
+            FileFilter(include=["*.nc"], exclude=[".*"]),
+            ["a.nc", "other/deep/e.nc", "scratch/d.nc", "sub/b.nc", "sub/scratch/c.nc"],
+            id="include-by-name",
+        ),
+        pytest.param(
+            FileFilter(include=["*.nc"], exclude=["scratch/"]),
+            ["a.nc", "other/deep/e.nc", "sub/b.nc"],
+            id="exclude-dirs-at-any-depth",
+        ),
+        pytest.param(
+            FileFilter(include=["*.nc"], exclude=["/scratch/"]),
+            ["a.nc", "other/deep/e.nc", "sub/b.nc", "sub/scratch/c.nc"],
+            id="exclude-anchored-dir",
+        ),
+        pytest.param(
+            FileFilter(include=["sub/*"]),
+            ["sub/b.nc", "sub/scratch/c.nc"],
+            id="include-by-path",
+        ),
+    ),
+)
+def test_iter_files(tree, file_filter, exp):
+    assert found(tree, file_filter=file_filter, n_threads=2) == exp
+
+
+def test_iter_files_explicit_files_always_kept(tree):
+    res = list(
+        iter_files([tree / "a.csv", tree / "sub"], file_filter=FileFilter(["*.nc"]))
+    )
+
+    assert res == [tree / "a.csv", tree / "sub" / "b.nc", tree / "sub/scratch/c.nc"]
+
+
+def test_iter_files_missing(tree):
+    with pytest.raises(FileNotFoundError, match="missing does not exist"):
+        list(iter_files([tree / "missing"]))
+
+
+def test_get_file_filter_from_ignore_file(tree, tmp_path):
+    ignore_file = tmp_path / ".gitignore"
+    ignore_file.write_text("# Comments are skipped\n\n*.csv\nscratch/\n")
+
+    file_filter = get_file_filter(exclude=[".*"], ignore_file=ignore_file)
+
+    assert file_filter == FileFilter(exclude=[".*", "*.csv", "scratch/"])
+    assert found(tree, file_filter=file_filter) == [
+        "a.nc",
+        "other/deep/e.nc",
+        "sub/b.nc",
+    ]
+
+
+def test_ignore_file_negation_not_supported(tmp_path):
+    ignore_file = tmp_path / ".gitignore"
+    ignore_file.write_text("*.csv\n!keep.csv\n")
+
+    with pytest.raises(ValueError, match=r"\.gitignore:2: negated .*'!keep.csv'"):
+        FileFilter.from_ignore_file(ignore_file)
+
+
+def test_iter_unique_names(tree):
+    with pytest.raises(ValueError, match="two files with the same name"):
+        list(iter_unique_names([tree / "a.nc", tree / "sub" / "a.nc"]))
@@ -0,0 +1,51 @@
+"""
+Tests of `openscm_zenodo.executors`
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import threading
+
+from openscm_zenodo.executors import iter_bounded_map
+
+
+def test_iter_bounded_map():
+    taken = []
+
+    def items():
+        for i in range(10):
+            taken.append(i)
+            yield i
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        res = iter_bounded_map(
+            lambda v: v**2, items(), executor=executor, max_in_flight=3
+        )
+
+        assert next(res) == 0
+        # Items are only taken as results are yielded
+        assert taken == [0, 1, 2]
+        assert list(res) == [v**2 for v in range(1, 10)]
+
+
+def test_iter_bounded_map_close_cancels():
+    started = []
+    release = threading.Event()
+
+    def func(v):
+        started.append(v)
+        if v > 0:
+            release.wait()
+
+        return v
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        res = iter_bounded_map(func, range(10), executor=executor, max_in_flight=3)
+        assert next(res) == 0
+
+        res.close()
+        release.set()
+
+    # The item which was queued (but hadn't started) was cancelled
+    assert started in ([0], [0, 1])
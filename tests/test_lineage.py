@@ -0,0 +1,82 @@
+"""
+Tests of `openscm_zenodo.lineage`
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from openscm_zenodo.lineage import LineageIndex
+from openscm_zenodo.zenodo import ZenodoInteractor
+
+
+def _record(record_id, version):
+    return {
+        "id": record_id,
+        "doi": f"10.5281/zenodo.{record_id}",
+        "conceptdoi": "10.5281/zenodo.100",
+        "metadata": {"version": version, "publication_date": "2024-01-01"},
+    }
+
+
+@pytest.fixture
+def versions(monkeypatch):
+    versions = [_record(102, "v2"), _record(101, "v1")]
+    requested = []
+
+    def iter_versions(self, concept_id, page_size=100):
+        assert concept_id == "100"
+        for v in versions:
+            requested.append(v["id"])
+            yield v
+
+    monkeypatch.setattr(ZenodoInteractor, "iter_versions", iter_versions)
+    monkeypatch.setattr(
+        ZenodoInteractor, "get_concept_id", lambda self, any_deposition_id: "100"
+    )
+
+    return versions, requested
+
+
+def test_resolve_latest(tmp_path, versions):
+    versions, requested = versions
+    index = LineageIndex(path=tmp_path / "index.sqlite")
+    zi = ZenodoInteractor()
+
+    with pytest.raises(KeyError):
+        index.resolve_latest("101")
+
+    latest = index.resolve_latest("101", zenodo_interactor=zi)
+    assert latest.record_id == "102"
+    assert latest.doi == "10.5281/zenodo.102"
+    assert latest.is_latest
+    assert requested == [102, 101]
+
+    # Answered locally now, whichever ID we use
+    for any_id in ["100", "101", "102"]:
+        assert index.resolve_latest(any_id).record_id == "102"
+
+    assert requested == [102, 101]
+
+
+def test_refresh_incremental(tmp_path, versions):
+    versions, requested = versions
+    index = LineageIndex(path=tmp_path / "index.sqlite")
+    zi = ZenodoInteractor()
+
+    index.refresh("100", zenodo_interactor=zi)
+
+    versions.insert(0, _record(103, "v3"))
+    requested.clear()
+
+    added = index.refresh("100", zenodo_interactor=zi)
+
+    assert [v.record_id for v in added] == ["103"]
+    # Stopped as soon as we hit a known version
+    assert requested == [103, 102]
+    assert [(v.record_id, v.is_latest) for v in index.get_versions("100")] == [
+        ("103", True),
+        ("102", False),
+        ("101", False),
+    ]
+    assert index.resolve_latest("101").version == "v3"
@@ -0,0 +1,86 @@
+"""
+Tests of `openscm_zenodo.logging`
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import threading
+
+import pytest
+from loguru import logger
+
+from openscm_zenodo.logging import QueuedSink, get_default_config, setup_logging
+from openscm_zenodo.zenodo import RestAction, ZenodoInteractor
+
+
+@pytest.fixture
+def reset_logging():
+    yield
+
+    logger.remove()
+    logger.disable("openscm_zenodo")
+
+
+def test_queued_sink_writes_everything():
+    stream = io.StringIO()
+    sink = QueuedSink(stream)
+
+    def write(i):
+        for j in range(100):
+            sink.write(f"{i}-{j}\n")
+
+    threads = [threading.Thread(target=write, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    sink.stop()
+
+    lines = stream.getvalue().splitlines()
+    assert sorted(lines) == sorted(f"{i}-{j}" for i in range(4) for j in range(100))
+    # Each thread's messages stay in order
+    assert [v for v in lines if v.startswith("0-")] == [f"0-{j}" for j in range(100)]
+
+
+@pytest.mark.usefixtures("reset_logging")
+@pytest.mark.parametrize("enqueue", (True, False))
+def test_serialize(enqueue, capsys):
+    setup_logging(enable=True, enqueue=enqueue, serialize=True)
+    logger.info("Uploading {} to {!r}", "file.txt", "https://example.com")
+    # Write any queued messages
+    logger.remove()
+
+    record = json.loads(capsys.readouterr().err)
+    assert record["text"] == "Uploading file.txt to 'https://example.com'\n"
+    assert record["record"]["level"]["name"] == "INFO"
+
+
+def test_default_config_enqueue():
+    [handler] = get_default_config(enqueue=True)["handlers"]
+    assert isinstance(handler["sink"], QueuedSink)
+    handler["sink"].stop()
+
+
+@pytest.mark.usefixtures("reset_logging")
+def test_token_only_masked_if_logged(monkeypatch, bucket_server):
+    calls = []
+
+    def mask_token(input, token):
+        calls.append(input)
+        return input
+
+    monkeypatch.setattr("openscm_zenodo.zenodo.mask_token", mask_token)
+    zenodo_interactor = ZenodoInteractor(token="special")  # noqa: S106
+    url = f"http://127.0.0.1:{bucket_server.server_address[1]}"
+
+    setup_logging(enable=True, logging_level="INFO")
+    zenodo_interactor.get_response_from_url(url, rest_action=RestAction.put, data=b"")
+    assert not calls
+
+    setup_logging(enable=True, logging_level="DEBUG")
+    zenodo_interactor.get_response_from_url(url, rest_action=RestAction.put, data=b"")
+    assert calls == [url]
@@ -0,0 +1,287 @@
+"""
+Tests of `openscm_zenodo.metadata`
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+from unittest.mock import Mock
+
+import pytest
+from typer.testing import CliRunner
+
+from openscm_zenodo.cli.app import app
+from openscm_zenodo.metadata import (
+    MetadataPatchError,
+    MetadataValidationError,
+    apply_metadata_patch,
+    get_metadata_diff,
+    get_metadata_errors,
+    get_metadata_schema,
+    validate_metadata,
+)
+from openscm_zenodo.operations import update_metadata_operation
+from openscm_zenodo.zenodo import ZenodoInteractor, create_new_version
+
+
+@pytest.fixture
+def metadata(test_data_dir):
+    with open(test_data_dir / "test-deposit-metadata.json") as fh:
+        return json.load(fh)
+
+
+def test_valid(metadata):
+    assert not get_metadata_errors(metadata)
+    validate_metadata(metadata)
+
+
+def test_schema_cached():
+    assert get_metadata_schema() is get_metadata_schema()
+
+
+@pytest.mark.parametrize(
+    "update, exp_error",
+    (
+        pytest.param(
+            {"title": None}, "$.metadata.title: expected string", id="title-type"
+        ),
+        pytest.param(
+            {"upload_type": "spreadsheet"},
+            "$.metadata.upload_type: 'spreadsheet' is not one of",
+            id="upload-type",
+        ),
+        pytest.param(
+            {"creators": []},
+            "$.metadata.creators: expected at least 1 item(s)",
+            id="no-creators",
+        ),
+        pytest.param(
+            {"creators": [{"affiliation": "Somewhere"}]},
+            "$.metadata.creators[0]: missing required key 'name'",
+            id="creator-name",
+        ),
+        pytest.param(
+            {"creators": [{"name": "A, B", "orcid": "0000-0002"}]},
+            "$.metadata.creators[0].orcid: '0000-0002' does not match",
+            id="orcid",
+        ),
+        pytest.param(
+            {"publication_date": "1 May 2024"},
+            "$.metadata.publication_date: '1 May 2024' does not match",
+            id="publication-date",
+        ),
+        pytest.param(
+            {"upload_type": "publication"},
+            "$.metadata: missing required key 'publication_type'",
+            id="publication-type",
+        ),
+        pytest.param(
+            {"access_right": "embargoed"},
+            "$.metadata: missing required key 'embargo_date'",
+            id="embargo-date",
+        ),
+        pytest.param(
+            {"description": ""},
+            "$.metadata.description: must not be empty",
+            id="empty-description",
+        ),
+    ),
+)
+def test_invalid(metadata, update, exp_error):
+    metadata["metadata"].update(update)
+
+    errors = get_metadata_errors(metadata)
+    assert len(errors) == 1
+    assert errors[0].startswith(exp_error)
+
+
+def test_missing_keys(metadata):
+    metadata["metadata"].pop("title")
+    metadata["metadata"].pop("creators")
+
+    with pytest.raises(MetadataValidationError) as excinfo:
+        validate_metadata(metadata)
+
+    assert excinfo.value.errors == [
+        "$.metadata: missing required key 'title'",
+        "$.metadata: missing required key 'creators'",
+    ]
+
+
+def test_missing_metadata_key():
+    assert get_metadata_errors({"title": "No wrapper"}) == [
+        "$: missing required key 'metadata'"
+    ]
+
+
+def test_records_api_form_valid(metadata):
+    # As returned by the records API, e.g. for a published record
+    metadata["metadata"].pop("upload_type")
+    metadata["metadata"].pop("description")
+    metadata["metadata"]["resource_type"] = {"type": "dataset"}
+    metadata["metadata"]["license"] = {"id": "cc-by-sa-4.0"}
+
+    assert not get_metadata_errors(metadata)
+
+
+def test_create_new_version_validates_before_contacting_zenodo(metadata):
+    metadata["metadata"].pop("title")
+    zenodo_interactor = Mock()
+
+    with pytest.raises(MetadataValidationError, match="'title'"):
+        create_new_version(
+            "123", zenodo_interactor=zenodo_interactor, metadata=metadata, validate=True
+        )
+
+    zenodo_interactor.assert_not_called()
+    assert not zenodo_interactor.method_calls
+
+
+def test_update_metadata_validate(metadata):
+    metadata["metadata"].pop("title")
+    zenodo_interactor = Mock()
+
+    with pytest.raises(MetadataValidationError):
+        update_metadata_operation(
+            zenodo_interactor, "123", copy.deepcopy(metadata), validate=True
+        )
+
+    assert not zenodo_interactor.method_calls
+
+    # Validation is opt-in
+    update_metadata_operation(zenodo_interactor, "123", metadata, skip_unchanged=False)
+    zenodo_interactor.update_metadata.assert_called_once_with("123", metadata=metadata)
+
+
+def test_metadata_diff(metadata):
+    current = copy.deepcopy(metadata)
+    # Keys controlled by Zenodo are ignored
+    current["metadata"]["doi"] = "10.5281/zenodo.123"
+    current["metadata"]["prereserve_doi"] = {"doi": "10.5281/zenodo.123"}
+
+    assert get_metadata_diff(current, metadata) == ""
+
+    metadata["metadata"]["title"] = "New title"
+    diff = get_metadata_diff(current, metadata)
+
+    assert diff.startswith("--- current\n+++ desired\n")
+    assert '-    "title": "OpenSCM-Zenodo testing 0",\n' in diff
+    assert '+    "title": "New title",\n' in diff
+    assert "doi" not in diff
+
+
+@pytest.mark.parametrize("changed", (True, False))
+def test_update_metadata_if_changed(metadata, changed, monkeypatch):
+    put = Mock()
+    monkeypatch.setattr(ZenodoInteractor, "update_metadata", put)
+    current = copy.deepcopy(metadata)
+    if changed:
+        metadata["metadata"]["version"] = "v2.0.0"
+
+    res = ZenodoInteractor(token="special").update_metadata_if_changed(  # noqa: S106
+        "123", metadata=metadata, current_metadata=current
+    )
+
+    if changed:
+        put.assert_called_once_with(deposition_id="123", metadata=metadata)
+        assert res is put.return_value
+
+    else:
+        put.assert_not_called()
+        assert res is None
+
+
+def test_update_metadata_skips_unchanged(metadata):
+    zenodo_interactor = Mock()
+    zenodo_interactor.get_deposition.return_value.json.return_value = {
+        "metadata": {**metadata["metadata"], "doi": "10.5281/zenodo.123"}
+    }
+    zenodo_interactor.update_metadata_if_changed.return_value = None
+
+    update_metadata_operation(zenodo_interactor, "123", metadata)
+
+    zenodo_interactor.update_metadata.assert_not_called()
+    zenodo_interactor.update_metadata_if_changed.assert_called_once()
+
+
+def test_diff_metadata_command(metadata, tmp_path, monkeypatch):
+    def get_metadata(self, deposition_id):
+        return {"metadata": {**metadata["metadata"], "title": "Old title"}}
+
+    monkeypatch.setattr(ZenodoInteractor, "get_metadata", get_metadata)
+    metadata_file = tmp_path / "metadata.json"
+    metadata_file.write_text(json.dumps(metadata))
+
+    res = CliRunner(mix_stderr=False).invoke(
+        app,
+        ["diff-metadata", "123", "--metadata-file", str(metadata_file)],
+        env={"ZENODO_TOKEN": "special"},
+    )
+
+    assert res.exit_code == 1, res.stderr
+    assert '-    "title": "Old title",' in res.stdout
+
+
+@pytest.mark.parametrize(
+    "patch, exp",
+    (
+        pytest.param(
+            [{"op": "add", "path": "/metadata/keywords", "value": ["a"]}],
+            {"keywords": ["a"]},
+            id="add-key",
+        ),
+        pytest.param(
+            [{"op": "add", "path": "/metadata/creators/-", "value": {"name": "B"}}],
+            {"creators": [{"name": "A"}, {"name": "B"}]},
+            id="append",
+        ),
+        pytest.param(
+            [{"op": "add", "path": "/metadata/creators/0", "value": {"name": "B"}}],
+            {"creators": [{"name": "B"}, {"name": "A"}]},
+            id="insert",
+        ),
+        pytest.param(
+            [{"op": "replace", "path": "/metadata/creators/0/name", "value": "C"}],
+            {"creators": [{"name": "C"}]},
+            id="replace",
+        ),
+        pytest.param(
+            [
+                {"op": "test", "path": "/metadata/title", "value": "T"},
+                {"op": "remove", "path": "/metadata/title"},
+            ],
+            {"title": None},
+            id="test-remove",
+        ),
+    ),
+)
+def test_apply_metadata_patch(patch, exp):
+    start = {"metadata": {"title": "T", "creators": [{"name": "A"}]}}
+    original = copy.deepcopy(start)
+
+    res = apply_metadata_patch(start, patch)
+
+    exp_metadata = {**start["metadata"], **exp}
+    exp_metadata = {k: v for k, v in exp_metadata.items() if v is not None}
+    assert res == {"metadata": exp_metadata}
+    # The input isn't modified
+    assert start == original
+
+
+@pytest.mark.parametrize(
+    "operation, exp_error",
+    (
+        ({"op": "move", "path": "/metadata/title"}, "Unsupported operation"),
+        ({"op": "remove", "path": "/metadata/license"}, "does not exist"),
+        ({"op": "replace", "path": "/metadata/creators/3", "value": 1}, "not exist"),
+        ({"op": "add", "path": "/missing/title", "value": 1}, "does not exist"),
+        ({"op": "test", "path": "/metadata/title", "value": "U"}, "Test failed"),
+        ({"op": "add", "path": "metadata", "value": 1}, "must start with '/'"),
+    ),
+)
+def test_apply_metadata_patch_error(operation, exp_error):
+    with pytest.raises(MetadataPatchError, match=exp_error):
+        apply_metadata_patch(
+            {"metadata": {"title": "T", "creators": [{"name": "A"}]}}, [operation]
+        )
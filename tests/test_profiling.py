@@ -0,0 +1,91 @@
+"""
+Tests of `openscm_zenodo.profiling`
+"""
+
+from __future__ import annotations
+
+import pstats
+
+from typer.testing import CliRunner
+
+from openscm_zenodo.cli.app import app
+from openscm_zenodo.profiling import (
+    CommandProfiler,
+    format_method_timings,
+    get_method_timings,
+)
+from openscm_zenodo.zenodo import ZenodoInteractor
+
+
+def upload_to_bucket_server(bucket_server, tmp_path, monkeypatch):
+    def get_bucket_url(self, deposition_id):
+        return f"http://127.0.0.1:{bucket_server.server_address[1]}/{deposition_id}"
+
+    monkeypatch.setattr(ZenodoInteractor, "get_bucket_url", get_bucket_url)
+    to_upload = []
+    for i in range(3):
+        to_upload.append(tmp_path / f"file-{i}.txt")
+        to_upload[-1].write_text(f"content {i}")
+
+    return to_upload
+
+
+def test_profiler_includes_threads(bucket_server, tmp_path, monkeypatch):
+    to_upload = upload_to_bucket_server(bucket_server, tmp_path, monkeypatch)
+    output_file = tmp_path / "profiles" / "upload.pstats"
+
+    profiler = CommandProfiler(output_file)
+    profiler.start()
+    ZenodoInteractor(token="special").upload_files(  # noqa: S106
+        "123", to_upload=to_upload, n_threads=2
+    )
+    stats = profiler.stop()
+
+    # Written in a form pstats can read back
+    pstats.Stats(str(output_file))
+
+    timings = {
+        name: n_calls
+        for name, n_calls, _ in get_method_timings(stats, ZenodoInteractor)
+    }
+    assert timings["upload_files"] == 1
+    # Only visible if the upload threads were profiled too
+    assert timings["upload_file_to_bucket_url"] == len(to_upload)
+
+
+def test_format_method_timings():
+    res = format_method_timings(
+        [("upload_files", 1, 2.5), ("get_bucket_url", 1, 0.25)], title="Timings"
+    )
+
+    assert res == "\n".join(
+        [
+            "Timings",
+            "method            calls   time (s)",
+            "upload_files          1      2.500",
+            "get_bucket_url        1      0.250",
+        ]
+    )
+
+
+def test_profile_option(bucket_server, tmp_path, monkeypatch):
+    to_upload = upload_to_bucket_server(bucket_server, tmp_path, monkeypatch)
+    output_file = tmp_path / "upload.pstats"
+
+    res = CliRunner(mix_stderr=False).invoke(
+        app,
+        [
+            "--no-logging",
+            "--profile",
+            str(output_file),
+            "upload-files",
+            "123",
+            *(str(v) for v in to_upload),
+        ],
+        env={"ZENODO_TOKEN": "special"},
+    )
+
+    assert res.exit_code == 0, res.stderr
+    pstats.Stats(str(output_file))
+    assert f"Profile written to {output_file}" in res.stderr
+    assert "upload_file_to_bucket_url" in res.stderr
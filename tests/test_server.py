@@ -0,0 +1,118 @@
+"""
+Tests of `openscm_zenodo.server` and `openscm_zenodo.client`
+"""
+
+from __future__ import annotations
+
+import http.client
+import json
+import stat
+import threading
+
+import pytest
+
+from openscm_zenodo.client import ServerClient, ServerError
+from openscm_zenodo.server import ZenodoServer
+from openscm_zenodo.zenodo import ZenodoInteractor
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = ZenodoServer("127.0.0.1:0", secret_file=tmp_path / "server.secret")
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_client_server(server, monkeypatch):
+    def get_bibtex_entry(self, deposition_id):
+        return f"@misc{{{deposition_id}}}"
+
+    monkeypatch.setattr(ZenodoInteractor, "get_bibtex_entry", get_bibtex_entry)
+
+    client = ServerClient(address=server.address, secret_file=server.secret_file)
+    assert client.is_available()
+
+    res = client.run(
+        "retrieve-bibtex",
+        arguments=dict(deposition_id="123"),
+        token="special",  # noqa: S106
+    )
+    assert res == "@misc{123}"
+
+    # Interactors are re-used across operations
+    client.run(
+        "retrieve-bibtex",
+        arguments=dict(deposition_id="456"),
+        token="special",  # noqa: S106
+    )
+    assert len(server._zenodo_interactors) == 1
+
+    with pytest.raises(ServerError, match="KeyError"):
+        client.run("not-an-operation", arguments={})
+
+    with pytest.raises(ServerError, match="BadRequest"):
+        client.run(
+            "retrieve-bibtex",
+            arguments=dict(deposition_id="123"),
+            zenodo_domain="https://attacker.example.com",
+        )
+
+
+def test_server_secret(server, tmp_path):
+    assert stat.S_IMODE(server.secret_file.stat().st_mode) == 0o600
+
+    other_secret_file = tmp_path / "other.secret"
+    other_secret_file.write_text("not-the-secret")
+    client = ServerClient(address=server.address, secret_file=other_secret_file)
+
+    assert not client.is_available()
+    with pytest.raises(ServerError, match="Unauthorised"):
+        client.run("retrieve-bibtex", arguments=dict(deposition_id="123"))
+
+
+def _post(server, content_type, authorised=True):
+    connection = http.client.HTTPConnection(*server.server_address)
+    headers = {"Content-Type": content_type}
+    if authorised:
+        headers["Authorization"] = f"Bearer {server.secret}"
+
+    try:
+        connection.request(
+            "POST",
+            "/run",
+            body=json.dumps({"operation": "retrieve-bibtex", "arguments": {}}),
+            headers=headers,
+        )
+        return connection.getresponse().status
+
+    finally:
+        connection.close()
+
+
+def test_server_rejects_non_json(server):
+    # What a cross-site request from a web page looks like
+    assert _post(server, "text/plain", authorised=False) == 401
+    assert _post(server, "text/plain") == 415
+
+
+def test_server_errors_have_status(server):
+    # The operation fails, because it is missing an argument
+    assert _post(server, "application/json") == 500
+
+
+def test_server_secret_removed(tmp_path):
+    server = ZenodoServer("127.0.0.1:0", secret_file=tmp_path / "server.secret")
+    assert server.secret_file.exists()
+
+    server.server_close()
+    assert not server.secret_file.exists()
+
+
+def test_client_no_server():
+    # Port 1 is privileged so nothing we start will be listening on it
+    assert not ServerClient(address="127.0.0.1:1").is_available()
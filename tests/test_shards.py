@@ -0,0 +1,163 @@
+"""
+Tests of `openscm_zenodo.shards`
+"""
+
+from __future__ import annotations
+
+from unittest.mock import Mock
+
+import pytest
+
+from openscm_zenodo.operations import upload_shard_operation, verify_uploads_operation
+from openscm_zenodo.shards import (
+    ShardManifest,
+    parse_shard,
+    verify_deposition_files,
+)
+from openscm_zenodo.sync import RemoteFile
+
+
+@pytest.mark.parametrize(
+    "value, exp",
+    (("1/1", (1, 1)), ("2/4", (2, 4))),
+)
+def test_parse_shard(value, exp):
+    assert parse_shard(value) == exp
+
+
+@pytest.mark.parametrize(
+    "value, match",
+    (
+        ("2", "must be of the form"),
+        ("a/4", "must be of the form"),
+        ("0/4", "between 1 and 4"),
+        ("5/4", "between 1 and 4"),
+    ),
+)
+def test_parse_shard_invalid(value, match):
+    with pytest.raises(ValueError, match=match):
+        parse_shard(value)
+
+
+@pytest.fixture
+def manifest_file(tmp_path):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    for i, size in enumerate((50, 10, 30, 30, 20, 5)):
+        (data_dir / f"file-{i}.bin").write_bytes(bytes(size))
+
+    manifest = ShardManifest.from_files(sorted(data_dir.iterdir()))
+    manifest_file = tmp_path / "manifests" / "release.json"
+    manifest.save(manifest_file)
+
+    return manifest_file
+
+
+def test_manifest_round_trip(manifest_file, tmp_path):
+    moved = tmp_path / "moved"
+    moved.mkdir()
+    (tmp_path / "data").rename(moved / "data")
+    (tmp_path / "manifests").rename(moved / "manifests")
+
+    res = ShardManifest.from_file(moved / "manifests" / "release.json")
+
+    # Paths are relative to the manifest, so moving both together is fine
+    assert [v.path.resolve() for v in res.entries] == sorted((moved / "data").iterdir())
+    assert [v.size for v in res.entries] == [50, 10, 30, 30, 20, 5]
+
+
+def test_get_shard(manifest_file):
+    manifest = ShardManifest.from_file(manifest_file)
+
+    shards = [manifest.get_shard(i, n_shards=3) for i in (1, 2, 3)]
+
+    assert sorted(v.name for shard in shards for v in shard) == [
+        v.name for v in manifest.entries
+    ]
+    assert [sum(v.size for v in shard) for shard in shards] == [50, 50, 45]
+    assert shards == [manifest.get_shard(i, n_shards=3) for i in (1, 2, 3)]
+
+
+def _remote(entry, file_id, checksum=None):
+    return RemoteFile(
+        id=file_id,
+        filename=entry.name,
+        filesize=entry.size,
+        checksum=entry.checksum if checksum is None else checksum,
+    )
+
+
+def test_verify_deposition_files(manifest_file):
+    entries = ShardManifest.from_file(manifest_file).entries
+    unexpected = RemoteFile(id="x", filename="other.txt", filesize=1, checksum="abc")
+
+    res = verify_deposition_files(
+        ShardManifest(entries=entries),
+        [
+            *(_remote(v, str(i)) for i, v in enumerate(entries[2:])),
+            _remote(entries[1], "1", checksum="not-the-checksum"),
+            unexpected,
+        ],
+    )
+
+    assert res.missing == (entries[0],)
+    assert [v for v, _ in res.mismatched] == [entries[1]]
+    assert res.unexpected == (unexpected,)
+    assert res.n_verified == len(entries) - 2
+    assert not res.is_complete
+    assert res.to_lines()[0] == "missing file-0.bin"
+
+
+def test_upload_shard_operation(manifest_file):
+    entries = ShardManifest.from_file(manifest_file).get_shard(1, n_shards=2)
+    zenodo_interactor = Mock()
+    zenodo_interactor.get_files.return_value = [
+        {"id": "1", "filename": v.name, "filesize": v.size, "checksum": checksum}
+        for v, checksum in (
+            (entries[0], entries[0].checksum),
+            (entries[1], "not-the-checksum"),
+        )
+    ]
+
+    res = upload_shard_operation(
+        zenodo_interactor, "123", manifest_file=str(manifest_file), shard="1/2"
+    )
+
+    assert res == [v.name for v in entries[1:]]
+    zenodo_interactor.remove_files_by_id.assert_called_once_with(
+        deposition_id="123", file_ids_to_remove=["1"]
+    )
+    zenodo_interactor.upload_files.assert_called_once_with(
+        "123", to_upload=[v.path for v in entries[1:]], n_threads=4, fail_fast=True
+    )
+
+
+def test_verify_uploads_operation_publishes_only_if_complete(manifest_file):
+    entries = ShardManifest.from_file(manifest_file).entries
+    zenodo_interactor = Mock()
+    zenodo_interactor.get_files.return_value = [
+        {"id": "1", "filename": v.name, "filesize": v.size, "checksum": v.checksum}
+        for v in entries[1:]
+    ]
+
+    res = verify_uploads_operation(
+        zenodo_interactor, "123", manifest_file=str(manifest_file), publish=True
+    )
+
+    assert res == ["missing file-0.bin"]
+    zenodo_interactor.publish.assert_not_called()
+
+    zenodo_interactor.get_files.return_value.append(
+        {
+            "id": "2",
+            "filename": entries[0].name,
+            "filesize": entries[0].size,
+            "checksum": f"md5:{entries[0].checksum}",
+        }
+    )
+    res = verify_uploads_operation(
+        zenodo_interactor, "123", manifest_file=str(manifest_file), publish=True
+    )
+
+    assert res == []
+    zenodo_interactor.publish.assert_called_once_with("123")
@@ -0,0 +1,87 @@
+"""
+Tests of `openscm_zenodo.streaming` and streaming uploads
+"""
+
+from __future__ import annotations
+
+import io
+
+import pytest
+
+from openscm_zenodo.streaming import MmapFileBody, StreamBody
+from openscm_zenodo.zenodo import ZenodoInteractor
+
+
+@pytest.mark.parametrize(
+    "get_source",
+    (
+        pytest.param(lambda: io.BytesIO(b"abc" * 1000), id="stream"),
+        pytest.param(lambda: (b"abc" * 100 for _ in range(10)), id="generator"),
+    ),
+)
+@pytest.mark.parametrize("size", (None, 3000))
+def test_upload_stream_to_bucket_url(bucket_server, get_source, size):
+    zi = ZenodoInteractor(token="special")  # noqa: S106
+
+    zi.upload_stream_to_bucket_url(
+        source=get_source(),
+        filename="out.csv",
+        bucket_url=f"http://127.0.0.1:{bucket_server.server_address[1]}/bucket",
+        size=size,
+    )
+
+    [(path, headers, body)] = bucket_server.received
+    assert path.startswith("/bucket/out.csv?")
+    assert body == b"abc" * 1000
+    if size is None:
+        assert headers["Transfer-Encoding"] == "chunked"
+        assert "Content-Length" not in headers
+    else:
+        assert headers["Content-Length"] == str(size)
+
+
+def test_stream_body_size_mismatch():
+    with pytest.raises(ValueError, match="larger than the size hint"):
+        list(StreamBody(source=[b"abc", b"def"], size=4))
+
+    with pytest.raises(ValueError, match="smaller than the size hint"):
+        list(StreamBody(source=io.BytesIO(b"abc"), size=4))
+
+
+def test_upload_file_to_bucket_url_mmap(bucket_server, tmp_path):
+    to_upload = tmp_path / "big.bin"
+    to_upload.write_bytes(bytes(range(256)) * 1000)
+    zi = ZenodoInteractor(token="special")  # noqa: S106
+
+    zi.upload_file_to_bucket_url(
+        to_upload,
+        bucket_url=f"http://127.0.0.1:{bucket_server.server_address[1]}/bucket",
+        use_mmap=True,
+    )
+
+    [(path, headers, body)] = bucket_server.received
+    assert path.startswith("/bucket/big.bin?")
+    assert headers["Content-Length"] == str(256 * 1000)
+    assert body == to_upload.read_bytes()
+
+
+def test_mmap_file_body(tmp_path):
+    to_upload = tmp_path / "big.bin"
+    to_upload.write_bytes(b"a" * 1000)
+    progress = []
+
+    body = MmapFileBody(
+        to_upload, callback=progress.append, chunk_size=100, progress_interval=300
+    )
+
+    assert len(body) == 1000
+    assert b"".join(bytes(chunk) for chunk in body) == b"a" * 1000
+    # Progress is sampled rather than reported for every chunk
+    assert progress == [300, 300, 300, 100]
+
+
+def test_mmap_file_body_empty(tmp_path):
+    to_upload = tmp_path / "empty.bin"
+    to_upload.touch()
+
+    assert list(MmapFileBody(to_upload)) == []
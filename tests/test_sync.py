@@ -0,0 +1,158 @@
+"""
+Tests of `openscm_zenodo.sync`
+"""
+
+from __future__ import annotations
+
+import threading
+from unittest.mock import Mock
+
+import pytest
+
+from openscm_zenodo.sync import (
+    RemoteFile,
+    SyncPlan,
+    apply_sync_plan,
+    get_md5_checksum,
+    plan_sync,
+)
+from openscm_zenodo.zenodo import UploadFilesError
+
+
+def _remote(file, file_id, checksum=None, filesize=None):
+    return RemoteFile(
+        id=file_id,
+        filename=file.name,
+        filesize=file.stat().st_size if filesize is None else filesize,
+        checksum=get_md5_checksum(file) if checksum is None else checksum,
+    )
+
+
+def test_plan_sync(tmp_path):
+    unchanged = tmp_path / "unchanged.txt"
+    unchanged.write_text("same")
+    same_size = tmp_path / "same-size.txt"
+    same_size.write_text("abcd")
+    new_size = tmp_path / "new-size.txt"
+    new_size.write_text("longer than before")
+    new = tmp_path / "new.txt"
+    new.write_text("new")
+
+    remote_files = [
+        _remote(unchanged, "1"),
+        _remote(same_size, "2", checksum="not-the-checksum"),
+        _remote(new_size, "3", filesize=1),
+        RemoteFile(id="4", filename="removed.txt", filesize=3, checksum="abc"),
+    ]
+
+    res = plan_sync([unchanged, same_size, new_size, new], remote_files)
+
+    assert res.to_upload == (new,)
+    assert {(f, r.id) for f, r in res.to_replace} == {(same_size, "2"), (new_size, "3")}
+    assert res.to_delete == (remote_files[3],)
+    assert res.unchanged == (unchanged,)
+    assert not res.is_empty
+
+    res_no_delete = plan_sync(
+        [unchanged], remote_files[:1] + remote_files[3:], delete=False
+    )
+    assert res_no_delete.is_empty
+
+
+def test_apply_sync_plan(tmp_path):
+    new = tmp_path / "new.txt"
+    changed = tmp_path / "changed.txt"
+    removed = RemoteFile(id="1", filename="removed.txt", filesize=3, checksum="abc")
+    replaced = RemoteFile(id="2", filename="changed.txt", filesize=3, checksum="abc")
+    events = []
+    lock = threading.Lock()
+
+    def remove_file_id(deposition_id, to_remove_id):
+        with lock:
+            events.append(("remove", to_remove_id))
+
+    def upload_files(deposition_id, to_upload, n_threads):
+        for file in to_upload:
+            with lock:
+                events.append(("upload", file.name))
+
+    zenodo_interactor = Mock()
+    zenodo_interactor.remove_file_id.side_effect = remove_file_id
+    zenodo_interactor.upload_files.side_effect = upload_files
+
+    apply_sync_plan(
+        "123",
+        SyncPlan(
+            to_upload=(new,),
+            to_replace=((changed, replaced),),
+            to_delete=(removed,),
+            unchanged=(),
+        ),
+        zenodo_interactor=zenodo_interactor,
+    )
+
+    assert sorted(events) == [
+        ("remove", "1"),
+        ("remove", "2"),
+        ("upload", "changed.txt"),
+        ("upload", "new.txt"),
+    ]
+    # The file being replaced has to be gone before it is uploaded again
+    assert events.index(("remove", "2")) < events.index(("upload", "changed.txt"))
+
+
+def test_apply_sync_plan_upload_fails(tmp_path):
+    replacements = tuple(
+        (
+            tmp_path / f"file-{i}.txt",
+            RemoteFile(id=str(i), filename=f"file-{i}.txt", filesize=3, checksum="a"),
+        )
+        for i in range(10)
+    )
+    removed = []
+
+    def remove_file_id(deposition_id, to_remove_id):
+        removed.append(to_remove_id)
+
+    def upload_files(deposition_id, to_upload, n_threads):
+        # Like `fail_fast`, stop taking files once the first upload fails
+        file = next(iter(to_upload))
+        raise UploadFilesError(
+            failures={file: ConnectionError()}, cancelled=[], responses=()
+        )
+
+    zenodo_interactor = Mock()
+    zenodo_interactor.remove_file_id.side_effect = remove_file_id
+    zenodo_interactor.upload_files.side_effect = upload_files
+
+    with pytest.raises(UploadFilesError) as exc_info:
+        apply_sync_plan(
+            "123",
+            SyncPlan(to_upload=(), to_replace=replacements, to_delete=(), unchanged=()),
+            zenodo_interactor=zenodo_interactor,
+            n_threads=2,
+        )
+
+    # Most of the files being replaced are left in place
+    assert len(removed) <= 3
+    # Every file is reported as not uploaded, including those never taken
+    assert set(exc_info.value.not_uploaded) == {f for f, _ in replacements}
+
+
+def test_plan_sync_duplicate_names(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    files = [tmp_path / "a" / "file.txt", tmp_path / "b" / "file.txt"]
+    for f in files:
+        f.write_text("content")
+
+    with pytest.raises(ValueError, match="file names must be unique"):
+        plan_sync(files, [])
+
+
+def test_remote_file_checksum_prefix():
+    res = RemoteFile.from_zenodo_json(
+        {"id": 1, "filename": "a.txt", "filesize": 3, "checksum": "md5:abc"}
+    )
+
+    assert res == RemoteFile(id="1", filename="a.txt", filesize=3, checksum="abc")
@@ -0,0 +1,104 @@
+"""
+Tests of `openscm_zenodo.uploads`
+"""
+
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from openscm_zenodo.zenodo import (
+    UploadCancelledError,
+    UploadFilesError,
+    ZenodoInteractor,
+)
+
+
+@pytest.fixture
+def files(tmp_path):
+    out = []
+    for i in range(3):
+        out.append(tmp_path / f"file-{i}.txt")
+        out[-1].write_text(f"content {i}")
+
+    return out
+
+
+def test_start_upload_files(bucket_server, files, monkeypatch):
+    monkeypatch.setattr(
+        ZenodoInteractor,
+        "get_bucket_url",
+        lambda self, deposition_id: (
+            f"http://127.0.0.1:{bucket_server.server_address[1]}/{deposition_id}"
+        ),
+    )
+    zi = ZenodoInteractor(token="special")  # noqa: S106
+
+    finished = threading.Event()
+    handle = zi.start_upload_files("123", to_upload=files, n_threads=2)
+    handle.add_done_callback(lambda h: finished.set())
+
+    responses = handle.wait(timeout=10)
+
+    assert finished.is_set()
+    assert handle.done()
+    assert [v.request.url.split("?")[0] for v in responses] == [
+        f"http://127.0.0.1:{bucket_server.server_address[1]}/123/{v.name}"
+        for v in files
+    ]
+    assert handle.futures[files[1]].result() is responses[1]
+
+    progress = handle.progress()
+    assert progress.n_uploaded == len(files)
+    assert progress.n_pending == 0
+    assert (
+        progress.n_bytes_uploaded
+        == progress.n_bytes
+        == sum(v.stat().st_size for v in files)
+    )
+
+
+@pytest.fixture
+def blocking_uploads(monkeypatch):
+    """
+    Make (fake) uploads block until they are cancelled
+    """
+    monkeypatch.setattr(
+        ZenodoInteractor, "get_bucket_url", lambda self, deposition_id: "bucket"
+    )
+
+    def upload_file_to_bucket_url(self, to_upload, bucket_url, cancel_event, **kwargs):
+        cancel_event.wait(timeout=10)
+        raise UploadCancelledError
+
+    monkeypatch.setattr(
+        ZenodoInteractor, "upload_file_to_bucket_url", upload_file_to_bucket_url
+    )
+
+
+@pytest.mark.usefixtures("blocking_uploads")
+def test_upload_handle_cancel(files):
+    zi = ZenodoInteractor(token="special")  # noqa: S106
+    handle = zi.start_upload_files("123", to_upload=files, n_threads=1)
+
+    with pytest.raises(TimeoutError):
+        handle.wait(timeout=0.1)
+
+    assert not handle.done()
+    assert handle.progress().n_pending == len(files)
+
+    handle.cancel()
+    with pytest.raises(UploadFilesError) as exc_info:
+        handle.wait(timeout=5)
+
+    assert exc_info.value.cancelled == files
+    assert handle.progress().n_cancelled == len(files)
+
+
+@pytest.mark.usefixtures("blocking_uploads")
+def test_start_upload_files_duplicates(files):
+    zi = ZenodoInteractor(token="special")  # noqa: S106
+
+    with pytest.raises(ValueError, match="two files with the same name"):
+        zi.start_upload_files("123", to_upload=[*files, files[0]])
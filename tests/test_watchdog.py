@@ -0,0 +1,154 @@
+"""
+Tests of `openscm_zenodo.watchdog`
+"""
+
+from __future__ import annotations
+
+import socket
+import threading
+import time
+
+import pytest
+
+from openscm_zenodo.watchdog import (
+    StallMonitor,
+    ThroughputWatchdog,
+    UploadStalledError,
+)
+from openscm_zenodo.zenodo import ZenodoInteractor
+
+
+def test_watchdog_stall():
+    watchdog = ThroughputWatchdog(min_bytes_per_second=1e6, window_seconds=0.05)
+    watchdog.on_progress(10)
+
+    time.sleep(0.06)
+    with pytest.raises(UploadStalledError, match="upload stalled"):
+        watchdog.on_progress(10)
+
+
+def test_watchdog_fast_enough():
+    watchdog = ThroughputWatchdog(min_bytes_per_second=1e3, window_seconds=0.05)
+    for _ in range(3):
+        time.sleep(0.03)
+        watchdog.on_progress(1000)
+
+
+def test_watchdog_excludes_paused_time():
+    watchdog = ThroughputWatchdog(min_bytes_per_second=1e6, window_seconds=0.05)
+    with watchdog.paused():
+        time.sleep(0.1)
+
+    watchdog.on_progress(10)
+
+
+def test_watchdog_not_stalled_while_paused():
+    watchdog = ThroughputWatchdog(min_bytes_per_second=1e6, window_seconds=0.05)
+    with watchdog.paused():
+        time.sleep(0.1)
+        watchdog.check()
+
+
+def test_stall_monitor_aborts():
+    watchdog = ThroughputWatchdog(min_bytes_per_second=1e6, window_seconds=0.05)
+    aborted = threading.Event()
+    watchdog.abort = aborted.set
+
+    with StallMonitor(check_interval=0.01).watching(watchdog):
+        assert aborted.wait(timeout=1)
+
+    assert watchdog.stall is not None
+    with pytest.raises(UploadStalledError):
+        watchdog.on_progress(10)
+
+
+@pytest.fixture
+def stalled_server():
+    """
+    Server which accepts connections, but never reads from them
+    """
+    server = socket.create_server(("127.0.0.1", 0))
+    connections = []
+    thread = threading.Thread(
+        target=lambda: connections.append(server.accept()), daemon=True
+    )
+    thread.start()
+
+    yield server
+
+    for connection, _ in connections:
+        connection.close()
+
+    server.close()
+
+
+def test_stall_part_way_through_chunk(stalled_server):
+    zenodo_interactor = ZenodoInteractor(
+        token="special",  # noqa: S106
+        min_upload_throughput=1e6,
+        stall_seconds=0.2,
+        upload_retries=0,
+        timeout_upload_read=60,
+    )
+    bucket_url = f"http://127.0.0.1:{stalled_server.getsockname()[1]}/bucket"
+
+    start = time.monotonic()
+    # A single chunk, much larger than the socket buffers
+    with pytest.raises(UploadStalledError):
+        zenodo_interactor.upload_stream_to_bucket_url(
+            source=[bytes(64 * 2**20)], filename="out.bin", bucket_url=bucket_url
+        )
+
+    assert time.monotonic() - start < 10
+
+
+class StallsOnce:
+    """
+    Source of chunks which stalls the first time it is read
+    """
+
+    def __init__(self):
+        self.n_reads = 0
+
+    def __iter__(self):
+        self.n_reads += 1
+        yield b"first"
+        if self.n_reads == 1:
+            time.sleep(0.2)
+
+        yield b"second"
+
+
+def get_interactor(bucket_server):
+    zenodo_interactor = ZenodoInteractor(
+        token="special",  # noqa: S106
+        min_upload_throughput=1e6,
+        stall_seconds=0.1,
+    )
+    bucket_url = f"http://127.0.0.1:{bucket_server.server_address[1]}/bucket"
+
+    return zenodo_interactor, bucket_url
+
+
+def test_stalled_upload_retried(bucket_server):
+    zenodo_interactor, bucket_url = get_interactor(bucket_server)
+    source = StallsOnce()
+
+    zenodo_interactor.upload_stream_to_bucket_url(
+        source=source, filename="out.txt", bucket_url=bucket_url
+    )
+
+    assert source.n_reads == 2
+    assert zenodo_interactor.n_upload_retries == 1
+    assert [v[2] for v in bucket_server.received] == [b"firstsecond"]
+
+
+def test_stalled_upload_not_retried_if_source_cant_be_read_again(bucket_server):
+    zenodo_interactor, bucket_url = get_interactor(bucket_server)
+
+    with pytest.raises(UploadStalledError):
+        zenodo_interactor.upload_stream_to_bucket_url(
+            source=iter(StallsOnce()), filename="out.txt", bucket_url=bucket_url
+        )
+
+    assert zenodo_interactor.n_upload_retries == 0
@@ -4,7 +4,20 @@ Tests of `openscm_zenodo.zenodo`
 
 from __future__ import annotations
 
-from openscm_zenodo.zenodo import ZenodoInteractor
+import json
+import threading
+import time
+
+import pytest
+import requests
+
+from openscm_zenodo.sync import get_md5_checksum
+from openscm_zenodo.zenodo import (
+    UploadCancelledError,
+    UploadFilesError,
+    ZenodoInteractor,
+    create_new_version,
+)
 
 
 def test_token_hidden():
@@ -14,3 +27,290 @@ def test_token_hidden():
     assert "***" in str(zi)
     assert "special" not in repr(zi)
     assert "***" in repr(zi)
+
+
+def test_timeout_upload_deprecated():
+    with pytest.warns(DeprecationWarning, match="timeout_upload_read"):
+        zi = ZenodoInteractor(timeout_upload=30.0)
+
+    assert zi.timeout_upload_read == 30.0
+
+    with pytest.warns(DeprecationWarning, match="timeout_upload_read"):
+        zi.timeout_upload = 45.0
+
+    assert zi.timeout_upload_read == 45.0
+
+
+def _json_response(content):
+    response = requests.models.Response()
+    response.status_code = 200
+    response._content = json.dumps(content).encode()
+
+    return response
+
+
+def test_find_draft_deposition_id_pages_and_stops_early(monkeypatch):
+    zi = ZenodoInteractor(token="special")  # noqa: S106
+
+    calls = []
+
+    def get_response(self, post_domain_part, rest_action=None, params=None, **kwargs):
+        calls.append(params)
+        if params["page"] == "1":
+            return _json_response([{"id": 1, "conceptrecid": "10"}] * 2)
+
+        if params["page"] == "2":
+            return _json_response(
+                [{"id": 2, "conceptrecid": "10"}, {"id": 3, "conceptrecid": "12"}]
+            )
+
+        pytest.fail("Should have stopped at the match")
+
+    monkeypatch.setattr(ZenodoInteractor, "get_response", get_response)
+
+    assert zi.find_draft_deposition_id("12", page_size=2) == "3"
+    assert len(calls) == 2
+    assert calls[0]["status"] == "draft"
+
+    # Second time around, no requests are needed
+    assert zi.find_draft_deposition_id("12", page_size=2) == "3"
+    assert len(calls) == 2
+
+    # Once the draft is published, it is no longer in the index
+    zi._forget_draft_deposition_id("3")
+    assert zi.find_draft_deposition_id("12", page_size=2) == "3"
+    assert len(calls) == 4
+
+
+def test_get_draft_deposition_id_existing_draft(monkeypatch):
+    zi = ZenodoInteractor(token="special")  # noqa: S106
+
+    monkeypatch.setattr(
+        ZenodoInteractor, "get_concept_id", lambda self, any_deposition_id: "12"
+    )
+    monkeypatch.setattr(
+        ZenodoInteractor,
+        "get_response",
+        lambda self, post_domain_part, rest_action=None, params=None, **kwargs: (
+            _json_response([{"id": 3, "conceptrecid": "12"}])
+        ),
+    )
+
+    def create_new_version_from_latest(self, latest_deposition_id):
+        pytest.fail("Should not be called")
+
+    monkeypatch.setattr(
+        ZenodoInteractor,
+        "create_new_version_from_latest",
+        create_new_version_from_latest,
+    )
+
+    assert zi.get_draft_deposition_id("11") == "3"
+
+
+def test_iter_versions_is_lazy(monkeypatch):
+    zi = ZenodoInteractor()
+
+    calls = []
+
+    def get_response(self, post_domain_part, rest_action=None, params=None, **kwargs):
+        calls.append(params)
+        page = int(params["page"])
+        links = {"next": "next-page"} if page < 3 else {}
+
+        return _json_response(
+            {
+                "hits": {"hits": [{"id": page * 10 + i} for i in range(2)]},
+                "links": links,
+            }
+        )
+
+    monkeypatch.setattr(ZenodoInteractor, "get_response", get_response)
+
+    versions = zi.iter_versions("12", page_size=2)
+    assert not calls
+
+    assert next(versions)["id"] == 10
+    assert len(calls) == 1
+    assert calls[0]["q"] == "conceptrecid:12"
+
+    assert [v["id"] for v in versions] == [11, 20, 21, 30, 31]
+    assert len(calls) == 3
+
+
+def test_create_new_version_incremental(monkeypatch, tmp_path):
+    unchanged = tmp_path / "unchanged.txt"
+    unchanged.write_text("same")
+    changed = tmp_path / "changed.txt"
+    changed.write_text("new content")
+
+    carried_over = [
+        {
+            "id": "f1",
+            "filename": "unchanged.txt",
+            "filesize": 4,
+            "checksum": get_md5_checksum(unchanged),
+        },
+        {"id": "f2", "filename": "changed.txt", "filesize": 3, "checksum": "abc"},
+        {"id": "f3", "filename": "removed.txt", "filesize": 3, "checksum": "abc"},
+    ]
+    removed = []
+    uploaded = []
+
+    monkeypatch.setattr(
+        ZenodoInteractor,
+        "get_latest_deposition_id",
+        lambda self, any_deposition_id: "1",
+    )
+    monkeypatch.setattr(
+        ZenodoInteractor,
+        "create_new_version_from_latest",
+        lambda self, latest_deposition_id: _json_response(
+            {"id": "2", "conceptrecid": "0", "files": carried_over}
+        ),
+    )
+    monkeypatch.setattr(
+        ZenodoInteractor,
+        "remove_file_id",
+        lambda self, deposition_id, to_remove_id: removed.append(to_remove_id),
+    )
+    monkeypatch.setattr(
+        ZenodoInteractor,
+        "upload_files",
+        lambda self, deposition_id, to_upload, n_threads: uploaded.extend(to_upload),
+    )
+
+    res = create_new_version(
+        "1",
+        zenodo_interactor=ZenodoInteractor(),
+        files_to_upload=[unchanged, changed],
+        incremental=True,
+    )
+
+    assert res == "2"
+    assert sorted(removed) == ["f2", "f3"]
+    assert uploaded == [changed]
+
+
+@pytest.fixture
+def files_to_upload(tmp_path, monkeypatch):
+    """
+    Files whose (fake) uploads fail if their name starts with "bad"
+
+    Other uploads wait until they are cancelled (or 5 seconds).
+    """
+    monkeypatch.setattr(
+        ZenodoInteractor, "get_bucket_url", lambda self, deposition_id: "bucket"
+    )
+
+    def upload_file_to_bucket_url(self, to_upload, bucket_url, cancel_event, **kwargs):
+        if to_upload.name.startswith("bad"):
+            msg = f"Could not upload {to_upload.name}"
+            raise requests.HTTPError(msg)
+
+        if cancel_event.wait(timeout=0.2 if "quick" in to_upload.name else 5):
+            raise UploadCancelledError
+
+        return to_upload.name
+
+    monkeypatch.setattr(
+        ZenodoInteractor, "upload_file_to_bucket_url", upload_file_to_bucket_url
+    )
+
+    files = []
+    for name in ("quick-0.txt", "bad-0.txt", "quick-1.txt", "bad-1.txt", "slow.txt"):
+        files.append(tmp_path / name)
+        files[-1].write_text(name)
+
+    return files
+
+
+def test_upload_files_continue_on_error(files_to_upload):
+    zi = ZenodoInteractor(token="special")  # noqa: S106
+
+    files = [v for v in files_to_upload if v.name != "slow.txt"]
+    with pytest.raises(UploadFilesError, match="2 upload\\(s\\) failed") as exc_info:
+        zi.upload_files("123", to_upload=files, n_threads=2, fail_fast=False)
+
+    assert sorted(v.name for v in exc_info.value.failures) == ["bad-0.txt", "bad-1.txt"]
+    assert not exc_info.value.cancelled
+    assert sorted(exc_info.value.responses) == ["quick-0.txt", "quick-1.txt"]
+
+
+def test_upload_files_fail_fast(files_to_upload):
+    zi = ZenodoInteractor(token="special")  # noqa: S106
+
+    start = time.monotonic()
+    with pytest.raises(UploadFilesError) as exc_info:
+        zi.upload_files(
+            "123", to_upload=files_to_upload[::-1], n_threads=2, fail_fast=True
+        )
+
+    # The slow upload in flight was stopped rather than waited for
+    assert time.monotonic() - start < 4
+    assert [v.name for v in exc_info.value.failures] == ["bad-1.txt"]
+    assert sorted(v.name for v in exc_info.value.not_uploaded) == sorted(
+        v.name for v in files_to_upload
+    )
+
+
+def test_upload_files_from_iterator(files_to_upload, monkeypatch):
+    zi = ZenodoInteractor(token="special")  # noqa: S106
+    quick = [v for v in files_to_upload if v.name.startswith("quick")]
+
+    def iter_files():
+        yield quick[0]
+        # Only carry on once the first upload has been and gone,
+        # i.e. uploads start before the iterator is exhausted
+        deadline = time.monotonic() + 5
+        while "quick-0.txt" not in responses_seen and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        yield quick[1]
+
+    responses_seen = []
+    original = ZenodoInteractor.upload_file_to_bucket_url
+
+    def record(self, *args, **kwargs):
+        res = original(self, *args, **kwargs)
+        responses_seen.append(res)
+        return res
+
+    monkeypatch.setattr(ZenodoInteractor, "upload_file_to_bucket_url", record)
+    res = zi.upload_files("123", to_upload=iter_files(), n_threads=2)
+
+    assert responses_seen == ["quick-0.txt", "quick-1.txt"]
+    assert sorted(res) == ["quick-0.txt", "quick-1.txt"]
+
+
+def test_upload_files_fail_fast_stops_taking_files(files_to_upload):
+    zi = ZenodoInteractor(token="special")  # noqa: S106
+    bad = files_to_upload[1]
+
+    def iter_files():
+        yield bad
+        # Never ends, unless we stop taking files from it
+        while True:
+            time.sleep(0.01)
+            yield files_to_upload[0]
+
+    with pytest.raises(UploadFilesError) as exc_info:
+        zi.upload_files("123", to_upload=iter_files(), n_threads=2)
+
+    assert list(exc_info.value.failures) == [bad]
+
+
+def test_upload_cancelled_before_sending(bucket_server):
+    zi = ZenodoInteractor(token="special")  # noqa: S106
+    cancel_event = threading.Event()
+    cancel_event.set()
+
+    with pytest.raises(UploadCancelledError):
+        zi.upload_stream_to_bucket_url(
+            source=[b"data"],
+            filename="out.txt",
+            bucket_url=f"http://127.0.0.1:{bucket_server.server_address[1]}/bucket",
+            cancel_event=cancel_event,
+        )
+
+    assert not bucket_server.received